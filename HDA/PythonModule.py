@@ -4,10 +4,23 @@ import traceback
 import os
 import re
 import tempfile
+import shutil
+import time
 import json
 import copy
+import importlib
+import io
+import contextlib
 from pprint import pprint
 
+# Set while SubmitAllHuskNodes runs: batch name, queued jobs, exported files,
+# farm export mode, export jobs per output and the shared hip snapshot.
+_batch = None
+
+# (address, HuskLib.WebService.Submitter) kept for the session, so jobs reuse one
+# connection to the Deadline Web Service.
+_submitter = None
+
 try:
     from CallDeadlineCommand import CallDeadlineCommand
     #from Deadline.Scripting import RepositoryUtils, FrameUtils, ClientUtils, PathUtils
@@ -84,12 +97,20 @@ def ExportUSD():
     
     # update output path just in case
     OutputChanged()
-    supress_popups = node.evalParm('supress_popup')
-    always_overwrite = node.evalParm('always_overwrite')
+    supress_popups = popups_suppressed(node)
+    # A batch submission doesn't stop at every node to ask.
+    always_overwrite = node.evalParm('always_overwrite') or _batch is not None
     
     usd_rop = node.node('usd_rop')
     usd_file_path = usd_rop.parm('lopoutput').eval()
     
+    # Nodes of a batch that share an output export it once.
+    if _batch is not None:
+        exported_by = _batch['exported'].get(os.path.normcase(os.path.abspath(usd_file_path)))
+        if exported_by:
+            print(f'USD file {usd_file_path} was already exported by {exported_by}.')
+            return True
+    
     #Check basic render settings
     rnd_result = CheckRenderSettings()
     if rnd_result == None:
@@ -102,6 +123,24 @@ def ExportUSD():
             print('Render settings Camera not found. Cancelling...')
             return
                
+    # Optional chunked export: 1 = per-chunk layers stitched with value clips
+    clips_lib = None
+    if optional_parm(node, 'dl_export_mode', 0) == 1 and node.parm('trange').eval() != 0:
+        clips_lib = ImportHuskLib('ValueClips')
+    export_chunk = optional_parm(node, 'dl_export_chunk', 0) or node.parm('dl_chuck_size').eval()
+    
+    # Skip the export when the stage hasn't changed since the last one. Chunked
+    # exports are fingerprinted per chunk only (export_value_clips); a digest of
+    # the whole range first would cook every frame twice.
+    fingerprint_lib = ImportHuskLib('ExportFingerprint') if optional_parm(node, 'dl_incremental_export', 0) else None
+    digest = None
+    if fingerprint_lib is not None and clips_lib is None:
+        digest = stage_fingerprint(node, usd_rop, fingerprint_lib)
+        current, reason = fingerprint_lib.IsCurrent(fingerprint_lib.Load(usd_file_path), digest)
+        print(f'USD export {os.path.basename(usd_file_path)}: {reason}')
+        if current:
+            return True
+    
     #Check if file already exists
     if os.path.isfile(usd_file_path):
         if always_overwrite:
@@ -110,53 +149,344 @@ def ExportUSD():
             return False
             
     
+    if clips_lib is not None:
+        written = export_value_clips(node, usd_rop, usd_file_path, export_chunk, clips_lib, fingerprint_lib)
+        if written is None:
+            return False
+        if _batch is not None:
+            _batch['exported'][os.path.normcase(os.path.abspath(usd_file_path))] = node.path()
+        return True
+    
     #Click export button on USD ROP
+    export_start = time.time()
     usd_rop.parm('execute').pressButton()
     
     #Check that file was created
     if os.path.isfile(usd_file_path):
+        if _batch is not None:
+            _batch['exported'][os.path.normcase(os.path.abspath(usd_file_path))] = node.path()
+        if digest is not None:
+            record_export(usd_file_path, digest, export_start, fingerprint_lib)
         return True       
         
     return False
 
+
+def _parm_signature(parm):
+    """The authored state of a parameter: keyframes, expression or value."""
+    try:
+        keys = parm.keyframes()
+        if keys:
+            return [(k.frame(), k.expression() if k.isExpressionSet() else k.value()) for k in keys]
+    except (hou.Error, AttributeError):
+        pass
+    try:
+        return parm.unexpandedString()
+    except hou.OperationFailed:
+        return parm.eval()
+
+
+def export_dependencies(node, usd_rop):
+    """The USD ROP, the LOP nodes upstream of node and every node they depend on.
+
+    Followed through node inputs, parameter references (SOP Import, Object
+    Merge, cameras) and the contents of unlocked subnetworks (SOP Create), so
+    the SOP and OBJ networks feeding the stage count too. The submitter's own
+    parameters (priority, pools, ...) don't affect the export and are left out.
+    """
+    own = node.path()
+    found = {usd_rop.path(): usd_rop}
+    pending = [n for n in node.inputs() if n is not None]
+    while pending:
+        current = pending.pop()
+        path = current.path()
+        if path in found or path == own or path.startswith(own + '/'):
+            continue
+        found[path] = current
+        pending += [n for n in current.inputs() if n is not None]
+        pending += list(current.references(include_children=False))
+        if not current.isLockedHDA():
+            pending += list(current.children())
+    return [found[path] for path in sorted(found)]
+
+
+def _layer_keys(stage, fingerprint_lib, on_disk=True):
+    """In-memory and dirty layers by content, layers on disk by identifier, size and mtime."""
+    keys = []
+    for layer in stage.GetUsedLayers():
+        if layer.anonymous or layer.dirty:
+            # Anonymous layer identifiers change between sessions; their content doesn't.
+            keys.append(repr(('anon' if layer.anonymous else layer.identifier, fingerprint_lib.Digest([layer.ExportToString()]))))
+        elif on_disk:
+            keys.append(repr((layer.identifier, fingerprint_lib.FileStamp(layer.realPath))))
+    return sorted(keys)
+
+
+def _rop_frames(usd_rop):
+    """The frames the ROP exports, or [] when it exports the current frame only."""
+    if usd_rop.parm('trange').eval() == 0:
+        return []
+    start, end, step = (usd_rop.parm(name).eval() for name in ('f1', 'f2', 'f3'))
+    step = step if step > 0 else 1
+    count = int(round((end - start) / step)) + 1
+    return [start + i * step for i in range(max(count, 0))]
+
+
+def _time_dependent(nodes):
+    for dep in nodes:
+        try:
+            if dep.isTimeDependent():
+                return True
+        except (hou.Error, AttributeError):
+            continue
+    return False
+
+
+def stage_fingerprint(node, usd_rop, fingerprint_lib):
+    """Digest of everything that goes into the export at the ROP's input.
+
+    - the layers of the stage at the current frame: in-memory (LOP) and dirty
+      layers by content, layers on disk by identifier, size and modification time
+    - the parameters of the USD ROP (frame range, output settings), the
+      upstream LOP nodes and the SOP/OBJ nodes they depend on
+    - when any of those nodes is time dependent, the in-memory layers at every
+      frame the ROP exports. The stage is cooked at each of them, which costs
+      about as much as the cook part of the export, but nothing is written.
+    """
+    parts = [hou.applicationVersionString()]
+    nodes = export_dependencies(node, usd_rop)
+    for dep in nodes:
+        parts.append(dep.path() + ':' + dep.type().name())
+        for parm in dep.parms():
+            parts.append((parm.name(), _parm_signature(parm)))
+    parts += _layer_keys(node.stage(), fingerprint_lib)
+
+    frames = _rop_frames(usd_rop)
+    if frames and _time_dependent(nodes):
+        current = hou.frame()
+        try:
+            for frame in frames:
+                hou.setFrame(frame)
+                parts.append(frame)
+                parts += _layer_keys(node.stage(), fingerprint_lib, on_disk=False)
+        finally:
+            hou.setFrame(current)
+    return fingerprint_lib.Digest(parts)
+
+
+def export_value_clips(node, usd_rop, usd_file_path, chunk_size, clips_lib, fingerprint_lib):
+    """Export the frame range in chunks and stitch them into usd_file_path with value clips.
+
+    Each chunk is a separate ROP export into <name>_clips/, skipped when its own
+    fingerprint still matches. Returns the files written, or None on failure.
+    """
+    f = node.parmTuple('fr').eval()
+    start, end, step = int(f[0]), int(f[1]), max(1, int(f[2]))
+    ranges = clips_lib.ChunkRanges(start, end, step, chunk_size)
+
+    # The ROP's own range and output are changed per chunk and restored afterwards.
+    saved = []
+    for name in ('trange', 'f1', 'f2', 'f3', 'lopoutput'):
+        parm = usd_rop.parm(name)
+        value = parm.unexpandedString() if name == 'lopoutput' else parm.eval()
+        saved.append((parm, parm.keyframes(), value))
+
+    chunks = []
+    skipped = 0
+    try:
+        usd_rop.parm('trange').set(1)
+        for parm, _, _ in saved[1:]:
+            parm.deleteAllKeyframes()
+        for chunk in ranges:
+            chunk_file = clips_lib.ChunkFile(usd_file_path, chunk).replace('\\', '/')
+            export_start, export_end = clips_lib.ExportRange(chunk, start, end, step)
+            usd_rop.parm('f1').set(export_start)
+            usd_rop.parm('f2').set(export_end)
+            usd_rop.parm('f3').set(step)
+            usd_rop.parm('lopoutput').set(chunk_file)
+            chunks.append((chunk[0], chunk[1], chunk_file))
+
+            digest = stage_fingerprint(node, usd_rop, fingerprint_lib) if fingerprint_lib is not None else None
+            if digest is not None and fingerprint_lib.IsCurrent(fingerprint_lib.Load(chunk_file), digest)[0]:
+                skipped += 1
+                continue
+            print(f'Exporting frames {chunk[0]}-{chunk[1]} to {chunk_file}')
+            usd_rop.parm('execute').pressButton()
+            if not os.path.isfile(chunk_file):
+                print(f'USD export of frames {chunk[0]}-{chunk[1]} failed.')
+                return None
+            if digest is not None:
+                fingerprint_lib.Save(chunk_file, digest, fingerprint_lib.Stamp([chunk_file]))
+    finally:
+        for parm, keys, value in saved:
+            parm.deleteAllKeyframes()
+            parm.set(value)
+            if keys:
+                parm.setKeyframes(keys)
+
+    if skipped:
+        print(f'{skipped} of {len(ranges)} chunks were unchanged and not exported again.')
+    try:
+        written = clips_lib.StitchChunks(usd_file_path, chunks)
+    except Exception as e:
+        print(f'Could not stitch the USD chunks: {e}')
+        return None
+    print(f'USD scene {usd_file_path} stitched from {len(chunks)} chunks.')
+    return written + [path for _, _, path in chunks]
+
+
+def record_export(usd_file_path, digest, export_start, fingerprint_lib):
+    """Store the fingerprint next to the export, with the layers it wrote."""
+    try:
+        outputs = fingerprint_lib.CollectOutputs(usd_file_path, export_start - 1.0)
+        fingerprint_lib.Save(usd_file_path, digest, fingerprint_lib.Stamp(outputs))
+    except (IOError, OSError) as e:
+        print(f'Could not write the export fingerprint: {e}')
+        return
+    if len(outputs) > 1:
+        print(f'USD export wrote {len(outputs)} layers.')
+
         
+def ImportHuskLib(name):
+    """Import a module from the shared HuskLib package.
+
+    HuskLib ships with the Deadline submitter in <repository>/custom/scripts/Submission.
+    It is used directly if it is already on the Python path, otherwise the
+    repository location is looked up through deadlinecommand.
+    """
+    try:
+        return importlib.import_module('HuskLib.' + name)
+    except ImportError:
+        pass
+
+    if "CallDeadlineCommand" in sys.modules:
+        try:
+            lib_dir = str(CallDeadlineCommand(['GetRepositoryPath', 'custom/scripts/Submission'])).strip()
+        except Exception as e:
+            lib_dir = ''
+            print(f'Could not locate the Deadline repository: {e}')
+        if lib_dir and os.path.isdir(lib_dir) and lib_dir not in sys.path:
+            sys.path.append(lib_dir)
+
+    try:
+        return importlib.import_module('HuskLib.' + name)
+    except ImportError:
+        print(f'HuskLib.{name} could not be imported. Is the Husk submitter installed in the Deadline repository?')
+        return None
+
+
 def CheckRenderSettings():
     # Access the render settings node 
     node = hou.pwd()
     stage = node.stage()
     
-    # Iterate over all prims in the stage to find a RenderSettings primitive
-    settings_prim = None
-    for prim in stage.Traverse():
-        if prim.GetTypeName() == "RenderSettings":
-            settings_prim = prim
-            break  # Stop at the first found RenderSettings prim
+    # Same lookup as the Deadline submitter: stage metadata, then the /Render
+    # scope, instead of traversing every prim on the stage. Without HuskLib
+    # (the submitter isn't installed in the repository) the stage is searched here.
+    probe = ImportHuskLib('UsdProbe')
+    if probe is not None:
+        info = probe.ReadRenderSettings(stage, hou.frame())
+    else:
+        info = find_render_settings(stage)
     
     #Cancel if no render settings are found
-    if settings_prim is None or not settings_prim.IsValid():
-        hou.ui.displayMessage("No render settings found on stage..", buttons=("OK",), title="Critical")
+    if info is None or info['settings_path'] is None:
+        if popups_suppressed(node):
+            print('No render settings found on stage..')
+        else:
+            hou.ui.displayMessage("No render settings found on stage..", buttons=("OK",), title="Critical")
         return None
     
     result = {}
+    result['resolution'] = info['resolution']
+    result['camera'] = info['camera']
     
-    resolution = stage.GetPropertyAtPath(f"{settings_prim.GetPath()}.resolution").Get(1)     
-    result['resolution'] = resolution
-    
+    # The camera Houdini renders with, as the %rendercamera rule resolves it.
     ls = hou.LopSelectionRule()
-    ls.setPathPattern('%rendercamera:/Render/rendersettings')
-    resolved_paths = ls.expandedPaths(node.inputs()[0])
-    if resolved_paths[0]:
-        # Get the camera path
-        if stage.GetPrimAtPath(resolved_paths[0]):
-            #print(f"Camera '{resolved_paths[0]}' exists.")
-            result['camera'] = resolved_paths[0]
-        else:
-            #print(f"Camera '{resolved_paths[0]}' does not exist.")
-            result['camera'] = None
+    ls.setPathPattern(f"%rendercamera:{info['settings_path']}")
+    resolved_paths = ls.expandedPaths(node.inputs()[0]) if node.inputs() else []
+    if resolved_paths and stage.GetPrimAtPath(resolved_paths[0]):
+        result['camera'] = str(resolved_paths[0])
             
     return result
+
+
+def find_render_settings(stage):
+    """The first RenderSettings prim's path and resolution, found by traversing the stage."""
+    for prim in stage.Traverse():
+        if prim.GetTypeName() == "RenderSettings":
+            resolution = prim.GetAttribute('resolution').Get(hou.frame())
+            return {
+                'settings_path': str(prim.GetPath()),
+                'resolution': [int(resolution[0]), int(resolution[1])] if resolution is not None else None,
+                'camera': None,
+            }
+    return None
     
     
+def popups_suppressed(node):
+    """Messages go to the console instead of dialogs (node setting, or a batch submission)."""
+    return _batch is not None or node.evalParm('supress_popup')
+
+
+def optional_parm(node, name, default):
+    """Evaluate a parameter that older versions of the HDA don't have."""
+    parm = node.parm(name)
+    if parm is None:
+        return default
+    return parm.eval()
+
+
+def plan_chunk_size(usd_file_path, delegate, target_minutes):
+    """Pick a chunk size from the Husk plugin's render statistics history.
+
+    The history file is the plugin's RenderStatsHistoryFile; Houdini finds it
+    through the HUSK_STATS_HISTORY environment variable. Returns None when
+    there is no history for similar scenes.
+    """
+    history_file = hou.getenv('HUSK_STATS_HISTORY') or ''
+    planner = ImportHuskLib('ChunkPlanner')
+    if not history_file or planner is None:
+        print('Automatic chunk size needs HUSK_STATS_HISTORY and HuskLib. Using the chunk size parameter.')
+        return None
+
+    chunk, reason = planner.PlanChunkSize(usd_file_path, delegate, planner.LoadHistory(history_file), target_minutes)
+    print(f'Chunk size for {os.path.basename(usd_file_path)}: {reason}')
+    return chunk
+
+
+def run_preflight(usd_file_path, supress_popups):
+    """Check the USD file's dependencies before submitting. Returns False to cancel.
+
+    Paths outside the prefixes in HUSK_PATH_MAPPING_PREFIXES (';' separated,
+    the same list as the plugin's Path Mapping Prefixes) are reported too.
+    Unlike the Monitor submitter, paths are not also run through Deadline's
+    CheckPathMapping: from Houdini that is a deadlinecommand call per path.
+    HUSK_LOCAL_PREFIXES replaces the default local path prefixes, like the
+    plugin's Pre-flight Local Prefixes.
+    """
+    preflight = ImportHuskLib('Preflight')
+    if preflight is None:
+        return True
+
+    prefixes = preflight.SplitPrefixes(hou.getenv('HUSK_PATH_MAPPING_PREFIXES') or '')
+    local_prefixes = preflight.SplitPrefixes(hou.getenv('HUSK_LOCAL_PREFIXES') or preflight.LOCAL_PREFIXES)
+    try:
+        result = preflight.Run(usd_file_path, prefixes, lambda path: preflight.IsLocalPath(path, local_prefixes))
+    except Exception as e:
+        print(f'Pre-flight check failed: {e}')
+        return True
+    print(f"Pre-flight check: {result['checked']} files in {result['directories']} folders, {result['seconds']:.1f}s")
+
+    report = preflight.FormatReport(result)
+    if not report:
+        return True
+    if supress_popups:
+        print(report)
+        return True
+    return hou.ui.displayMessage(report + 'Submit anyway?', buttons=('Submit', 'Cancel'), title='Pre-flight Check') == 0
+
+
 def write_info_file(path, info):
     """Write a Deadline job/plugin info dict to a KEY=VALUE text file."""
     with open(path, 'w') as f:
@@ -191,6 +521,156 @@ def parse_job_id(submit_output):
     return ''
 
 
+def submit_with_deadlinecommand(job_info, plugin_info, aux_files=()):
+    """Submit one job through deadlinecommand. Returns (job id, output)."""
+    temp_dir = tempfile.mkdtemp(prefix='houdini_temp_')
+    try:
+        job_info_file = os.path.join(temp_dir, 'job_info.txt')
+        plugin_info_file = os.path.join(temp_dir, 'plugin_info.txt')
+        write_info_file(job_info_file, job_info)
+        write_info_file(plugin_info_file, plugin_info)
+        output = str(CallDeadlineCommand(['SubmitJob', job_info_file, plugin_info_file] + list(aux_files)))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return parse_job_id(output), output
+
+
+def get_submitter():
+    """The Web Service submitter for $HUSK_DEADLINE_WEBSERVICE (host:port), or None."""
+    global _submitter
+    address = os.environ.get('HUSK_DEADLINE_WEBSERVICE', '').strip()
+    if _submitter is not None and _submitter[0] == address:
+        return _submitter[1]
+    if _submitter is not None:
+        _submitter[1].close()
+    _submitter = None
+    web_service_lib = ImportHuskLib('WebService') if address else None
+    if web_service_lib is None:
+        return None
+    _submitter = (address, web_service_lib.Submitter(web_service_lib.DeadlineWebService(address),
+                                                     submit_with_deadlinecommand))
+    return _submitter[1]
+
+
+def submit_job(job_info, plugin_info):
+    """Submit one job, through the Deadline Web Service when one is set up.
+
+    Falls back to deadlinecommand when it isn't, or can't be reached.
+    Returns (job id, output); the id is '' when the submission failed.
+    """
+    submitter = get_submitter()
+    if submitter is None:
+        return submit_with_deadlinecommand(job_info, plugin_info)
+    job_id, output = submitter.Submit(job_info, plugin_info)
+    if not job_id:
+        print(output)
+    return job_id, output
+
+
+def submit_preview_and_fill(job_info, plugin_info, preview, fill, frames_lib, supress_popups):
+    """Submit a sparse, higher priority preview job and a fill-in job that depends on it."""
+    job_name = job_info['Name']
+    # One frame per task, so each preview frame is done as soon as it is rendered.
+    preview_info = dict(job_info, Name=f"{job_name} [PREVIEW]", BatchName=job_info.get('BatchName', job_name),
+                        Frames=frames_lib.CompactFrameList(frames_lib.ProgressiveOrder(preview)), ChunkSize=1,
+                        Priority=min(100, int(job_info['Priority']) + 10))
+    preview_job_id, _ = submit_job(preview_info, plugin_info)
+
+    if not preview_job_id:
+        msg = 'Preview job submission failed (no JobID returned). Fill-in job not submitted.'
+    else:
+        dependencies = ','.join(d for d in (job_info.get('JobDependencies'), preview_job_id) if d)
+        fill_info = dict(job_info, Name=f"{job_name} [FILL]", BatchName=job_info.get('BatchName', job_name),
+                         Frames=frames_lib.CompactFrameList(fill), JobDependencies=dependencies)
+        fill_job_id, _ = submit_job(fill_info, plugin_info)
+        msg = (f"Preview job ({len(preview)} frames): {preview_job_id}\n"
+               f"Fill-in job ({len(fill)} frames): {fill_job_id}")
+
+    if not supress_popups:
+        hou.ui.displayMessage(msg, buttons=("OK",), title="Notification")
+    else:
+        print(msg)
+
+
+def submit_farm_export(node, usd_rop, job_info, per_frame):
+    """Save the hip file and submit the USD ROP as a Houdini plugin job.
+
+    The job renders a snapshot of the hip file, so later changes in this session
+    don't leak into the export. With per_frame the ROP writes one file per frame
+    (<name>.$F4.usd), in chunks of dl_export_chunk frames (default: the job's
+    chunk size) that run in parallel. Returns (job id, scene file for husk).
+    In a batch, nodes that share a USD output share its export job, and single
+    file exports share one snapshot of the hip file.
+    """
+    output_key = (os.path.normcase(os.path.abspath(usd_rop.parm('lopoutput').eval())), per_frame)
+    if _batch is not None and output_key in _batch['export_jobs']:
+        return _batch['export_jobs'][output_key]
+
+    hip_file = hou.hipFile.path()
+    shared = _batch is not None and not per_frame
+    if not (shared and _batch.get('snapshot')):
+        hou.hipFile.save()
+
+    lopoutput = usd_rop.parm('lopoutput')
+    original = lopoutput.unexpandedString()
+    output = original
+    scene_file = lopoutput.eval()
+    if per_frame and not re.search(r'\$F|#', output):
+        base, ext = os.path.splitext(output)
+        output = base + '.$F4' + ext
+    if per_frame:
+        # Expand everything but the frame; the Husk plugin fills in each task's frame.
+        scene_file = hou.expandString(re.sub(r'\$F(\d*)(?![A-Za-z_])', lambda m: '#' * int(m.group(1) or 1), output))
+
+    # Snapshot of the hip file, with the per-frame output when requested.
+    if shared and _batch.get('snapshot'):
+        snapshot = _batch['snapshot']
+    else:
+        snapshot_dir = os.path.join(os.path.dirname(hip_file), 'deadline')
+        os.makedirs(snapshot_dir, exist_ok=True)
+        hip_name, hip_ext = os.path.splitext(os.path.basename(hip_file))
+        # Per-frame snapshots differ per node; the node name keeps them apart within a second.
+        suffix = f"_{node.name()}" if per_frame else ''
+        snapshot = os.path.join(snapshot_dir, f"{hip_name}_{time.strftime('%Y%m%d_%H%M%S')}{suffix}{hip_ext}").replace('\\', '/')
+        try:
+            lopoutput.set(output)
+            hou.hipFile.save(snapshot, save_to_recent_files=False)
+        finally:
+            lopoutput.set(original)
+            hou.hipFile.setName(hip_file)
+        if shared:
+            _batch['snapshot'] = snapshot
+
+    frames = job_info['Frames']
+    if per_frame:
+        chunk_size = optional_parm(node, 'dl_export_chunk', 0) or job_info['ChunkSize']
+    else:
+        # A single file can only be written by one task.
+        chunk_size = 1000000
+    version = hou.applicationVersion()
+    export_job_info = dict(
+        (key, job_info[key]) for key in ('Comment', 'Department', 'Pool', 'Group', 'Priority', 'UserName') if key in job_info)
+    export_job_info.update({
+        "Plugin": "Houdini",
+        "Name": f"{job_info['Name']} [USD EXPORT]",
+        "BatchName": job_info.get('BatchName', job_info['Name']),
+        "Frames": frames,
+        "ChunkSize": chunk_size,
+    })
+    export_plugin_info = {
+        "SceneFile": snapshot,
+        "OutputDriver": usd_rop.path(),
+        "Version": f"{version[0]}.{version[1]}",
+        "IgnoreInputs": False,
+        "Build": "None",
+    }
+    job_id, _ = submit_job(export_job_info, export_plugin_info)
+    result = (job_id, scene_file.replace('\\', '/'))
+    if _batch is not None and job_id:
+        _batch['export_jobs'][output_key] = result
+    return result
+
+
 def frame_range_to_string(param):
     # Extract the 'start', 'end', and 'increment' values from the Houdini parameter
     start_frame = param[0]
@@ -209,9 +689,9 @@ def frame_range_to_string(param):
     if increment == 1:
         return f"{start_frame}-{end_frame}"
     else:
-        # Generate a string that shows the frame range divided by increment
-        frames = [str(frame) for frame in range(start_frame, end_frame + 1, increment)]
-        return ', '.join(frames)
+        # Deadline's step syntax keeps the job's frame list short; the plugin
+        # renders each task's exact frames with a single husk process.
+        return f"{start_frame}-{end_frame}x{increment}"
         
 def UpdateGroupFromRenderDelegate():
     node = hou.pwd()
@@ -249,12 +729,19 @@ def HuskSubmission():
     if rnd_result == None:
         return
         
-    supress_popups = node.evalParm('supress_popup')
+    supress_popups = popups_suppressed(node)
 
     #print(rnd_result['resolution'])
     
+    # Optional farm-side export: 1 = one export task, 2 = a file per frame, exported
+    # in parallel chunks, with the render job frame-dependent on the export job.
+    farm_export = optional_parm(node, 'dl_farm_export', 0) if node.parm('export_first').eval() else 0
+    # A batch can move local exports to the farm, where they run in parallel.
+    if node.parm('export_first').eval() and not farm_export and _batch is not None:
+        farm_export = _batch['farm_export']
+    
     # Check if export first toggle is on
-    if node.parm('export_first').eval():
+    if node.parm('export_first').eval() and not farm_export:
         if ExportUSD() == False:
             if not supress_popups:
                 hou.ui.displayMessage('USD export failed..', buttons=('OK',), title='Warning')
@@ -268,12 +755,17 @@ def HuskSubmission():
     usd_rop = node.node('usd_rop')
     usd_file_path = usd_rop.parm('lopoutput').eval()
     
-    if not os.path.isfile(usd_file_path):
+    if not farm_export and not os.path.isfile(usd_file_path):
         if not supress_popups:
             hou.ui.displayMessage('USD file not found, please export file first', buttons=('OK',), title='Warning')
         else:
             print('USD file not found, please export file first')
         return
+
+    # Optional pre-flight check of every layer and asset the USD file uses
+    if optional_parm(node, 'dl_preflight', 0) and not farm_export:
+        if not run_preflight(usd_file_path, supress_popups):
+            return
     
     #Grab the unevalated output path -- retaining $F4 etc..
     output_file = node.parm('out').unexpandedString()
@@ -297,9 +789,6 @@ def HuskSubmission():
         
     # Get the path of the current Houdini scene
     hip_file_path = hou.hipFile.path()
-    # Save Job Info and Plugin Info to temp files
-    temp_dir = tempfile.mkdtemp(prefix='houdini_temp_')
-        
 
     if node.parm('trange').eval() == 0:
         frames = int(hou.frame())
@@ -336,6 +825,8 @@ def HuskSubmission():
         "OutputDirectory0": out_split[0],
         "OutputFilename0": out_split[1],
     }
+    if _batch is not None:
+        job_info['BatchName'] = _batch['name']
     
     plugin_info = {
         'SceneFile': f'"{usd_file_path}"',
@@ -351,6 +842,31 @@ def HuskSubmission():
         'CustomArguments': node.parm('custom_args').eval(),
         'DisableMotionBlur': 0,
     }
+
+    if farm_export:
+        export_job_id, scene_file = submit_farm_export(node, usd_rop, job_info, farm_export == 2)
+        if not export_job_id:
+            msg = 'USD export job submission failed (no JobID returned). Render job not submitted.'
+            if not supress_popups:
+                hou.ui.displayMessage(msg, buttons=("OK",), title="Warning")
+            else:
+                print(msg)
+            return
+        print(f'Submitted USD export job: {export_job_id}')
+        job_info['JobDependencies'] = export_job_id
+        job_info.setdefault('BatchName', job_name)
+        plugin_info['SceneFile'] = f'"{scene_file}"'
+        if farm_export == 2:
+            # husk loads one scene file per task: render each frame once its file is written.
+            job_info['IsFrameDependent'] = 'true'
+    
+    # Automatic chunk size from the render statistics of similar scenes.
+    if optional_parm(node, 'dl_auto_chunk', 0):
+        chunk = plan_chunk_size(usd_file_path, delegate, optional_parm(node, 'dl_target_task_minutes', 30))
+        if chunk:
+            job_info['ChunkSize'] = chunk
+    if farm_export == 2:
+        job_info['ChunkSize'] = 1
     
     # Tile Rendering
     if node.evalParm('enable_tile'):
@@ -364,41 +880,40 @@ def HuskSubmission():
             plugin_info['CustomArguments'] += ' --autotile --tile-count {} {}'.format(tiles_x, tiles_y)
 
         elif tile_mode == 1:
-            # Distributed tile mode: one render job whose tasks are tiles, plus a
-            # dependent assembly job that stitches them with itilestitch.
-            #
-            # Distributed tiling is single-frame only. Warn the user and force the
-            # job to the current frame if a range is set.
-            if node.parm('trange').eval() != 0:
-                if not supress_popups:
-                    if hou.ui.displayMessage(
-                        'Distributed tile rendering supports a single frame only.\n\n'
-                        'The job will be submitted for the current frame ({}) instead of '
-                        'the frame range.\n\nContinue?'.format(int(hou.frame())),
-                        buttons=("OK", "Cancel"), title="Warning") == 1:
-                        return
-                else:
-                    print('Distributed tile rendering is single-frame only. Using current frame {}.'.format(int(hou.frame())))
+            # Distributed tile mode: one render job whose tasks are a tile x frame
+            # matrix, plus per-frame assembly (and optional cleanup) tasks that are
+            # frame-dependent on it, so each frame is stitched as soon as its own
+            # tiles are done instead of after the whole render job.
+            if node.parm('trange').eval() == 0:
+                render_frames = [int(hou.frame())]
+            else:
+                f = node.parmTuple('fr').eval()
+                render_frames = list(range(int(f[0]), int(f[1]) + 1, max(1, int(f[2]))))
 
-            render_frame = int(hou.frame())
             total_tiles = tiles_x * tiles_y
+            total_tasks = len(render_frames) * total_tiles
+            frame_label = (f"frame {render_frames[0]}" if len(render_frames) == 1
+                           else f"frames {render_frames[0]}-{render_frames[-1]}")
 
-            # Resolve the output to a concrete single-frame path (expanding $F4 etc.)
-            # so itilestitch and husk agree on a real filename rather than a token.
-            frame_output = node.parm('out').evalAtFrame(render_frame).replace('\\', '/')
+            # The plugin expands the frame per task, so pass the output as a
+            # #### pattern with every other variable already expanded.
+            frame_output = hou.expandString(re.sub(r'\$F(\d*)(?![A-Za-z_])', lambda m: '#' * int(m.group(1) or 1),
+                                                   output_file)).replace('\\', '/')
             frame_split = os.path.split(frame_output)
 
             tile_suffix = '_tile%d'
 
-            # --- Render job: one task per tile ---
+            # --- Render job: one task per tile per frame ---
+            # Task N renders tile N % total_tiles of frame render_frames[N // total_tiles].
             tile_job_info = job_info.copy()
-            tile_job_info["Name"] = f"{job_name} [TILES] frame {render_frame}"
-            tile_job_info["BatchName"] = f"{job_name} [TILES]"
-            # Repurpose the frame range to enumerate tiles: task N renders tile N.
-            tile_job_info["Frames"] = f"0-{total_tiles - 1}"
+            tile_job_info["Name"] = f"{job_name} [TILES] {frame_label}"
+            tile_job_info["BatchName"] = job_info.get('BatchName', f"{job_name} [TILES]")
+            tile_job_info["Frames"] = f"0-{total_tasks - 1}"
             tile_job_info["ChunkSize"] = 1
             tile_job_info["OutputDirectory0"] = frame_split[0]
             tile_job_info["OutputFilename0"] = frame_split[1]
+            # Tile tasks aren't frames; wait for the whole export job instead.
+            tile_job_info.pop("IsFrameDependent", None)
 
             tile_plugin_info = copy.deepcopy(plugin_info)
             tile_plugin_info['ImageOutputDirectory'] = frame_output
@@ -406,14 +921,13 @@ def HuskSubmission():
             tile_plugin_info['TilesX'] = tiles_x
             tile_plugin_info['TilesY'] = tiles_y
             tile_plugin_info['TileSuffix'] = tile_suffix
-            tile_plugin_info['RenderFrame'] = render_frame
+            tile_plugin_info['RenderFrames'] = ','.join(str(fr) for fr in render_frames)
+            # A requeued tile task keeps a complete tile from an earlier attempt.
+            tile_plugin_info['Resume'] = 1
 
-            tile_job_info_file = os.path.join(temp_dir, f"{job_name}_tiles_info.txt")
-            tile_plugin_info_file = os.path.join(temp_dir, f"{job_name}_tiles_plugin.txt")
-            write_info_file(tile_job_info_file, tile_job_info)
-            write_info_file(tile_plugin_info_file, tile_plugin_info)
-
-            render_job_id = parse_job_id(CallDeadlineCommand(['SubmitJob', tile_job_info_file, tile_plugin_info_file]))
+            # The three jobs are linked by the ids returned for each, so they
+            # go one after the other (over one connection with the Web Service).
+            render_job_id, _ = submit_job(tile_job_info, tile_plugin_info)
             if not render_job_id:
                 msg = 'Tile render job submission failed (no JobID returned). Assembly job not submitted.'
                 if not supress_popups:
@@ -421,40 +935,46 @@ def HuskSubmission():
                 else:
                     print(msg)
                 return
-            print(f"Submitted tile render job ({total_tiles} tiles): {render_job_id}")
+            print(f"Submitted tile render job ({len(render_frames)} frames x {total_tiles} tiles): {render_job_id}")
+
+            # Assembly/cleanup tasks are numbered by the first tile task of their
+            # frame (0, T, 2T, ...), so a frame dependency with an offset window of
+            # [0, T-1] waits for exactly that frame's tiles.
+            per_frame_tasks = f"0-{total_tasks - 1}x{total_tiles}"
+            frame_plugin_info = {
+                "ImageOutputDirectory": frame_output,
+                "TilesX": tiles_x,
+                "TilesY": tiles_y,
+                "TileSuffix": tile_suffix,
+                "RenderFrames": tile_plugin_info['RenderFrames'],
+            }
 
-            # --- Assembly job: single task, depends on the render job ---
+            # --- Assembly job: one task per frame, frame-dependent on the render job ---
             assembly_job_info = {
                 "Plugin": "Husk",
-                "Name": f"{job_name} [ASSEMBLY] frame {render_frame}",
-                "BatchName": f"{job_name} [TILES]",
+                "Name": f"{job_name} [ASSEMBLY] {frame_label}",
+                "BatchName": tile_job_info["BatchName"],
                 "Comment": "Stitch distributed render tiles",
                 "UserName": os.getlogin(),
                 "Pool": node.parm('dl_pool').eval(),
                 "Group": tile_job_info["Group"],
                 "Priority": tile_job_info["Priority"],
-                "Frames": "0",
+                "Frames": per_frame_tasks,
                 "ChunkSize": 1,
                 "JobDependencies": render_job_id,
+                "IsFrameDependent": "true",
+                "FrameDependencyOffsetStart": 0,
+                "FrameDependencyOffsetEnd": total_tiles - 1,
                 "OutputDirectory0": frame_split[0],
                 "OutputFilename0": frame_split[1],
             }
-            assembly_plugin_info = {
-                "AssemblyJob": 1,
-                "ImageOutputDirectory": frame_output,
-                "TilesX": tiles_x,
-                "TilesY": tiles_y,
-                "TileSuffix": tile_suffix,
-            }
-
-            assembly_info_file = os.path.join(temp_dir, f"{job_name}_assembly_info.txt")
-            assembly_plugin_file = os.path.join(temp_dir, f"{job_name}_assembly_plugin.txt")
-            write_info_file(assembly_info_file, assembly_job_info)
-            write_info_file(assembly_plugin_file, assembly_plugin_info)
+            # The assembly checks every tile first and requeues only the bad
+            # tiles' tasks in the render job.
+            assembly_plugin_info = dict(frame_plugin_info, AssemblyJob=1, TileRenderJobId=render_job_id)
 
-            assembly_job_id = parse_job_id(CallDeadlineCommand(['SubmitJob', assembly_info_file, assembly_plugin_file]))
+            assembly_job_id, _ = submit_job(assembly_job_info, assembly_plugin_info)
 
-            # --- Optional cleanup job: remove tile files after assembly ---
+            # --- Optional cleanup job: remove each frame's tiles after its assembly ---
             cleanup_job_id = ''
             if node.evalParm('cleanup_tiles'):
                 if not assembly_job_id:
@@ -462,37 +982,27 @@ def HuskSubmission():
                 else:
                     cleanup_job_info = {
                         "Plugin": "Husk",
-                        "Name": f"{job_name} [CLEANUP] frame {render_frame}",
-                        "BatchName": f"{job_name} [TILES]",
+                        "Name": f"{job_name} [CLEANUP] {frame_label}",
+                        "BatchName": tile_job_info["BatchName"],
                         "Comment": "Remove tile images after assembly",
                         "UserName": os.getlogin(),
                         "Pool": node.parm('dl_pool').eval(),
                         "Group": tile_job_info["Group"],
                         "Priority": tile_job_info["Priority"],
-                        "Frames": "0",
+                        "Frames": per_frame_tasks,
                         "ChunkSize": 1,
                         "JobDependencies": assembly_job_id,
+                        "IsFrameDependent": "true",
                         "OutputDirectory0": frame_split[0],
                         "OutputFilename0": frame_split[1],
                     }
                     # Optionally submit the cleanup job suspended so the user can
-                    # verify the assembled frame before manually resuming it.
+                    # verify the assembled frames before manually resuming it.
                     if node.evalParm('cleanup_suspended'):
                         cleanup_job_info["InitialStatus"] = "Suspended"
-                    cleanup_plugin_info = {
-                        "CleanupJob": 1,
-                        "ImageOutputDirectory": frame_output,
-                        "TilesX": tiles_x,
-                        "TilesY": tiles_y,
-                        "TileSuffix": tile_suffix,
-                    }
+                    cleanup_plugin_info = dict(frame_plugin_info, CleanupJob=1)
 
-                    cleanup_info_file = os.path.join(temp_dir, f"{job_name}_cleanup_info.txt")
-                    cleanup_plugin_file = os.path.join(temp_dir, f"{job_name}_cleanup_plugin.txt")
-                    write_info_file(cleanup_info_file, cleanup_job_info)
-                    write_info_file(cleanup_plugin_file, cleanup_plugin_info)
-
-                    cleanup_job_id = parse_job_id(CallDeadlineCommand(['SubmitJob', cleanup_info_file, cleanup_plugin_file]))
+                    cleanup_job_id, _ = submit_job(cleanup_job_info, cleanup_plugin_info)
 
             msg = (f"Tile render submitted.\n\n"
                    f"Render job: {render_job_id}\n"
@@ -507,42 +1017,146 @@ def HuskSubmission():
 
     # END TILE RENDERING
 
-    if not os.path.exists(temp_dir):
-        try:
-            # Create the directory (including any intermediate directories)
-            os.makedirs(temp_dir)
-            print(f"Directory created: {temp_dir}")
-        except Exception as e:
-            print(f"Failed to create directory {temp_dir}: {e}")
-            return
-   
-    
-    job_info_file = os.path.join(temp_dir, job_name + '_info_file.txt')
-    plugin_info_file = os.path.join(temp_dir, job_name + '_plugin_file.txt')
-    aux_files = [usd_file_path]
-    
-    # Write job_info to file
-    with open(job_info_file, 'w') as job_file:
-        for key, value in job_info.items():
-            job_file.write(f"{key}={value}\n")
-    
-    # Write plugin_info to file
-    with open(plugin_info_file, 'w') as plugin_file:
-        for key, value in plugin_info.items():
-            plugin_file.write(f"{key}={value}\n")
-    
-    # Submit the job using DeadlineCommand
-    deadline_command = CallDeadlineCommand
-    submission_args = [job_info_file, plugin_info_file]
+    # Optional frame order: 1 = progressive (first, last, middle, quarters, ...),
+    # 2 = sparse preview job plus a fill-in job that waits for it.
+    frame_order = optional_parm(node, 'dl_frame_order', 0)
+    frames_lib = ImportHuskLib('Frames') if frame_order and node.parm('trange').eval() != 0 else None
+    if frames_lib is not None:
+        f = node.parmTuple('fr').eval()
+        frame_list = list(range(int(f[0]), int(f[1]) + 1, max(1, int(f[2]))))
+        if frame_order == 1:
+            job_info['Frames'] = frames_lib.CompactFrameList(frames_lib.ProgressiveOrder(frame_list))
+        elif frame_order == 2:
+            preview, fill = frames_lib.SplitPreview(frame_list, optional_parm(node, 'dl_preview_step', 10))
+            if fill:
+                submit_preview_and_fill(job_info, plugin_info, preview, fill, frames_lib, supress_popups)
+                return
 
-    command = ['SubmitJob', submission_args[0], submission_args[1]]
-    response = str(CallDeadlineCommand(command))
+    if _batch is not None:
+        _batch['jobs'].append((node.path(), job_info, plugin_info))
+        print(f'Queued {job_name} for the batch submission.')
+        return
+    
+    # Submit the job through the Web Service or deadlinecommand
+    _, response = submit_job(job_info, plugin_info)
     if not supress_popups:
         hou.ui.displayMessage(response, buttons=("OK",), title="Notification")
     else:
         print(response)
     
     
+def parse_job_ids(submit_output):
+    """All JobIDs in a SubmitMultipleJobs output, in submission order."""
+    return re.findall(r'JobID[=:]\s*([0-9a-fA-F]{24})', str(submit_output))
+
+
+def submit_multiple_jobs(jobs):
+    """Submit [(node path, job info, plugin info)] in one deadlinecommand call.
+
+    Returns {node path: job id} of the jobs that were submitted.
+    """
+    if not jobs:
+        return {}
+    temp_dir = tempfile.mkdtemp(prefix='houdini_temp_')
+    try:
+        arguments = ['SubmitMultipleJobs']
+        for i, (_, job_info, plugin_info) in enumerate(jobs):
+            job_info_file = os.path.join(temp_dir, f'job{i}_info.txt')
+            plugin_info_file = os.path.join(temp_dir, f'job{i}_plugin.txt')
+            write_info_file(job_info_file, job_info)
+            write_info_file(plugin_info_file, plugin_info)
+            arguments += ['-job', job_info_file, plugin_info_file]
+        response = CallDeadlineCommand(arguments)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    job_ids = parse_job_ids(response)
+    if len(job_ids) != len(jobs):
+        print(str(response))
+    return dict((path, job_ids[i]) for i, (path, _, _) in enumerate(jobs) if i < len(job_ids))
+
+
+def husk_submitter_nodes():
+    """Every Husk Submitter node in the hip file, of any version of the HDA."""
+    nodes = []
+    for node_type in hou.lopNodeTypeCategory().nodeTypes().values():
+        if 'husk_submitter' in node_type.name().lower():
+            nodes += node_type.instances()
+    return sorted(nodes, key=lambda n: n.path())
+
+
+def SubmitAllHuskNodes(nodes=None, batch_name=None, farm_export=1):
+    """Submit every Husk Submitter node (or the given nodes) as one batch.
+
+    Each node is prepared as if its Submit button was pressed, with messages
+    collected instead of shown. Nodes that share a USD output export it once.
+    Houdini cooks one ROP at a time, so exports that would run in this session
+    one after the other become farm export jobs instead (farm_export 1 = one
+    export task, 2 = a file per frame, 0 = export here, one node at a time),
+    and the exports of different outputs run in parallel. Nodes with their own
+    Export On Farm setting keep it.
+    The plain render jobs of all nodes go to Deadline under one Batch Name,
+    over one Web Service connection when one is set up, else in a single
+    SubmitMultipleJobs call; tile, preview/fill and farm export jobs need each
+    other's job ids and are submitted as the node is processed. One summary
+    is shown at the end.
+    """
+    global _batch
+    if not "CallDeadlineCommand" in sys.modules:
+        return
+    if nodes is None:
+        nodes = husk_submitter_nodes()
+    if not nodes:
+        print('No Husk Submitter nodes found.')
+        return
+    if not batch_name:
+        batch_name = os.path.splitext(os.path.basename(hou.hipFile.path()))[0]
+
+    _batch = {'name': batch_name, 'jobs': [], 'exported': {}, 'farm_export': farm_export, 'export_jobs': {}}
+    results = []
+    pwd = hou.pwd()
+    try:
+        for node in nodes:
+            queued = len(_batch['jobs'])
+            output = io.StringIO()
+            hou.setPwd(node)
+            try:
+                with contextlib.redirect_stdout(output):
+                    HuskSubmission()
+            except Exception as e:
+                output.write(f'Failed: {e}\n')
+                traceback.print_exc()
+            print(output.getvalue(), end='')
+            lines = [line for line in output.getvalue().splitlines() if line.strip()]
+            status = 'queued' if len(_batch['jobs']) > queued else (lines[-1] if lines else 'nothing submitted')
+            results.append([node.path(), status])
+        jobs = _batch['jobs']
+    finally:
+        hou.setPwd(pwd)
+        _batch = None
+
+    submitter = get_submitter()
+    if submitter is not None and submitter.UsesWebService():
+        ids = {}
+        for path, job_info, plugin_info in jobs:
+            job_id, _ = submit_job(job_info, plugin_info)
+            if job_id:
+                ids[path] = job_id
+        method = 'over the Deadline Web Service'
+    else:
+        ids = submit_multiple_jobs(jobs)
+        method = 'in one call'
+    for result in results:
+        if result[1] == 'queued':
+            result[1] = f'JobID {ids[result[0]]}' if result[0] in ids else 'submission failed, see the console'
+
+    msg = f'Batch "{batch_name}": {len(ids)} of {len(jobs)} render jobs submitted {method}.\n\n'
+    msg += '\n'.join(f'{path}: {status}' for path, status in results)
+    if hou.isUIAvailable():
+        hou.ui.displayMessage(msg, buttons=("OK",), title="Batch Submission")
+    else:
+        print(msg)
+
+
 def PrismOutput(prj_path, entity, identifier, aov):
     prj_path = prj_path.replace('\\\\', '/')
     prj_path = prj_path.replace('\\', '/')
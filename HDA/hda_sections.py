@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""Read and replace sections of the Husk Submitter HDA without Houdini.
+
+An .hda file is an INDX archive: a table of named sections (name, offset,
+size, modification time) followed by their data. Each asset definition in it
+is an INDX archive of its own, holding DialogScript (the parameter
+interface), PythonModule and the other sections as plain text.
+
+PythonModule.py next to this script is the source of the asset's Python
+module; `sync` copies it into the .hda. Parameters are edited in the
+DialogScript section (extract, edit, set), or in Houdini's Type Properties.
+
+Usage:
+    python HDA/hda_sections.py list
+    python HDA/hda_sections.py extract DialogScript > DialogScript.txt
+    python HDA/hda_sections.py set DialogScript=DialogScript.txt [PythonModule=...]
+    python HDA/hda_sections.py sync
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+HDA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HDA = os.path.join(HDA_DIR, 'lop_trono.Husk_Submitter.1.4.hda')
+PYTHON_MODULE = os.path.join(HDA_DIR, 'PythonModule.py')
+
+_MAGIC = b'INDX'
+
+
+def read_index(data):
+    """Parse an INDX archive into (header, [[name, data, mtime], ...])."""
+    if data[:4] != _MAGIC:
+        raise ValueError('Not an INDX archive')
+    first, second, count = struct.unpack('>III', data[4:16])
+    pos = 16
+    table = []
+    for _ in range(count):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        name = data[pos + 4:pos + 4 + length].decode('utf-8')
+        pos += 4 + length
+        offset, size, mtime = struct.unpack('>III', data[pos:pos + 12])
+        pos += 12
+        table.append((name, offset, size, mtime))
+    sections = [[name, data[pos + offset:pos + offset + size], mtime] for name, offset, size, mtime in table]
+    return (first, second), sections
+
+
+def write_index(header, sections):
+    """Build an INDX archive from read_index's result."""
+    table = b''
+    body = b''
+    for name, data, mtime in sections:
+        encoded = name.encode('utf-8')
+        table += struct.pack('>I', len(encoded)) + encoded + struct.pack('>III', len(body), len(data), mtime)
+        # Empty sections share the offset of the next one, as Houdini writes them.
+        body += data
+    return _MAGIC + struct.pack('>III', header[0], header[1], len(sections)) + table + body
+
+
+def _definition(sections):
+    """The (only) asset definition entry of the library."""
+    for entry in sections:
+        if '::' in entry[0]:
+            return entry
+    raise ValueError('No asset definition in the library')
+
+
+def read_sections(path=DEFAULT_HDA):
+    """{section name: bytes} of the asset definition."""
+    with open(path, 'rb') as f:
+        _, library = read_index(f.read())
+    _, sections = read_index(_definition(library)[1])
+    return dict((name, data) for name, data, _ in sections)
+
+
+def replace_sections(path, replacements):
+    """Write path with the given {section name: bytes} replaced."""
+    with open(path, 'rb') as f:
+        library_header, library = read_index(f.read())
+    definition = _definition(library)
+    header, sections = read_index(definition[1])
+    now = int(time.time())
+    names = [name for name, _, _ in sections]
+    for name, data in replacements.items():
+        if name not in names:
+            raise KeyError('No section %s in %s' % (name, path))
+        entry = sections[names.index(name)]
+        if entry[1] != data:
+            entry[1] = data
+            entry[2] = now
+    definition[1] = write_index(header, sections)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(write_index(library_header, library))
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--hda', default=DEFAULT_HDA)
+    sub = ap.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='list the sections of the asset definition')
+    extract = sub.add_parser('extract', help='print a section')
+    extract.add_argument('section')
+    replace = sub.add_parser('set', help='replace sections with file contents')
+    replace.add_argument('assignments', nargs='+', metavar='SECTION=FILE')
+    sub.add_parser('sync', help='copy PythonModule.py into the asset')
+    args = ap.parse_args()
+
+    if args.command == 'list':
+        for name, data in read_sections(args.hda).items():
+            print('%-24s %8d bytes' % (name, len(data)))
+    elif args.command == 'extract':
+        sys.stdout.buffer.write(read_sections(args.hda)[args.section])
+    elif args.command == 'set':
+        replacements = {}
+        for assignment in args.assignments:
+            name, filename = assignment.split('=', 1)
+            with open(filename, 'rb') as f:
+                replacements[name] = f.read()
+        replace_sections(args.hda, replacements)
+    elif args.command == 'sync':
+        with open(PYTHON_MODULE, 'rb') as f:
+            replace_sections(args.hda, {'PythonModule': f.read()})
+
+
+if __name__ == '__main__':
+    main()
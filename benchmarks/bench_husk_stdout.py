@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+"""Micro-benchmark for the Husk plugin's stdout handling.
+
+Replays husk logs through three ways of handling stdout in the plugin:
+
+    separate     before: four Deadline handlers, every match is a Python call
+                 that updates the Worker
+    every line   one '.*' handler: every line is a Python call into
+                 HuskOutput.HuskOutputParser
+    prefiltered  now: one handler with HuskOutput.PREFILTER_PATTERN, only
+                 matching lines are Python calls into the parser
+
+For each it prints the cost per log line of the regex filter (measured here
+with Python's re; Deadline runs it in .NET), the number of Python calls, the
+cost per log line of the Python side, and the number of Worker updates. The
+cost of one .NET to Python call can't be measured outside Deadline; pass an
+estimate with --call-us to include it in the total.
+
+Usage:
+    python benchmarks/bench_husk_stdout.py [husk_log.txt ...] [--repeat N] [--call-us US]
+
+Without log files a synthetic a6-verbosity log is generated. Deadline task
+logs can be used as-is; the "STDOUT: " prefix Deadline adds is stripped.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+import HuskOutput  # noqa: E402
+
+# The patterns the plugin registered as separate Deadline handlers before.
+OLD_PATTERNS = [
+    re.compile('ALF_PROGRESS ([0-9]+)'),
+    re.compile(r'\]\s+([0-9]*\.?[0-9]+)%'),
+    re.compile('Error:(.*)'),
+    re.compile('USD ERROR(.*)'),
+]
+
+
+def synthetic_log(frames=10, lines_per_frame=20000, seed=1):
+    """Roughly the mix husk prints with --verbose a6: mostly chatter, some progress."""
+    rng = random.Random(seed)
+    chatter = [
+        '[18:25:20] Loading texture /mnt/proj/tex/wood_diffuse.<UDIM>.rat',
+        '[18:25:20] Updating scene graph: /World/geo/tree_%d',
+        '[18:25:21] Render Stats: rays=%d',
+        '[18:25:21] BVH build for /World/geo/rock_%d',
+        '[18:25:21] Tile (%d, 12) complete',
+    ]
+    lines = []
+    for frame in range(frames):
+        lines.append('[18:25:19] Rendering frame %d' % (frame + 1))
+        for i in range(lines_per_frame):
+            r = rng.random()
+            pct = 100.0 * i / lines_per_frame
+            if r < 0.05:
+                lines.append('ALF_PROGRESS %d%%' % int(pct))
+            elif r < 0.10:
+                lines.append('[18:25:20]  %.1f%% (%d/21, %.1f%%)' % (pct, i % 21, pct))
+            else:
+                lines.append(rng.choice(chatter).replace('%d', str(i)))
+    return lines
+
+
+def read_logs(paths):
+    lines = []
+    for path in paths:
+        with open(path, 'r', errors='replace') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                idx = line.find('STDOUT: ')
+                lines.append(line[idx + 8:] if idx >= 0 else line)
+    return lines
+
+
+def filter_separate(lines):
+    """The matches of the old handlers: (pattern index, match) per match."""
+    return [(i, match) for line in lines for i, pattern in enumerate(OLD_PATTERNS)
+            for match in (pattern.search(line),) if match]
+
+
+def handle_separate(matches):
+    """One handler call per match; progress matches parse a number. Every call updates the Worker."""
+    def handler(index, match):
+        if index < 2:
+            float(match.group(1))
+        return 1
+    return sum(handler(index, match) for index, match in matches)
+
+
+_PREFILTER = re.compile(HuskOutput.PREFILTER_PATTERN)
+
+
+def filter_prefiltered(lines):
+    """The lines Deadline hands to the plugin's handler."""
+    return [line for line in lines if _PREFILTER.search(line)]
+
+
+def handle_lines(lines, seconds):
+    """Feed lines to HuskOutputParser, one call each.
+
+    The lines are replayed evenly over `seconds` of simulated time so the
+    throttle sees realistic timestamps instead of every line arriving at once.
+    """
+    step = seconds / max(1, len(lines))
+    now = [0.0]
+    parser = HuskOutput.HuskOutputParser(max_rate=2.0, min_delta=5.0, clock=lambda: now[0])
+    updates = 0
+    for i, line in enumerate(lines):
+        now[0] = i * step
+        update = parser.feed(line)
+        if update is not None:
+            # An update may carry both progress and status.
+            updates += (update[0] == 'error') or ((update[1] is not None) + (update[2] is not None))
+    return updates
+
+
+def best_time(func, arg, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def report(name, lines, filter_seconds, calls, python_seconds, updates, call_us):
+    n = float(len(lines))
+    filter_us = filter_seconds * 1e6 / n
+    python_us = python_seconds * 1e6 / n
+    total_us = filter_us + python_us + call_us * calls / n
+    print('%-12s %9.3f %9d %9.3f %9.3f %8d' % (name, filter_us, calls, python_us, total_us, updates))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('logs', nargs='*', help='recorded husk stdout or Deadline task logs')
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--seconds', type=float, default=60.0,
+                    help='render time the log is assumed to span, for the throttle clock')
+    ap.add_argument('--call-us', type=float, default=0.0,
+                    help='estimated cost of one Deadline (.NET) to Python handler call, in microseconds')
+    args = ap.parse_args()
+
+    lines = read_logs(args.logs) if args.logs else synthetic_log()
+    print('%d lines%s' % (len(lines), '' if args.logs else ' (synthetic)'))
+    print('%-12s %9s %9s %9s %9s %8s' % ('', 'filter', 'Python', 'Python', 'total', 'Worker'))
+    print('%-12s %9s %9s %9s %9s %8s' % ('', 'us/line', 'calls', 'us/line', 'us/line', 'updates'))
+
+    filter_seconds, matches = best_time(filter_separate, lines, args.repeat)
+    python_seconds, updates = best_time(handle_separate, matches, args.repeat)
+    report('separate', lines, filter_seconds, len(matches), python_seconds, updates, args.call_us)
+
+    python_seconds, updates = best_time(lambda subset: handle_lines(subset, args.seconds), lines, args.repeat)
+    report('every line', lines, 0.0, len(lines), python_seconds, updates, args.call_us)
+
+    filter_seconds, passed = best_time(filter_prefiltered, lines, args.repeat)
+    python_seconds, updates = best_time(lambda subset: handle_lines(subset, args.seconds), passed, args.repeat)
+    report('prefiltered', lines, filter_seconds, len(passed), python_seconds, updates, args.call_us)
+    if not args.call_us:
+        print('The totals leave out the .NET to Python call cost per Python call; see --call-us.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""Local stand-in for the Deadline Web Service, to test submissions offline.
+
+Serves the part of the Web Service API the submitters use:
+
+    GET  /                      the Web Service banner
+    POST /api/jobs              submit {"JobInfo", "PluginInfo", "AuxFiles", "IdOnly"}
+    GET  /api/jobs[?JobID=id]   submitted jobs
+
+Jobs are kept in memory and get 24-hex ids like real Deadline jobs. A job
+whose JobDependencies name an unknown id is rejected, so a submitter that
+links jobs in the wrong order fails here rather than on the farm.
+
+Usage:
+    python benchmarks/mock_webservice.py [--port 8081]
+    python benchmarks/mock_webservice.py --bench 50
+
+Point the HDA at it with HUSK_DEADLINE_WEBSERVICE=localhost:8081, or the
+Monitor submitter with the Husk plugin's Web Service Address setting.
+--bench submits jobs through HuskLib.WebService over one pooled connection,
+over a new connection per job, and from a new Python process per job (the
+per-job process start a deadlinecommand call pays), and prints jobs/sec.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+_LIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Submission')
+sys.path.insert(0, _LIB_DIR)
+
+from HuskLib import WebService  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this a kept-alive
+    # connection waits for the client's delayed ACK on every response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, fmt, *args)
+
+    def _reply(self, status, body):
+        data = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain' if isinstance(body, str) else 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/':
+            self._reply(200, 'This is the Deadline Web Service (mock)')
+        elif url.path == '/api/jobs':
+            ids = parse_qs(url.query).get('JobID')
+            with self.server.lock:
+                jobs = [job for job_id, job in self.server.jobs.items() if not ids or job_id in ids]
+            if ids and not jobs:
+                self._reply(404, 'Job not found')
+            else:
+                self._reply(200, jobs)
+        else:
+            self._reply(404, 'Not found')
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/api/jobs':
+            self._reply(404, 'Not found')
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+            job_info = body['JobInfo']
+            plugin_info = body['PluginInfo']
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, 'Bad submission: %s' % e)
+            return
+        for key in ('Plugin', 'Name'):
+            if not job_info.get(key):
+                self._reply(400, 'JobInfo has no %s' % key)
+                return
+        with self.server.lock:
+            dependencies = [d.strip() for d in job_info.get('JobDependencies', '').split(',') if d.strip()]
+            unknown = [d for d in dependencies if d not in self.server.jobs]
+            if unknown:
+                self._reply(400, 'Unknown job dependencies: %s' % ', '.join(unknown))
+                return
+            job_id = uuid.uuid4().hex[:24]
+            job = {'_id': job_id, 'Props': job_info, 'PluginInfo': plugin_info, 'AuxFiles': body.get('AuxFiles', [])}
+            self.server.jobs[job_id] = job
+        self._reply(200, {'_id': job_id} if body.get('IdOnly') else job)
+
+
+def serve(port=8081, host='127.0.0.1', verbose=False):
+    """Start the mock in a background thread and return the server.
+
+    Port 0 picks a free port (server.server_address[1]). Submitted jobs are
+    in server.jobs; server.shutdown() stops it.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.jobs = {}
+    server.lock = threading.Lock()
+    server.verbose = verbose
+    thread = threading.Thread(target=server.serve_forever, name='MockWebService')
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def _job(index, dependency=''):
+    job_info = {'Plugin': 'Husk', 'Name': 'bench %d' % index, 'Frames': '1-100', 'ChunkSize': 5,
+                'JobDependencies': dependency}
+    return job_info, {'SceneFile': '/mnt/proj/shot.usd', 'Renderer': 'Husk'}
+
+
+_SUBPROCESS_SUBMIT = '''
+import json, sys
+sys.path.insert(0, %r)
+from HuskLib import WebService
+job_info, plugin_info = json.loads(sys.argv[2])
+print(WebService.DeadlineWebService(sys.argv[1]).SubmitJob(job_info, plugin_info))
+''' % os.path.abspath(_LIB_DIR)
+
+
+def bench(address, count):
+    def run(label, submit):
+        previous = ''
+        start = time.perf_counter()
+        for i in range(count):
+            # Each job depends on the one before, like tile -> assembly -> cleanup.
+            previous = submit(*_job(i, previous))
+        seconds = time.perf_counter() - start
+        print('%-28s %6d jobs  %7.3f s  %8.1f jobs/s' % (label, count, seconds, count / seconds))
+
+    pooled = WebService.DeadlineWebService(address)
+    run('pooled connection', pooled.SubmitJob)
+    pooled.close()
+
+    def fresh_connection(job_info, plugin_info):
+        client = WebService.DeadlineWebService(address)
+        try:
+            return client.SubmitJob(job_info, plugin_info)
+        finally:
+            client.close()
+    run('connection per job', fresh_connection)
+
+    def fresh_process(job_info, plugin_info):
+        output = subprocess.check_output([sys.executable, '-c', _SUBPROCESS_SUBMIT, address,
+                                          json.dumps([job_info, plugin_info])])
+        return output.decode('utf-8').strip()
+    run('process per job', fresh_process)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--port', type=int, default=8081)
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--bench', type=int, default=0, metavar='N',
+                    help='submit N jobs per method against a private mock on a free port, then exit')
+    ap.add_argument('--verbose', action='store_true', help='log every request')
+    args = ap.parse_args()
+
+    if args.bench:
+        server = serve(0, args.host)
+        try:
+            bench('%s:%d' % (args.host, server.server_address[1]), args.bench)
+        finally:
+            server.shutdown()
+        return
+
+    server = serve(args.port, args.host, verbose=args.verbose)
+    print('Mock Deadline Web Service on http://%s:%d/ (Ctrl+C to stop)' % (args.host, server.server_address[1]))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print('%d jobs submitted.' % len(server.jobs))
+
+
+if __name__ == '__main__':
+    main()
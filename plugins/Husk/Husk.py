@@ -2,8 +2,29 @@
 
 from Deadline.Plugins import DeadlinePlugin, PluginType
 from Deadline.Scripting import FileUtils, SystemUtils, RepositoryUtils, FrameUtils, StringUtils
+from System import DateTime, DateTimeKind
+import contextlib
+import json
 import os
 import platform
+import re
+import shutil
+import sys
+import time
+
+# Helper modules ship next to this plugin file.
+_pluginDir = os.path.dirname(os.path.abspath(__file__))
+if _pluginDir not in sys.path:
+	sys.path.append(_pluginDir)
+
+import HuskCache
+import HuskFrames
+import HuskImageCheck
+import HuskOutput
+import HuskPartition
+import HuskProcessMonitor
+import HuskRemap
+import HuskTelemetry
 
 def GetDeadlinePlugin():
 	"""This is the function that Deadline calls to get an instance of the
@@ -27,6 +48,9 @@ class HuskPlugin(DeadlinePlugin):
 		self.RenderExecutableCallback += self.RenderExecutable
 		self.RenderArgumentCallback += self.RenderArgument
 		self.RenderTasksCallback += self.RenderTasks
+		self.PreRenderTasksCallback += self.PreRenderTasks
+		self.PostRenderTasksCallback += self.PostRenderTasks
+		self.CheckExitCodeCallback += self.CheckExitCode
 		
 		
 	# ---------- ENV HELPERS ----------
@@ -114,6 +138,37 @@ class HuskPlugin(DeadlinePlugin):
 			redacted = ("*" * 8) if any(s in k.upper() for s in ("PASS", "TOKEN", "SECRET", "KEY")) else v
 			self.LogInfo("ENV set for render process: {}={}".format(k, redacted))
 
+	def _pin_gpus(self):
+		"""Give this Worker thread its own GPUs when the job runs concurrent tasks.
+
+		The device list comes from GPUDevices (or nvidia-smi), an explicit
+		GPUThreadMapping wins over the even split. Each GPUDeviceVariables line
+		(NAME={devices}) is set for the render process.
+		"""
+		thread = self.GetThreadNumber()
+		concurrent = max(1, int(self.GetJob().JobConcurrentTasks))
+
+		mapping = HuskPartition.parse_mapping(self.GetConfigEntryWithDefault('GPUThreadMapping', ''))
+		if thread in mapping:
+			devices = mapping[thread]
+		else:
+			available = HuskPartition.parse_list(self.GetConfigEntryWithDefault('GPUDevices', ''))
+			if not available:
+				available = HuskPartition.detect_gpus()
+			if not available:
+				self.LogWarning('GPU pinning: no GPUs configured or found with nvidia-smi; using all devices.')
+				return
+			try:
+				perTask = int(self.GetConfigEntryWithDefault('GPUsPerTask', '0'))
+			except ValueError:
+				perTask = 0
+			devices = HuskPartition.split_devices(available, concurrent, thread, perTask)
+
+		templates = self.GetConfigEntryWithDefault('GPUDeviceVariables', 'CUDA_VISIBLE_DEVICES={devices}')
+		for k, v in HuskPartition.device_environment(templates, devices).items():
+			self.SetProcessEnvironmentVariable(k, v)
+			self.LogInfo('GPU pinning for thread {} of {}: {}={}'.format(thread, concurrent, k, v))
+
 	def Cleanup(self):
 		for stdoutHandler in self.StdoutHandlers:
 			del stdoutHandler.HandleCallback
@@ -122,7 +177,12 @@ class HuskPlugin(DeadlinePlugin):
 		del self.RenderExecutableCallback
 		del self.RenderArgumentCallback
 		del self.RenderTasksCallback
+		del self.PreRenderTasksCallback
+		del self.PostRenderTasksCallback
+		del self.CheckExitCodeCallback
 
+		if getattr(self, '_monitor', None) is not None:
+			self._monitor.stop()
 	
 
 	def InitializeProcess(self):
@@ -133,32 +193,65 @@ class HuskPlugin(DeadlinePlugin):
 			self.PluginType = PluginType.Advanced
 			return
 
+		# Opt-in timing of the plugin's own phases (see _timed/_write_phase_timing).
+		self._phaseTiming = self._get_bool('PhaseTiming', self._config_bool('PhaseTiming'))
+		self._phaseTimer = HuskTelemetry.PhaseTimer() if self._phaseTiming else None
+
 		# Set env exactly once when the managed process is being initialized
-		self._set_env_vars()
+		with self._timed('environment'):
+			self._set_env_vars()
+			if self._get_bool('GPUPinning', self._config_bool('GPUPinning')):
+				self._pin_gpus()
 
 		# Set the plugin specific settings.
 		self.SingleFramesOnly = False  # Allow multi-frame chunks
 		self.StdoutHandling = True
 		self.PluginType = PluginType.Simple
 
-		# husk's bracketed "[HH:MM:SS] 39.9% (...)" line is the authoritative
-		# overall progress. ALF_PROGRESS accumulates per tile and overshoots 100%,
-		# so once we've seen a real percentage we stop trusting ALF_PROGRESS.
-		self._sawRealProgress = False
-
-		# Progress updates
-		self.AddStdoutHandlerCallback('ALF_PROGRESS ([0-9]+)').HandleCallback += self.HandleStdoutProgress
-		# Authoritative overall percentage, e.g. "[18:25:20]  39.9% (9/21, 40.0%)"
-		self.AddStdoutHandlerCallback(r'\]\s+([0-9]*\.?[0-9]+)%').HandleCallback += self.HandleStdoutPercentage
-		# Detect Errors
-		self.AddStdoutHandlerCallback('Error:(.*)').HandleCallback += self.HandleStdoutError
-		self.AddStdoutHandlerCallback('USD ERROR(.*)').HandleCallback += self.HandleStdoutError
+		# One stdout handler instead of one per pattern (see HuskOutput). Deadline
+		# matches its prefilter regex natively, so the chatter of high verbosity
+		# levels never reaches Python; the lines that do are classified once, and
+		# progress/status updates are coalesced so they don't flood the Worker.
+		try:
+			maxRate = float(self.GetConfigEntryWithDefault('ProgressUpdateRate', '2'))
+			minDelta = float(self.GetConfigEntryWithDefault('ProgressUpdateDelta', '5'))
+		except ValueError:
+			maxRate, minDelta = 2.0, 5.0
+		self._outputParser = HuskOutput.HuskOutputParser(maxRate, minDelta)
+		self._frameStats = None
+		self._skipTask = False
+		self._resumeFrames = None
+		self._checkpointFiles = []
+		self._watchdog = None
+		self._memoryWatch = None
+		self._monitor = None
+		self._stopReason = None
+		self._stoppedPids = None
+		self._killGrace = 30.0
+		self._tileGrid = None
+
+		self.AddStdoutHandlerCallback(HuskOutput.PREFILTER_PATTERN).HandleCallback += self.HandleStdoutLine
 
 	def _get_bool(self, key, default=False):
 		"""Read a plugin-info entry as a boolean, tolerating missing keys."""
 		val = self.GetPluginInfoEntryWithDefault(key, str(default))
 		return str(val).strip().lower() in ('1', 'true', 'yes', 'on')
 
+	def _config_bool(self, key, default=False):
+		"""Read a plugin configuration (.param) entry as a boolean."""
+		val = self.GetConfigEntryWithDefault(key, str(default))
+		return str(val).strip().lower() in ('1', 'true', 'yes', 'on')
+
+	def _timed(self, name):
+		"""Context manager timing a plugin phase when phase timing is enabled."""
+		if self._phaseTimer is None:
+			return contextlib.nullcontext()
+		return self._phaseTimer.phase(name)
+
+	def _mark_phase(self, name):
+		if self._phaseTimer is not None:
+			self._phaseTimer.mark(name)
+
 	def _husk_dir(self):
 		"""Return the directory containing the configured husk executable."""
 		huskExecList = self.GetConfigEntry('HuskRenderExecutable')
@@ -172,6 +265,18 @@ class HuskPlugin(DeadlinePlugin):
 		return huskExec, os.path.dirname(huskExec)
 
 	def RenderExecutable(self):
+		# InitializeProcess runs once per Worker thread, so the environment phase
+		# is only part of the first task's timing. Later tasks start a new timer.
+		if self._phaseTiming and (self._phaseTimer is None or self._phaseTimer.reported):
+			self._phaseTimer = HuskTelemetry.PhaseTimer()
+		with self._timed('executable_lookup'):
+			return self._render_executable()
+
+	def _render_executable(self):
+		self._launchPrefix = ''
+		self._taskCpus = None
+		if self._skipTask:
+			return self._noop_executable()
 		# Assembly tasks use itilestitch, which ships alongside husk in the Houdini
 		# bin directory. Resolving it relative to the configured husk path means the
 		# correct per-OS executable is used on a mixed farm without extra config.
@@ -184,8 +289,62 @@ class HuskPlugin(DeadlinePlugin):
 			return stitchExec
 
 		huskExec, _ = self._husk_dir()
+		if self._get_bool('NUMAPinning', self._config_bool('NUMAPinning')):
+			return self._numa_launcher(huskExec)
 		return huskExec
 
+	def _numa_launcher(self, huskExec):
+		"""Return numactl (or taskset) to start husk pinned to this thread's CPUs.
+
+		The husk path and pinning options go in front of the arguments
+		(_launchPrefix). Falls back to plain husk where pinning isn't possible.
+		"""
+		if self._detect_os() != 'Linux':
+			self.LogWarning('NUMA pinning is only supported on Linux Workers.')
+			return huskExec
+		thread = self.GetThreadNumber()
+		concurrent = max(1, int(self.GetJob().JobConcurrentTasks))
+		nodes, cpus = HuskPartition.cpu_partition(HuskPartition.numa_nodes(), concurrent, thread)
+		if not cpus:
+			self.LogWarning('NUMA pinning: no NUMA topology found, husk is not pinned.')
+			return huskExec
+
+		cpuList = HuskPartition.format_cpulist(cpus)
+		numactl = shutil.which('numactl')
+		taskset = shutil.which('taskset')
+		if numactl:
+			# Bind memory to the same nodes so the process doesn't allocate remotely.
+			self._launchPrefix = '--physcpubind={} --membind={} -- "{}" '.format(cpuList, ','.join(str(n) for n in nodes), huskExec)
+			launcher = numactl
+		elif taskset:
+			self._launchPrefix = '-c {} "{}" '.format(cpuList, huskExec)
+			launcher = taskset
+		else:
+			self.LogWarning('NUMA pinning needs numactl or taskset on the Worker, husk is not pinned.')
+			return huskExec
+		self._taskCpus = cpus
+		self.LogInfo('NUMA pinning for thread {} of {}: node(s) {}, CPUs {}'.format(thread, concurrent, ','.join(str(n) for n in nodes), cpuList))
+		return launcher
+
+	def _thread_arguments(self, customargs):
+		"""husk --threads for this task's share of the Worker's CPUs."""
+		if not self._get_bool('CPUPartitioning', self._config_bool('CPUPartitioning')):
+			return ''
+		if re.search(r'(^|\s)(-j|--threads)(\s|=|$)', customargs):
+			return ''
+		try:
+			perTask = int(self.GetConfigEntryWithDefault('ThreadsPerTask', '0'))
+		except ValueError:
+			perTask = 0
+		if self._taskCpus:
+			# Already pinned: use the CPUs of this task's partition.
+			threads = HuskPartition.thread_budget(len(self._taskCpus), 1, perTask)
+		else:
+			concurrent = max(1, int(self.GetJob().JobConcurrentTasks))
+			threads = HuskPartition.thread_budget(HuskPartition.available_cores(), concurrent, perTask)
+		self.LogInfo('Render threads for this task: {}'.format(threads))
+		return '--threads {} '.format(threads)
+
 	def _tile_filename(self, outFile, tileIndex):
 		"""Insert husk's --tile-suffix token before the extension for a given tile.
 
@@ -200,6 +359,47 @@ class HuskPlugin(DeadlinePlugin):
 			expanded = '_tile{}'.format(tileIndex)
 		return root + expanded + ext
 
+	def _expand_frame(self, path, frame):
+		"""Expand $F/$F4 and #### frame tokens in an output path for one frame."""
+		frame = int(float(frame))
+
+		def pad(width):
+			return '-' + str(abs(frame)).zfill(width) if frame < 0 else str(frame).zfill(width)
+
+		path = re.sub(r'\$\{?F(\d*)(?![A-Za-z_])\}?', lambda m: pad(int(m.group(1) or 1)), path)
+		return re.sub(r'#+', lambda m: pad(len(m.group(0))), path)
+
+	def _tile_task(self):
+		"""Return (frame, tileIndex) for the current tile render/assembly/cleanup task.
+
+		Tile jobs enumerate a tile x frame matrix: task N renders tile N % tiles of
+		the (N // tiles)-th entry in RenderFrames. Assembly and cleanup tasks use
+		the first task number of each frame, so they decode to tile 0 of their frame.
+		Jobs submitted before RenderFrames existed carry a single RenderFrame.
+		"""
+		taskNumber = self.GetStartFrame()
+		tilesX = int(self.GetPluginInfoEntryWithDefault('TilesX', '1'))
+		tilesY = int(self.GetPluginInfoEntryWithDefault('TilesY', '1'))
+		totalTiles = max(1, tilesX * tilesY)
+
+		frames = [f.strip() for f in self.GetPluginInfoEntryWithDefault('RenderFrames', '').split(',') if f.strip()]
+		if not frames:
+			return self.GetPluginInfoEntryWithDefault('RenderFrame', str(taskNumber)), taskNumber
+
+		frameIndex = taskNumber // totalTiles
+		if frameIndex >= len(frames):
+			self.FailRender('Task {} is outside the tile x frame range ({} frames x {} tiles).'.format(taskNumber, len(frames), totalTiles))
+		return frames[frameIndex], taskNumber % totalTiles
+
+	def _tile_output(self):
+		"""Return (frame, tileIndex, outFile) with the output path expanded for the task's frame."""
+		outFile = self.GetPluginInfoEntry('ImageOutputDirectory')
+		outFile = RepositoryUtils.CheckPathMapping(outFile)
+		outFile = outFile.replace('\\', '/').strip('"')
+
+		frame, tileIndex = self._tile_task()
+		return frame, tileIndex, self._expand_frame(outFile, frame)
+
 	def RenderTasks(self):
 		"""Advanced-plugin entry point. Only the cleanup job uses this path:
 		it deletes the per-tile image files after assembly has completed.
@@ -208,9 +408,8 @@ class HuskPlugin(DeadlinePlugin):
 		if not self._get_bool('CleanupJob'):
 			return
 
-		outFile = self.GetPluginInfoEntry('ImageOutputDirectory')
-		outFile = RepositoryUtils.CheckPathMapping(outFile)
-		outFile = outFile.replace('\\', '/').strip('"')
+		frame, _, outFile = self._tile_output()
+		self.LogInfo('Cleaning up tiles of frame {}'.format(frame))
 
 		tilesX = int(self.GetPluginInfoEntryWithDefault('TilesX', '1'))
 		tilesY = int(self.GetPluginInfoEntryWithDefault('TilesY', '1'))
@@ -234,15 +433,30 @@ class HuskPlugin(DeadlinePlugin):
 
 	def AssemblyArgument(self):
 		"""Build the itilestitch command line: <output> <tile0> <tile1> ..."""
-		outFile = self.GetPluginInfoEntry('ImageOutputDirectory')
-		outFile = RepositoryUtils.CheckPathMapping(outFile)
-		outFile = outFile.replace('\\', '/').strip('"')
+		frame, _, outFile = self._tile_output()
 
 		tilesX = int(self.GetPluginInfoEntryWithDefault('TilesX', '1'))
 		tilesY = int(self.GetPluginInfoEntryWithDefault('TilesY', '1'))
 		totalTiles = tilesX * tilesY
 
 		tileFiles = [self._tile_filename(outFile, i) for i in range(totalTiles)]
+		minTime = self._job_submit_time()
+
+		# Stitching a missing or truncated tile either fails late or silently
+		# writes a broken frame. Check all tiles first and send only the bad
+		# ones back to the render job.
+		badTiles = []
+		for tileIndex, tileFile in enumerate(tileFiles):
+			ok, reason = HuskImageCheck.check_image(tileFile, minTime)
+			if not ok:
+				badTiles.append((tileIndex, tileFile, reason))
+		if badTiles:
+			requeued = self._requeue_tiles([tileIndex for tileIndex, _, _ in badTiles])
+			report = '\n'.join('  tile {}: {} ({})'.format(i, f, reason) for i, f, reason in badTiles)
+			self.FailRender('{} of {} tiles of frame {} are not usable:\n{}\n{}'.format(
+				len(badTiles), totalTiles, frame, report,
+				'Requeued render tasks {}; this frame is assembled once they have finished.'.format(','.join(requeued))
+				if requeued else 'The render tasks of these tiles could not be requeued automatically.'))
 
 		# itilestitch refuses to overwrite an existing output and still exits 0,
 		# leaving a stale (possibly corrupt) frame in place on a requeue. Remove
@@ -254,13 +468,505 @@ class HuskPlugin(DeadlinePlugin):
 			except OSError as e:
 				self.FailRender('Could not remove existing assembled image "{}": {}'.format(outFile, e))
 
-		self.LogInfo('Assembling {} tiles into: {}'.format(totalTiles, outFile))
+		self.LogInfo('Assembling {} tiles of frame {} into: {}'.format(totalTiles, frame, outFile))
 
 		arguments = '"{}"'.format(outFile)
 		for tf in tileFiles:
 			arguments += ' "{}"'.format(tf)
 		return arguments
 
+	def _requeue_tiles(self, tileIndices):
+		"""Delete and requeue the given tiles of this assembly task's frame in the render job.
+
+		Returns the requeued task ids. Render task N is tile N % tiles of frame
+		N // tiles, and the assembly task number is the frame's first render task.
+		"""
+		tilesX = int(self.GetPluginInfoEntryWithDefault('TilesX', '1'))
+		tilesY = int(self.GetPluginInfoEntryWithDefault('TilesY', '1'))
+		totalTiles = max(1, tilesX * tilesY)
+		firstTask = (self.GetStartFrame() // totalTiles) * totalTiles
+
+		renderJobId = self.GetPluginInfoEntryWithDefault('TileRenderJobId', '').strip()
+		if not renderJobId:
+			dependencies = list(self.GetJob().JobDependencyIDs)
+			renderJobId = dependencies[0] if dependencies else ''
+		if not renderJobId:
+			return []
+
+		_, _, outFile = self._tile_output()
+		for tileIndex in tileIndices:
+			tileFile = self._tile_filename(outFile, tileIndex)
+			if os.path.isfile(tileFile):
+				try:
+					os.remove(tileFile)
+				except OSError as e:
+					self.LogWarning('Could not remove bad tile "{}": {}'.format(tileFile, e))
+
+		taskIds = set(str(firstTask + tileIndex) for tileIndex in tileIndices)
+		try:
+			renderJob = RepositoryUtils.GetJob(renderJobId, True)
+			tasks = [task for task in RepositoryUtils.GetJobTasks(renderJob, True).TaskCollectionTasks if str(task.TaskId) in taskIds]
+			RepositoryUtils.RequeueTasks(renderJob, tasks)
+		except Exception as e:
+			self.LogWarning('Could not requeue tile tasks of job {}: {}'.format(renderJobId, e))
+			return []
+		return sorted((str(task.TaskId) for task in tasks), key=int)
+
+	def _task_frames(self):
+		"""Return the frames of the current task, in the order Deadline lists them."""
+		frames = []
+		try:
+			frames = [int(f) for f in self.GetCurrentTask().TaskFrameList]
+		except:
+			pass
+		if not frames:
+			# Older Deadline versions: the job's frames that fall inside the task range.
+			startFrame = self.GetStartFrame()
+			endFrame = self.GetEndFrame()
+			frames = [int(f) for f in self.GetJob().JobFramesList if startFrame <= int(f) <= endFrame]
+			if not frames:
+				frames = list(range(startFrame, endFrame + 1))
+		return frames
+
+	def _scene_for_task(self, usdFile):
+		"""Expand a per-frame scene file ($F4 or ####, e.g. from a farm-side export) for the task's frame."""
+		self._perFrameScene = bool(re.search(r'\$\{?F\d*(?![A-Za-z_])|#', usdFile))
+		if not self._perFrameScene:
+			return usdFile
+		if self._get_bool('TileRendering'):
+			frame = self._tile_task()[0]
+		else:
+			frames = self._task_frames()
+			if len(frames) > 1:
+				self.FailRender('The scene file "{}" has one file per frame, but this task renders {} frames. '
+					'Submit the job with a chunk size of 1.'.format(usdFile, len(frames)))
+			frame = frames[0]
+		return self._expand_frame(usdFile, frame)
+
+	def _job_submit_time(self):
+		"""The job's submission time as a Unix timestamp, or None if it can't be read."""
+		try:
+			submitted = self.GetJob().JobSubmitDateTime.ToUniversalTime()
+			return (submitted - DateTime(1970, 1, 1, 0, 0, 0, DateTimeKind.Utc)).TotalSeconds
+		except Exception:
+			return None
+
+	def _frames_to_render(self, outFile, frames):
+		"""Resume: drop frames whose output already exists and is a complete image.
+
+		Only images written after the job was submitted count, so a resubmitted
+		job doesn't pick up frames of an older render in the same location.
+		"""
+		paths = [self._expand_frame(outFile, frame) for frame in frames]
+		if len(frames) > 1 and len(set(paths)) != len(paths):
+			self.LogWarning('Resume needs a frame number ($F or ####) in the output path; rendering all frames.')
+			return frames
+
+		minTime = self._job_submit_time()
+		remaining = []
+		done = []
+		for frame, path in zip(frames, paths):
+			ok, reason = HuskImageCheck.check_image(path, minTime)
+			if ok:
+				done.append(frame)
+				continue
+			if reason != 'missing':
+				self.LogInfo('Frame {} output "{}" is not usable ({}), rendering it again.'.format(frame, path, reason))
+			remaining.append(frame)
+		if done:
+			self.LogInfo('Resume: skipping frames with valid output: {}'.format(','.join(str(f) for f in done)))
+		return remaining
+
+	def PreRenderTasks(self):
+		"""Decide whether the task has anything left to do (Resume)."""
+		self._resumeFrames = None
+		self._skipTask = False
+		if self._get_bool('CleanupJob'):
+			return
+		reason = self._skip_reason() if self._get_bool('Resume', self._config_bool('Resume')) else ''
+		self._skipTask = bool(reason)
+		if reason:
+			self.LogInfo(reason + ' Finishing the task without rendering.')
+
+	def _skip_reason(self):
+		"""Why the task needs no render or stitch because its output is complete, or ''."""
+		minTime = self._job_submit_time()
+		if self._get_bool('AssemblyJob'):
+			frame, _, outFile = self._tile_output()
+			if HuskImageCheck.check_image(outFile, minTime)[0]:
+				return 'Frame {} is already assembled: {}'.format(frame, outFile)
+		elif self._get_bool('TileRendering'):
+			frame, tileIndex, outFile = self._tile_output()
+			tileFile = self._tile_filename(outFile, tileIndex)
+			if HuskImageCheck.check_image(tileFile, minTime)[0]:
+				return 'Tile {} of frame {} already has a valid image: {}'.format(tileIndex, frame, tileFile)
+		else:
+			outFile = RepositoryUtils.CheckPathMapping(self.GetPluginInfoEntry('ImageOutputDirectory'))
+			self._resumeFrames = self._frames_to_render(outFile.replace('\\', '/').strip('"'), self._task_frames())
+			if not self._resumeFrames:
+				return 'All frames of this task already have valid output images.'
+		return ''
+
+	def _noop_executable(self):
+		"""A process that exits 0 at once, for tasks with nothing left to do.
+
+		A Simple plugin always starts a process after PreRenderTasks; only the
+		job-wide plugin type (set in InitializeProcess) could avoid that. So a
+		skipped task starts the shell's no-op instead of husk or itilestitch,
+		with RenderArgument returning its arguments.
+		"""
+		if self._detect_os() == 'Windows':
+			return os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'System32', 'cmd.exe')
+		return '/bin/true'
+
+	def CheckExitCode(self, exitCode):
+		self._stop_monitor()
+		if self._skipTask:
+			return
+		self._report_stop()
+		self._record_memory(exitCode)
+		if self._stopReason:
+			self.FailRender(self._stopReason)
+		if exitCode != 0:
+			self.FailRender('Process returned non-zero exit code: {}'.format(exitCode))
+		self._clear_memory_record()
+
+	def _config_minutes(self, key, default):
+		try:
+			return max(0.0, float(self.GetConfigEntryWithDefault(key, str(default)))) * 60.0
+		except ValueError:
+			return default * 60.0
+
+	def _start_monitor(self):
+		"""Start the stall and memory watchdogs for the husk process about to be launched.
+
+		The process is tagged with a marker environment variable so the monitor
+		thread can find it (see HuskProcessMonitor).
+		"""
+		self._stop_monitor()
+		self._stopReason = None
+		self._stoppedPids = None
+		self._memoryWatch = None
+		if self._skipTask or self._get_bool('AssemblyJob'):
+			return
+		stall = self._get_bool('StallWatchdog', self._config_bool('StallWatchdog'))
+		memory = self._get_bool('MemoryWatchdog', self._config_bool('MemoryWatchdog'))
+		if not stall and not memory:
+			return
+
+		if stall:
+			self._watchdog = HuskProcessMonitor.StallWatchdog(
+				self._config_minutes('StallOutputMinutes', 30),
+				self._config_minutes('StallLoadMinutes', 60),
+				self._config_minutes('StallProgressMinutes', 30))
+			self._outputParser.listener = HuskOutput.ListenerGroup(self._frameStats, self._watchdog)
+		if memory:
+			self._memoryWatch = HuskProcessMonitor.MemoryWatch(
+				self._memory_limit(),
+				self._config_percent('MemoryNearLimitPercent', 90),
+				self._config_percent('MemoryStopPercent', 0))
+
+		# Unique per attempt, a requeued task may run again on the same thread.
+		self._processMarker = '{}_{}_{}_{}'.format(self.GetJob().JobId, self.GetCurrentTaskId(), self.GetThreadNumber(), int(time.time() * 1000))
+		self._processRoots = []
+		self.SetProcessEnvironmentVariable(HuskProcessMonitor.MARKER_VARIABLE, self._processMarker)
+		# Read here: the monitor thread doesn't call the plugin API.
+		try:
+			self._killGrace = float(self.GetConfigEntryWithDefault('StallKillGraceSeconds', '30'))
+		except ValueError:
+			self._killGrace = 30.0
+		# Memory spikes need closer sampling than stalls.
+		self._monitor = HuskProcessMonitor.MonitorThread(self._poll_monitor, 5.0 if memory else 15.0)
+		self._monitor.start()
+
+	def _stop_monitor(self):
+		if self._monitor is not None:
+			self._monitor.stop()
+			# A kill in progress finishes before the task's result is reported.
+			self._monitor.join(self._killGrace + 10.0)
+			self._monitor = None
+		if self._watchdog is not None:
+			self._watchdog = None
+			self._outputParser.listener = self._frameStats
+
+	def _config_percent(self, key, default):
+		try:
+			return max(0.0, float(self.GetConfigEntryWithDefault(key, str(default)))) / 100.0
+		except ValueError:
+			return default / 100.0
+
+	def _memory_limit(self):
+		"""Memory this task may use: MemoryLimitGB, or the Worker's memory shared by the concurrent tasks."""
+		try:
+			limit = float(self.GetConfigEntryWithDefault('MemoryLimitGB', '0')) * 1024 ** 3
+		except ValueError:
+			limit = 0
+		if limit > 0:
+			return int(limit)
+		return HuskProcessMonitor.memory_limit() // max(1, int(self.GetJob().JobConcurrentTasks))
+
+	def _process_tree(self):
+		if not self._processRoots:
+			self._processRoots = [pid for pid in HuskProcessMonitor.find_marked(self._processMarker) if pid != os.getpid()]
+		return HuskProcessMonitor.process_tree(self._processRoots) if self._processRoots else []
+
+	def _poll_monitor(self):
+		"""Runs on the monitor thread. Returns True once the process was stopped.
+
+		Deadline's plugin API isn't thread-safe, so nothing here calls it: the
+		thread only records what happened (memoryWatch, _stopReason,
+		_stoppedPids) and kills husk; CheckExitCode logs it on the plugin thread.
+		"""
+		memoryWatch = self._memoryWatch
+		if memoryWatch is not None:
+			pids = self._process_tree()
+			if pids:
+				rss = HuskProcessMonitor.tree_rss(pids)
+				if memoryWatch.sample(rss) == 'stop':
+					return self._stop_process('Memory limit: husk used {} of {}.'.format(
+						HuskProcessMonitor.format_bytes(rss), HuskProcessMonitor.format_bytes(memoryWatch.limit)))
+
+		watchdog = self._watchdog
+		if watchdog is not None:
+			# Lines the stdout prefilter drops never reach the plugin; the bytes
+			# husk has written tell whether it printed anything at all.
+			pids = self._process_tree()
+			if pids:
+				watchdog.activity(HuskProcessMonitor.tree_output_bytes(pids))
+			reason = watchdog.check()
+			if reason is not None:
+				return self._stop_process(watchdog.describe(reason))
+		return False
+
+	def _stop_process(self, reason):
+		"""Runs on the monitor thread: record the reason and kill the husk process tree."""
+		# Set before the kill: CheckExitCode fails the task with it once husk exits.
+		self._stopReason = reason
+		pids = self._process_tree()
+		self._stoppedPids = HuskProcessMonitor.kill_tree(self._processRoots, self._killGrace) if pids else []
+		return True
+
+	def _report_stop(self):
+		"""Log on the plugin thread why and how the monitor thread stopped husk."""
+		if not self._stopReason:
+			return
+		self.LogWarning(self._stopReason)
+		if self._stoppedPids:
+			self.LogWarning('Stopped husk process tree {}.'.format(', '.join(str(pid) for pid in self._stoppedPids)))
+		elif self._stoppedPids is not None:
+			self.LogWarning('Could not find the husk process to stop it.')
+
+	def _memory_record_file(self):
+		return os.path.join(self._job_shared_dir(), 'husk_memory', 'task{}.json'.format(self.GetCurrentTaskId()))
+
+	def _record_memory(self, exitCode):
+		"""Log the task's peak memory and remember attempts that ran out of memory.
+
+		An attempt counts as out of memory when it came near the limit, or was
+		killed with SIGKILL (the Linux OOM killer) without a watchdog reason.
+		"""
+		memoryWatch = self._memoryWatch
+		self._memoryWatch = None
+		if memoryWatch is None:
+			return
+		self.LogInfo('Peak memory of the husk process tree: {} (limit {}).'.format(
+			HuskProcessMonitor.format_bytes(memoryWatch.peak), HuskProcessMonitor.format_bytes(memoryWatch.limit)))
+		if memoryWatch.near:
+			self.LogWarning('husk came near the {} memory limit.'.format(HuskProcessMonitor.format_bytes(memoryWatch.limit)))
+
+		oomKilled = exitCode in (-9, 137) and not self._stopReason
+		if not (memoryWatch.near or oomKilled):
+			return
+		if self._get_bool('TileRendering'):
+			# Tile tasks already render one tile each; there is no --autotile fallback for them.
+			self.LogWarning('This attempt ran out of memory or came close; tile renders are retried unchanged.')
+			return
+		record = {
+			'task_id': self.GetCurrentTaskId(),
+			'worker': self.GetSlaveName(),
+			'peak_rss_bytes': memoryWatch.peak,
+			'limit_bytes': memoryWatch.limit,
+			'exit_code': exitCode,
+			'tile_count': self._tileGrid,
+		}
+		recordFile = self._memory_record_file()
+		try:
+			HuskTelemetry.write_json(recordFile, record)
+			self.LogWarning('This attempt ran out of memory or came close; the next attempt of the task renders with --autotile.')
+		except (IOError, OSError) as e:
+			self.LogWarning('Could not write memory record "{}": {}'.format(recordFile, e))
+
+	def _clear_memory_record(self):
+		"""The task succeeded: a later requeue of it starts without the autotile fallback.
+
+		Records of tasks that never succeed stay in the job's shared folder.
+		"""
+		if not self._get_bool('MemoryWatchdog', self._config_bool('MemoryWatchdog')):
+			return
+		recordFile = self._memory_record_file()
+		if os.path.isfile(recordFile):
+			try:
+				os.remove(recordFile)
+			except OSError as e:
+				self.LogWarning('Could not remove memory record "{}": {}'.format(recordFile, e))
+
+	def _memory_fallback(self, customargs):
+		"""Add a finer --autotile grid when an earlier attempt of this task ran out of memory."""
+		self._tileGrid = HuskProcessMonitor.autotile_grid(customargs)
+		if not self._get_bool('MemoryWatchdog', self._config_bool('MemoryWatchdog')):
+			return customargs
+		try:
+			with open(self._memory_record_file()) as f:
+				record = json.load(f)
+		except (IOError, OSError, ValueError):
+			return customargs
+		try:
+			maximum = int(self.GetConfigEntryWithDefault('MemoryMaxTileCount', '8'))
+		except ValueError:
+			maximum = 8
+		previous = record.get('tile_count')
+		grid = HuskProcessMonitor.finer_grid(tuple(previous) if previous else self._tileGrid, maximum)
+		self.LogInfo('An earlier attempt of this task peaked at {}: rendering with --autotile --tile-count {} {}.'.format(
+			HuskProcessMonitor.format_bytes(record.get('peak_rss_bytes', 0)), grid[0], grid[1]))
+		self._tileGrid = list(grid)
+		return HuskProcessMonitor.set_autotile(customargs, grid)
+
+	def _checkpoint_arguments(self, frames, tileIndex=None):
+		"""Karma checkpoint arguments for long frames (Checkpoint Arguments set).
+
+		Checkpoints are written to a job-scoped folder, one file per frame (and
+		tile), so a requeued or preempted task continues from the last checkpoint
+		instead of sample zero. The husk arguments are templates from the plugin
+		configuration: {interval} is the checkpoint interval in seconds and
+		{checkpoint} the checkpoint path, with $F4 for the frame number.
+
+		There are no default templates, and no per-job toggle: husk's
+		--snapshot flags only save the in-progress image, which a render can't
+		continue from, so nothing happens until an administrator sets them.
+		"""
+		self._checkpointFiles = []
+		template = self.GetConfigEntryWithDefault('CheckpointArguments', '').strip()
+		if not template:
+			return ''
+
+		checkpointDir = os.path.join(self._job_shared_dir(), 'husk_checkpoints').replace('\\', '/')
+		name = 'frame_$F4' + ('_tile{}'.format(tileIndex) if tileIndex is not None else '')
+		checkpoint = '{}/{}.exr'.format(checkpointDir, name)
+		if not os.path.isdir(checkpointDir):
+			try:
+				os.makedirs(checkpointDir)
+			except OSError as e:
+				self.LogWarning('Could not create checkpoint folder "{}", rendering without checkpoints: {}'.format(checkpointDir, e))
+				return ''
+
+		values = {
+			'interval': self.GetConfigEntryWithDefault('CheckpointInterval', '900').strip(),
+			'checkpoint': checkpoint,
+		}
+		arguments = template.format(**values) + ' '
+
+		self._checkpointFiles = [self._expand_frame(checkpoint, frame) for frame in frames]
+		minTime = self._job_submit_time()
+		existing = [path for path in self._checkpointFiles
+			if os.path.isfile(path) and os.path.getsize(path) > 0 and (minTime is None or os.path.getmtime(path) >= minTime)]
+		resume = self.GetConfigEntryWithDefault('CheckpointResumeArguments', '').strip()
+		if existing and resume:
+			self.LogInfo('Resuming from checkpoint(s): {}'.format(', '.join(existing)))
+			arguments += resume.format(**values) + ' '
+		elif existing:
+			self.LogWarning('Found checkpoint(s) but no Checkpoint Resume Arguments are set; rendering from the start: {}'.format(', '.join(existing)))
+		return arguments
+
+	def _remove_checkpoints(self):
+		"""The task finished its frames, so their checkpoints are no longer needed."""
+		for path in self._checkpointFiles:
+			if os.path.isfile(path):
+				try:
+					os.remove(path)
+				except OSError as e:
+					self.LogWarning('Could not remove checkpoint "{}": {}'.format(path, e))
+		self._checkpointFiles = []
+
+	def _hython(self):
+		"""hython from the same Houdini install as husk, for USD work the Worker's Python can't do."""
+		_, huskDir = self._husk_dir()
+		return os.path.join(huskDir, 'hython.exe' if self._detect_os() == 'Windows' else 'hython')
+
+	def _job_shared_dir(self):
+		"""A directory for this job that every Worker can reach.
+
+		JobSharedDirectory from the plugin configuration (one sub folder per job),
+		otherwise the job's auxiliary folder in the Repository.
+		"""
+		root = self.GetConfigEntryWithDefault('JobSharedDirectory', '').strip()
+		if root:
+			return os.path.join(RepositoryUtils.CheckPathMapping(root), self.GetJob().JobId)
+		return RepositoryUtils.GetJobAuxiliaryPath(self.GetJob())
+
+	def _remap_scene(self, usdFile):
+		"""Return the job's copy of the scene with path mapping applied inside the layers.
+
+		The first task on each OS builds it (see HuskRemap), later tasks reuse it.
+		Any problem falls back to rendering the original scene.
+		"""
+		remapDir = os.path.join(self._job_shared_dir(), 'husk_remap_' + self._detect_os())
+		if self._perFrameScene:
+			# One remapped copy per frame file.
+			remapDir += '_' + os.path.splitext(os.path.basename(usdFile))[0]
+		script = os.path.join(_pluginDir, 'HuskRemapLayers.py')
+
+		def build(outputDir):
+			self.LogInfo('Remapping asset paths inside the USD layers into: {}'.format(outputDir))
+			return HuskRemap.build_remapped_scene(self._hython(), script, usdFile, outputDir, RepositoryUtils.CheckPathMapping)
+
+		try:
+			result, built = HuskRemap.remap_once(remapDir, build)
+		except Exception as e:
+			self.LogWarning('Remapping USD layers failed, rendering the original scene: {}'.format(e))
+			return usdFile
+		if built:
+			self.LogInfo('Remapped {} paths in {} layers, {} layer(s) rewritten.'.format(
+				result['remapped_paths'], result['layers'], len(result['written'])))
+		else:
+			self.LogInfo('Using remapped USD layers from: {}'.format(remapDir))
+		return result['root']
+
+	def _localize_scene(self, usdFile):
+		"""Return the Worker-local cached copy of the scene (see HuskCache).
+
+		Any problem falls back to rendering from the original path.
+		"""
+		cacheDir = self.GetConfigEntryWithDefault('LocalCacheDirectory', '').strip()
+		if not cacheDir:
+			cacheDir = os.path.join(self.GetSlaveDirectory(), 'husk_cache')
+		try:
+			quota = float(self.GetConfigEntryWithDefault('LocalCacheQuotaGB', '100')) * 1024 ** 3
+		except ValueError:
+			quota = 100.0 * 1024 ** 3
+
+		compute = HuskCache.compute_with_hython(self._hython(), os.path.join(_pluginDir, 'HuskLayerDeps.py'))
+		script = os.path.join(_pluginDir, 'HuskRemapLayers.py')
+
+		def rewrite(localScene, mapPath, remapDir):
+			# Point the absolute paths inside the cached layers at the cache too.
+			def build(outputDir):
+				return HuskRemap.build_remapped_scene(self._hython(), script, localScene, outputDir, mapPath)
+			result, _ = HuskRemap.remap_once(remapDir, build)
+			return result['root']
+
+		owner = '{}_{}'.format(os.getpid(), self.GetThreadNumber())
+		cache = HuskCache.LayerCache(cacheDir, quota, log=self.LogInfo, owner=owner)
+		try:
+			localFile = cache.localize(usdFile, compute, rewrite)
+		except Exception as e:
+			cache.release()
+			self.LogWarning('Local cache failed, rendering from the network: {}'.format(e))
+			return usdFile
+		self._localCache = cache
+		self.LogInfo('Local cache: {} files up to date, {} copied ({:.1f} MB) into {}'.format(
+			cache.hits, cache.misses, cache.copied_bytes / 1048576.0, cacheDir))
+		return localFile.replace('\\', '/')
+
 	def _optional_overrides(self):
 		"""Build husk args for the optional, post-submission Job Properties.
 
@@ -303,6 +1009,19 @@ class HuskPlugin(DeadlinePlugin):
 		return args
 
 	def RenderArgument(self):
+		if self._skipTask:
+			return '/c exit 0' if self._detect_os() == 'Windows' else ''
+		with self._timed('arguments'):
+			arguments = self._render_arguments()
+		if getattr(self, '_launchPrefix', ''):
+			arguments = self._launchPrefix + arguments
+		self._start_monitor()
+		# Deadline starts the process right after this callback returns.
+		self._mark_phase('process_start')
+		return arguments
+
+	def _render_arguments(self):
+		self._checkpointFiles = []
 		if self._get_bool('AssemblyJob'):
 			return self.AssemblyArgument()
 
@@ -312,6 +1031,13 @@ class HuskPlugin(DeadlinePlugin):
 		usdFile = self.GetPluginInfoEntry('SceneFile')
 		usdFile = RepositoryUtils.CheckPathMapping(usdFile)
 		usdFile = usdFile.replace('\\', '/').strip('"')
+		usdFile = self._scene_for_task(usdFile)
+		if self._get_bool('RemapLayers', self._config_bool('RemapLayers')):
+			with self._timed('remap_layers'):
+				usdFile = self._remap_scene(usdFile)
+		if self._get_bool('LocalCache', self._config_bool('LocalCache')):
+			with self._timed('local_cache'):
+				usdFile = self._localize_scene(usdFile)
 
 		outFile = self.GetPluginInfoEntry('ImageOutputDirectory')
 		outFile = RepositoryUtils.CheckPathMapping(outFile)
@@ -331,14 +1057,16 @@ class HuskPlugin(DeadlinePlugin):
 
 		logLevel = self.GetPluginInfoEntry('LogLevel')
 
+		self._tileGrid = None
 		tileRendering = self._get_bool('TileRendering')
+		if not tileRendering:
+			customargs = self._memory_fallback(customargs)
 
 		if tileRendering:
-			# Each Deadline task is one tile; the task number is the tile index.
-			# The actual frame to render is stored separately because the task
-			# range is repurposed to enumerate tiles (single-frame tiling).
-			tileIndex = self.GetStartFrame()
-			renderFrame = self.GetPluginInfoEntryWithDefault('RenderFrame', str(tileIndex))
+			# Each Deadline task is one tile of one frame. The task range is
+			# repurposed to enumerate the tile x frame matrix (see _tile_task),
+			# and the output is expanded for the task's frame.
+			renderFrame, tileIndex, outFile = self._tile_output()
 			tilesX = int(self.GetPluginInfoEntryWithDefault('TilesX', '1'))
 			tilesY = int(self.GetPluginInfoEntryWithDefault('TilesY', '1'))
 			tileSuffix = self.GetPluginInfoEntryWithDefault('TileSuffix', '_tile%d')
@@ -350,23 +1078,19 @@ class HuskPlugin(DeadlinePlugin):
 			arguments += '--tile-count {} {} '.format(tilesX, tilesY)
 			arguments += '--tile-index {} '.format(tileIndex)
 			arguments += '--tile-suffix {} '.format(tileSuffix)
+			arguments += self._checkpoint_arguments([renderFrame], tileIndex)
+			taskFrames = [renderFrame]
 		else:
-			# Get the frame range for the chunk
-			startFrame = self.GetStartFrame()
-			endFrame = self.GetEndFrame()
-			chunk = self.GetJobInfoEntry('ChunkSize')
-			chunk = min(endFrame - startFrame + 1, int(chunk))
+			# Render exactly the frames Deadline assigned to the task, so
+			# stepped and sparse frame lists keep one stage load per chunk.
+			# With Resume, PreRenderTasks already dropped the frames that have output.
+			taskFrames = self._resumeFrames or self._task_frames()
 
 			# Construct Husk command with multiple frames
 			arguments += '"{}" '.format(usdFile)
 			arguments += '--verbose a{} '.format(logLevel)
-			arguments += '--frame {} '.format(startFrame)
-			arguments += '--frame-count {} '.format(chunk)
-
-		# -- frame-list only takes space separated list of frames, so using above frame count instead to handle chunk sizes
-		#frameList = self.GetPluginInfoEntry('FrameList')
-		#frameList = frameList.replace('-', ' ')  # Replace hyphen with a space
-		#arguments += '--frame-list {} '.format(frameList)
+			arguments += HuskFrames.frame_arguments(taskFrames)
+			arguments += self._checkpoint_arguments(taskFrames)
 
 		if overrideres:
 			arguments += '--res {0} {1} '.format(width, height)
@@ -379,6 +1103,7 @@ class HuskPlugin(DeadlinePlugin):
 		# Monitor's Job Properties; a blank/zero/Default value means "no override"
 		# so existing jobs are unaffected.
 		arguments += self._optional_overrides()
+		arguments += self._thread_arguments(customargs)
 
 		arguments += customargs + ' '
 		arguments += '-o "{}"'.format(outFile)
@@ -386,35 +1111,143 @@ class HuskPlugin(DeadlinePlugin):
 
 		self.LogInfo('Rendering USD file: ' + usdFile)
 		if tileRendering:
-			self.LogInfo('Rendering tile {} of {}x{}'.format(self.GetStartFrame(), self.GetPluginInfoEntryWithDefault('TilesX', '1'), self.GetPluginInfoEntryWithDefault('TilesY', '1')))
+			self.LogInfo('Rendering tile {} of {}x{}, frame {}'.format(tileIndex, self.GetPluginInfoEntryWithDefault('TilesX', '1'), self.GetPluginInfoEntryWithDefault('TilesY', '1'), renderFrame))
 		else:
-			self.LogInfo('Rendering frames: {}-{}'.format(self.GetStartFrame(), self.GetEndFrame()))
+			self.LogInfo('Rendering frames: {}'.format(','.join(str(f) for f in taskFrames)))
+
+		# Per-frame statistics are opt-in: globally in the plugin configuration,
+		# or per job with the RenderStats plugin info entry. They are also
+		# collected when a history file for the submitters' chunk planner is set.
+		self._writeStatsSidecar = self._get_bool('RenderStats', self._config_bool('RenderStats'))
+		self._statsHistoryFile = self.GetConfigEntryWithDefault('RenderStatsHistoryFile', '').strip()
+		if self._statsHistoryFile:
+			self._statsHistoryFile = RepositoryUtils.CheckPathMapping(self._statsHistoryFile)
+		self._statsOutput = self._expand_frame(outFile, taskFrames[0])
+		if self._writeStatsSidecar or self._statsHistoryFile:
+			self._frameStats = HuskTelemetry.FrameStatsCollector(taskFrames)
+			self._frameStats.start()
+			self._outputParser.listener = self._frameStats
 
 		return arguments
 
-	def HandleStdoutPercentage(self):
-		"""Authoritative overall progress from husk's bracketed status line."""
-		try:
-			progress = float(self.GetRegexMatch(1))
-		except ValueError:
+	def _apply_progress_update(self, update):
+		_, progress, status = update
+		if status is not None:
+			self.SetStatusMessage(status)
+		if progress is not None:
+			self.SetProgress(progress)
+
+	def HandleStdoutLine(self):
+		"""Single stdout handler: errors fail the task, progress is throttled."""
+		if self._skipTask:
 			return
-		self._sawRealProgress = True
-		self.SetProgress(max(0.0, min(100.0, progress)))
-
-	def HandleStdoutProgress(self):
-		self.SetStatusMessage(self.GetRegexMatch(0))
-		# ALF_PROGRESS accumulates across tiles/buckets and can exceed 100%, so it
-		# is only used as a fallback when the authoritative percentage line (handled
-		# by HandleStdoutPercentage) hasn't appeared. Clamp it regardless.
-		if self._sawRealProgress:
+		self._mark_phase('first_handled_line')
+		line = self.GetRegexMatch(0)
+		if self._watchdog is not None:
+			self._watchdog.output(line)
+		update = self._outputParser.feed(line)
+		if update is None:
 			return
-		try:
-			progress = float(self.GetRegexMatch(1))
-		except ValueError:
+		if update[0] == 'error':
+			self.FailRender(update[1])
 			return
-		self.SetProgress(max(0.0, min(100.0, progress)))
-
-	def HandleStdoutError(self):
-		self.FailRender(self.GetRegexMatch(0))
+		if update[1] is not None:
+			self._mark_phase('first_progress')
+		self._apply_progress_update(update)
+
+	def PostRenderTasks(self):
+		"""Push the last progress update that the throttle held back."""
+		cache = getattr(self, '_localCache', None)
+		if cache is not None:
+			# husk is done reading the cached files; they may be evicted now.
+			cache.release()
+			self._localCache = None
+		parser = getattr(self, '_outputParser', None)
+		if parser is None:
+			return
+		self._stop_monitor()
+		update = parser.flush()
+		if update is not None:
+			self._apply_progress_update(update)
+
+		if self._frameStats is not None:
+			self._write_frame_stats()
+		if self._checkpointFiles and not self._skipTask:
+			self._remove_checkpoints()
+		if self._phaseTimer is not None and not self._phaseTimer.reported:
+			self._write_phase_timing()
+
+	def _write_phase_timing(self):
+		"""Log the task's phase timing in one line and write it as JSON.
+
+		The file goes to the configured PhaseTimingDirectory, or to the husk_stats
+		folder next to the render output.
+		"""
+		timer = self._phaseTimer
+		timer.reported = True
+		self._mark_phase('process_end')
+		self.LogInfo(timer.summary())
+
+		context = {
+			'job_id': self.GetJob().JobId,
+			'task_id': self.GetCurrentTaskId(),
+			'worker': self.GetSlaveName(),
+			'thread': self.GetThreadNumber(),
+		}
+		directory = self.GetConfigEntryWithDefault('PhaseTimingDirectory', '').strip()
+		if directory:
+			directory = RepositoryUtils.CheckPathMapping(directory)
+		elif getattr(self, '_statsOutput', None):
+			directory = os.path.join(os.path.dirname(self._statsOutput), 'husk_stats')
+		else:
+			return
+		timingFile = os.path.join(directory, '{}_task{}_phases.json'.format(context['job_id'], context['task_id']))
+		try:
+			HuskTelemetry.write_json(timingFile, timer.as_dict(context))
+		except (IOError, OSError) as e:
+			self.LogWarning('Could not write phase timing "{}": {}'.format(timingFile, e))
+
+	def _write_frame_stats(self):
+		"""Write the task's per-frame statistics as a JSON-lines sidecar next to
+		the output and, if configured, as an OpenMetrics file for the Worker."""
+		records = self._frameStats.finish()
+		self._frameStats = None
+		self._outputParser.listener = None
+
+		context = {
+			'job_id': self.GetJob().JobId,
+			'job_name': self.GetJob().JobName,
+			'task_id': self.GetCurrentTaskId(),
+			'worker': self.GetSlaveName(),
+			'thread': self.GetThreadNumber(),
+			'scene': self.GetPluginInfoEntryWithDefault('SceneFile', '').strip('"'),
+			'delegate': self.GetPluginInfoEntryWithDefault('RenderDelegate', ''),
+		}
+		for record in records:
+			self.LogInfo('Frame {frame}: stage load {stage_load_seconds}s, first pixel {time_to_first_pixel_seconds}s, '
+				'render {render_seconds}s, peak memory {peak_memory_bytes} bytes'.format(**record))
+
+		if self._statsHistoryFile:
+			try:
+				HuskTelemetry.append_history(self._statsHistoryFile, records, context)
+			except (IOError, OSError) as e:
+				self.LogWarning('Could not append to render statistics history "{}": {}'.format(self._statsHistoryFile, e))
 
+		if not self._writeStatsSidecar:
+			return
 
+		statsFile = os.path.join(os.path.dirname(self._statsOutput), 'husk_stats',
+			'{}_task{}.jsonl'.format(context['job_id'], context['task_id']))
+		try:
+			HuskTelemetry.write_jsonl(statsFile, records, context)
+			self.LogInfo('Render statistics written to: {}'.format(statsFile))
+		except (IOError, OSError) as e:
+			self.LogWarning('Could not write render statistics "{}": {}'.format(statsFile, e))
+
+		textfileDir = self.GetConfigEntryWithDefault('RenderStatsTextfileDirectory', '').strip()
+		if textfileDir:
+			promFile = os.path.join(textfileDir, 'husk_{}_{}.prom'.format(context['worker'], context['thread']))
+			try:
+				HuskTelemetry.write_openmetrics(promFile, records, context)
+			except (IOError, OSError) as e:
+				self.LogWarning('Could not write render metrics "{}": {}'.format(promFile, e))
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+
+"""Worker-local cache of USD scenes and their dependencies.
+
+Every task on a Worker would otherwise read the scene, its sublayers,
+references and textures straight from the file server. LayerCache copies
+them once into a local directory and hands husk the local copy of the scene.
+
+Files are mirrored by their source path (P:/proj/a.usd -> <root>/files/P/proj/a.usd)
+so relative references between layers and assets keep resolving. Absolute
+paths authored in the layers still name the network copy; the plugin has them
+rewritten to the mirror in copies of the affected layers (HuskRemap), kept
+under <root>/remap. An entry is valid while the source file's size and mtime
+match the ones recorded when it was copied. Each entry has a lock file, so
+concurrent tasks on one Worker wait for a single copy instead of each
+downloading the file.
+
+A size quota is kept by evicting the least recently used entries. Every task
+pins the files it renders from in <root>/pins/<owner>.json, and eviction,
+which runs under a cache-wide lock, skips pinned files. A pin is dropped on
+release() or once its process is gone.
+
+No Deadline imports; the plugin passes in paths and settings.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+
+_META_SUFFIX = '.huskmeta'
+_LOCK_SUFFIX = '.husklock'
+_PIN_DIR = 'pins'
+_REMAP_DIR = 'remap'
+# Texture paths that stand for a set of tile files.
+_TILE_TOKENS = ('<UDIM>', '<UVTILE>')
+
+
+class LockTimeout(Exception):
+	pass
+
+
+class FileLock(object):
+	"""Cross-process lock based on exclusively creating a lock file.
+
+	A lock file older than stale_seconds is assumed to be left behind by a
+	crashed task and is removed.
+	"""
+
+	def __init__(self, path, timeout=600.0, poll=0.25, stale_seconds=3600.0):
+		self.path = path
+		self.timeout = timeout
+		self.poll = poll
+		self.stale_seconds = stale_seconds
+		self._fd = None
+
+	def acquire(self):
+		deadline = time.time() + self.timeout
+		while True:
+			try:
+				self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+				os.write(self._fd, str(os.getpid()).encode('ascii'))
+				return
+			except OSError as e:
+				if e.errno != errno.EEXIST:
+					raise
+			try:
+				if time.time() - os.path.getmtime(self.path) > self.stale_seconds:
+					os.remove(self.path)
+					continue
+			except OSError:
+				continue  # released in the meantime
+			if time.time() > deadline:
+				raise LockTimeout('Timed out waiting for lock "%s"' % self.path)
+			time.sleep(self.poll)
+
+	def release(self):
+		if self._fd is not None:
+			os.close(self._fd)
+			self._fd = None
+			try:
+				os.remove(self.path)
+			except OSError:
+				pass
+
+	def __enter__(self):
+		self.acquire()
+		return self
+
+	def __exit__(self, *exc):
+		self.release()
+
+
+def _stat_key(path):
+	st = os.stat(path)
+	return st.st_size, int(st.st_mtime)
+
+
+def mirror_path(root, source):
+	"""Local path of a source file inside the cache's mirrored tree."""
+	source = source.replace('\\', '/')
+	if source.startswith('//'):
+		relative = 'UNC/' + source[2:]
+	elif len(source) > 1 and source[1] == ':':
+		relative = source[0].upper() + source[2:]
+	else:
+		relative = source.lstrip('/')
+	return os.path.join(root, 'files', *[p for p in relative.split('/') if p and p != '..'])
+
+
+class LayerCache(object):
+	"""Local mirror of network files with LRU eviction.
+
+	owner names the task using the cache; it must be unique per process and
+	task slot, and starts with the pid ("<pid>_<slot>"). Files a task uses are
+	pinned under its owner name until release(), and are never evicted while
+	pinned.
+	"""
+
+	def __init__(self, root, quota_bytes, lock_timeout=600.0, log=None, owner=None, pin_stale_seconds=2 * 86400.0):
+		self.root = root
+		self.quota_bytes = quota_bytes
+		self.lock_timeout = lock_timeout
+		self.log = log or (lambda msg: None)
+		self.owner = owner or '%d_%d' % (os.getpid(), threading.get_ident())
+		self.pin_stale_seconds = pin_stale_seconds
+		self.copied_bytes = 0
+		self.hits = 0
+		self.misses = 0
+
+	def _lock(self, path):
+		return FileLock(path + _LOCK_SUFFIX, timeout=self.lock_timeout)
+
+	def _cache_lock(self):
+		"""Serialises pinning against eviction."""
+		if not os.path.isdir(self.root):
+			os.makedirs(self.root, exist_ok=True)
+		return FileLock(os.path.join(self.root, 'cache' + _LOCK_SUFFIX), timeout=self.lock_timeout)
+
+	def _valid(self, local, key):
+		try:
+			with open(local + _META_SUFFIX) as f:
+				meta = json.load(f)
+			return (meta['size'], meta['mtime']) == key and os.path.getsize(local) == key[0]
+		except (IOError, OSError, ValueError, KeyError):
+			return False
+
+	def _touch(self, local):
+		try:
+			os.utime(local + _META_SUFFIX, None)
+		except OSError:
+			pass
+
+	def fetch(self, source):
+		"""Return the local copy of source, copying it if needed.
+
+		Pin the local path first when other tasks may evict concurrently.
+		"""
+		key = _stat_key(source)
+		local = mirror_path(self.root, source)
+		if self._valid(local, key):
+			self.hits += 1
+			self._touch(local)
+			return local
+
+		directory = os.path.dirname(local)
+		if not os.path.isdir(directory):
+			os.makedirs(directory, exist_ok=True)
+		with self._lock(local):
+			# Another task may have copied it while we waited for the lock.
+			if self._valid(local, key):
+				self.hits += 1
+				self._touch(local)
+				return local
+			self.misses += 1
+			tmp = '%s.%d.tmp' % (local, os.getpid())
+			shutil.copyfile(source, tmp)
+			os.replace(tmp, local)
+			with open(local + _META_SUFFIX, 'w') as f:
+				json.dump({'source': source, 'size': key[0], 'mtime': key[1]}, f)
+			self.copied_bytes += key[0]
+		return local
+
+	def _read_dependencies(self, depsFile):
+		"""The stored dependency list, or None when it is missing or a layer changed."""
+		try:
+			with open(depsFile) as f:
+				cached = json.load(f)
+			if all(tuple(stat) == _stat_key(path) for path, stat in cached['layer_stats']):
+				return cached
+		except (IOError, OSError, ValueError, KeyError, TypeError):
+			pass
+		return None
+
+	def dependencies(self, scene, compute):
+		"""Return the dependency list of scene, computing it only when it changed.
+
+		compute(scene) returns {'layers': [...], 'assets': [...], 'unresolved': [...]}.
+		The result is stored with the stat of every layer; it is recomputed when
+		any layer changed, since an edited layer can add or drop references.
+		"""
+		name = hashlib.sha1(scene.replace('\\', '/').encode('utf-8')).hexdigest()
+		depsFile = os.path.join(self.root, 'deps', name + '.json')
+		cached = self._read_dependencies(depsFile)
+		if cached is not None:
+			return cached
+
+		if not os.path.isdir(os.path.dirname(depsFile)):
+			os.makedirs(os.path.dirname(depsFile), exist_ok=True)
+		with FileLock(depsFile + _LOCK_SUFFIX, timeout=self.lock_timeout):
+			# Another task may have computed it while we waited for the lock.
+			cached = self._read_dependencies(depsFile)
+			if cached is not None:
+				return cached
+			deps = compute(scene)
+			layers = [scene] + [p for p in deps['layers'] if os.path.normcase(p) != os.path.normcase(scene)]
+			deps['layer_stats'] = [(path, _stat_key(path)) for path in layers if os.path.isfile(path)]
+			tmp = '%s.%d.tmp' % (depsFile, os.getpid())
+			with open(tmp, 'w') as f:
+				json.dump(deps, f)
+			os.replace(tmp, depsFile)
+		return deps
+
+	def localize(self, scene, compute, rewrite=None):
+		"""Copy scene and its dependencies into the cache and return the scene path to render.
+
+		Layers keep the absolute paths authored in them, which point back at the
+		network. rewrite(local_scene, map_path, output_dir) writes copies of the
+		layers with map_path applied to their asset paths into output_dir and
+		returns the root layer to render (HuskRemap does that through hython);
+		map_path sends every cached file to its local copy. Without rewrite,
+		husk reads the local scene but anything referenced by absolute path
+		from the network.
+
+		The files stay pinned until release().
+		"""
+		deps = self.dependencies(scene, compute)
+		for path in deps.get('unresolved', []):
+			self.log('Unresolved dependency (left on the network): %s' % path)
+		sources = []
+		seen = set()
+		for source in [scene] + deps.get('layers', []) + deps.get('assets', []):
+			norm = os.path.normcase(os.path.abspath(source))
+			if norm in seen or not os.path.isfile(source):
+				continue
+			seen.add(norm)
+			sources.append(source)
+
+		localScene = mirror_path(self.root, scene)
+		remapDir = None
+		if rewrite is not None:
+			name = hashlib.sha1(json.dumps([scene.replace('\\', '/'), deps['layer_stats']]).encode('utf-8')).hexdigest()
+			remapDir = os.path.join(self.root, _REMAP_DIR, name)
+		pinned = [mirror_path(self.root, source) for source in sources] + ([remapDir] if remapDir else [])
+		self.pin(pinned)
+
+		for source in sources:
+			self.fetch(source)
+		if remapDir is not None:
+			localScene = rewrite(localScene, self._map_path(sources), remapDir)
+			try:
+				os.utime(remapDir, None)
+			except OSError:
+				pass
+		self.evict()
+		return localScene
+
+	def _map_path(self, sources):
+		"""map_path for rewrite(): cached source path -> local copy, anything else unchanged."""
+		cached = set(os.path.normcase(os.path.abspath(source)) for source in sources)
+
+		def map_path(path):
+			norm = os.path.normcase(os.path.abspath(path))
+			if norm in cached:
+				return mirror_path(self.root, path)
+			for token in _TILE_TOKENS:
+				if token in path:
+					# A UDIM/UVTILE pattern resolves to tile files that are cached next to it.
+					tiles = re.compile(re.escape(norm).replace(re.escape(os.path.normcase(token)), '[0-9uv_]+') + '$')
+					if any(tiles.match(name) for name in cached):
+						return mirror_path(self.root, path)
+			return path
+		return map_path
+
+	def _pin_file(self):
+		return os.path.join(self.root, _PIN_DIR, self.owner + '.json')
+
+	def pin(self, paths):
+		"""Protect paths from eviction until release(); replaces this owner's previous pin."""
+		pinFile = self._pin_file()
+		with self._cache_lock():
+			if not os.path.isdir(os.path.dirname(pinFile)):
+				os.makedirs(os.path.dirname(pinFile), exist_ok=True)
+			tmp = pinFile + '.tmp'
+			with open(tmp, 'w') as f:
+				json.dump([os.path.normcase(path) for path in paths], f)
+			os.replace(tmp, pinFile)
+
+	def release(self):
+		"""Unpin this owner's files; the task no longer reads them."""
+		try:
+			os.remove(self._pin_file())
+		except OSError:
+			pass
+
+	def _pinned(self):
+		"""Paths pinned by live owners. Call with the cache lock held."""
+		pinned = set()
+		pinDir = os.path.join(self.root, _PIN_DIR)
+		try:
+			names = os.listdir(pinDir)
+		except OSError:
+			return pinned
+		for name in names:
+			if not name.endswith('.json'):
+				continue
+			pinFile = os.path.join(pinDir, name)
+			try:
+				pid = int(name.split('_', 1)[0])
+				stale = time.time() - os.path.getmtime(pinFile) > self.pin_stale_seconds
+				if stale or not _pid_alive(pid):
+					# Left behind by a task whose process ended without release().
+					os.remove(pinFile)
+					continue
+				with open(pinFile) as f:
+					pinned.update(json.load(f))
+			except (IOError, OSError, ValueError):
+				continue
+		return pinned
+
+	def evict(self):
+		"""Delete least recently used entries until the cache is under quota.
+
+		Files and rewritten layer folders pinned by any running task, and files
+		being copied, are kept.
+		"""
+		with self._cache_lock():
+			entries = []
+			total = 0
+			for dirpath, _, filenames in os.walk(os.path.join(self.root, 'files')):
+				for filename in filenames:
+					if not filename.endswith(_META_SUFFIX):
+						continue
+					meta = os.path.join(dirpath, filename)
+					local = meta[:-len(_META_SUFFIX)]
+					try:
+						size = os.path.getsize(local)
+						used = os.path.getmtime(meta)
+					except OSError:
+						continue
+					total += size
+					entries.append((used, size, local))
+			remapRoot = os.path.join(self.root, _REMAP_DIR)
+			for name in (os.listdir(remapRoot) if os.path.isdir(remapRoot) else []):
+				remapDir = os.path.join(remapRoot, name)
+				if not os.path.isdir(remapDir):
+					continue
+				size = _tree_size(remapDir)
+				total += size
+				entries.append((os.path.getmtime(remapDir), size, remapDir))
+			if total <= self.quota_bytes:
+				return 0
+
+			pinned = self._pinned()
+			freed = 0
+			for used, size, local in sorted(entries):
+				if total - freed <= self.quota_bytes * 0.9:
+					break
+				if os.path.normcase(local) in pinned or os.path.exists(local + _LOCK_SUFFIX):
+					continue
+				try:
+					if os.path.isdir(local):
+						shutil.rmtree(local)
+					else:
+						os.remove(local + _META_SUFFIX)
+						os.remove(local)
+					freed += size
+				except OSError:
+					pass
+		self.log('Local cache over quota: evicted %.1f MB' % (freed / 1048576.0))
+		return freed
+
+
+def _tree_size(directory):
+	total = 0
+	for dirpath, _, filenames in os.walk(directory):
+		for filename in filenames:
+			try:
+				total += os.path.getsize(os.path.join(dirpath, filename))
+			except OSError:
+				pass
+	return total
+
+
+def _pid_alive(pid):
+	"""False only when the process is known to be gone."""
+	if os.name == 'nt':
+		# os.kill would terminate the process on Windows.
+		try:
+			import psutil
+		except ImportError:
+			return True
+		return psutil.pid_exists(pid)
+	try:
+		os.kill(pid, 0)
+	except OSError as e:
+		return e.errno == errno.EPERM
+	return True
+
+
+def compute_with_hython(hython, script, timeout=600):
+	"""Return a compute(scene) function that runs HuskLayerDeps.py through hython."""
+	def compute(scene):
+		output = subprocess.check_output([hython, script, scene], stderr=subprocess.STDOUT, timeout=timeout)
+		for line in output.decode('utf-8', 'replace').splitlines():
+			if line.startswith('HUSK_LAYER_DEPS '):
+				return json.loads(line[len('HUSK_LAYER_DEPS '):])
+		raise ValueError('No dependency list in hython output:\n' + output.decode('utf-8', 'replace')[-2000:])
+	return compute
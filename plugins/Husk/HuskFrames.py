@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+
+"""Husk command line arguments for a task's frame list.
+
+Each task renders exactly the frames Deadline assigned to it in one husk
+process. Evenly spaced frames use --frame/--frame-count/--frame-inc, anything
+else uses --frame-list, which takes a space separated list.
+
+No Deadline imports.
+"""
+
+
+def frame_arguments(frames):
+	"""Husk frame arguments for a list of frames, with a trailing space."""
+	step = frames[1] - frames[0] if len(frames) > 1 else 1
+	evenlySpaced = step > 0 and all(b - a == step for a, b in zip(frames, frames[1:]))
+	if not evenlySpaced:
+		return '--frame-list "{}" '.format(' '.join(str(f) for f in frames))
+
+	arguments = '--frame {} '.format(frames[0])
+	arguments += '--frame-count {} '.format(len(frames))
+	if step != 1:
+		arguments += '--frame-inc {} '.format(step)
+	return arguments
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+"""Cheap completeness checks for rendered images.
+
+check_image() reads only the header and a few bytes at the end of the data,
+enough to tell a finished image from a missing, empty or truncated one (a
+Worker that crashed or lost its network share while writing):
+
+  - OpenEXR: header, offset table and the last chunk must lie inside the file
+  - PNG: the chunk list must reach IEND
+  - JPEG: start and end of image markers
+
+Other formats only have to be non-empty. No Deadline imports.
+"""
+
+import os
+import struct
+
+_EXR_MAGIC = 20000630
+_EXR_TILED = 0x200
+_EXR_MULTIPART = 0x1000
+_EXR_DEEP = 0x800
+
+# Scan lines per chunk for each EXR compression type.
+_EXR_LINES_PER_CHUNK = {0: 1, 1: 1, 2: 1, 3: 16, 4: 32, 5: 16, 6: 32, 7: 32, 8: 32, 9: 256}
+
+
+def check_image(path, min_mtime=None):
+	"""Return (ok, reason). reason says what is wrong when ok is False."""
+	try:
+		st = os.stat(path)
+	except OSError:
+		return False, 'missing'
+	if st.st_size == 0:
+		return False, 'empty'
+	if min_mtime is not None and st.st_mtime < min_mtime:
+		return False, 'older than the job'
+
+	ext = os.path.splitext(path)[1].lower()
+	try:
+		with open(path, 'rb') as f:
+			if ext == '.exr':
+				return _check_exr(f, st.st_size)
+			if ext == '.png':
+				return _check_png(f, st.st_size)
+			if ext in ('.jpg', '.jpeg'):
+				return _check_jpeg(f, st.st_size)
+	except (IOError, OSError, struct.error, ValueError) as e:
+		return False, 'unreadable: %s' % e
+	return True, ''
+
+
+def _read_cstr(f, limit=256):
+	data = b''
+	while True:
+		c = f.read(1)
+		if not c:
+			raise ValueError('unexpected end of header')
+		if c == b'\0':
+			return data.decode('latin-1')
+		data += c
+		if len(data) > limit:
+			raise ValueError('bad header string')
+
+
+def _read_exr_header(f):
+	"""Return the attributes of one EXR header, or None at the empty header ending a multi-part list."""
+	attributes = {}
+	while True:
+		name = _read_cstr(f)
+		if not name:
+			return attributes or None
+		kind = _read_cstr(f)
+		size = struct.unpack('<i', f.read(4))[0]
+		value = f.read(size)
+		if len(value) != size:
+			raise ValueError('truncated header')
+		if kind == 'box2i':
+			attributes[name] = struct.unpack('<iiii', value)
+		elif kind == 'compression':
+			attributes[name] = value[0]
+		elif kind == 'tiledesc':
+			attributes[name] = struct.unpack('<IIB', value)
+		elif kind == 'int':
+			attributes[name] = struct.unpack('<i', value)[0]
+		elif kind == 'string':
+			attributes[name] = value.decode('latin-1')
+
+
+def _exr_chunk_count(header):
+	if 'chunkCount' in header:
+		return header['chunkCount']
+	xmin, ymin, xmax, ymax = header['dataWindow']
+	if 'tiles' in header:
+		tileX, tileY, mode = header['tiles']
+		if mode & 0x0f != 0:
+			raise ValueError('mip/rip-mapped tiles are not checked')
+		return ((xmax - xmin + tileX) // tileX) * ((ymax - ymin + tileY) // tileY)
+	lines = _EXR_LINES_PER_CHUNK.get(header.get('compression', 0), 32)
+	return (ymax - ymin + lines) // lines
+
+
+def _check_exr(f, size):
+	magic, version = struct.unpack('<ii', f.read(8))
+	if magic != _EXR_MAGIC:
+		return False, 'not an OpenEXR file'
+	multipart = bool(version & _EXR_MULTIPART)
+
+	headers = []
+	while True:
+		header = _read_exr_header(f)
+		if header is None:
+			break
+		headers.append(header)
+		if not multipart:
+			break
+	if not headers:
+		return False, 'no EXR header'
+
+	counts = [_exr_chunk_count(h) for h in headers]
+	table = f.read(8 * sum(counts))
+	if len(table) != 8 * sum(counts):
+		return False, 'truncated offset table'
+	offsets = struct.unpack('<%dQ' % sum(counts), table)
+	# Writers fill in the offset table when the file is closed.
+	if not offsets or min(offsets) == 0 or max(offsets) >= size:
+		return False, 'incomplete offset table'
+
+	# The last chunk must fit in the file: [part] coordinates, data size, data.
+	last = max(offsets)
+	part = 0
+	if multipart:
+		f.seek(last)
+		part = struct.unpack('<i', f.read(4))[0]
+		if not 0 <= part < len(headers):
+			return False, 'bad chunk part number'
+	header = headers[part]
+	deep = bool(version & _EXR_DEEP) or 'deep' in header.get('type', '')
+	prefix = 4 if multipart else 0
+	f.seek(last + prefix)
+	if deep:
+		coords = 16 if ('tiles' in header or 'tiled' in header.get('type', '')) else 4
+		f.seek(coords, 1)
+		tableSize, dataSize = struct.unpack('<QQ', f.read(16))
+		end = f.tell() + 8 + tableSize + dataSize
+	else:
+		coords = 16 if ('tiles' in header or version & _EXR_TILED) else 4
+		f.seek(coords, 1)
+		dataSize = struct.unpack('<i', f.read(4))[0]
+		end = f.tell() + dataSize
+	if end > size:
+		return False, 'truncated (%d of %d bytes)' % (size, end)
+	return True, ''
+
+
+def _check_png(f, size):
+	if f.read(8) != b'\x89PNG\r\n\x1a\n':
+		return False, 'not a PNG file'
+	pos = 8
+	while pos + 8 <= size:
+		f.seek(pos)
+		length, kind = struct.unpack('>I4s', f.read(8))
+		pos += 12 + length
+		if kind == b'IEND':
+			return (pos <= size), ('' if pos <= size else 'truncated')
+	return False, 'truncated (no IEND chunk)'
+
+
+def _check_jpeg(f, size):
+	if f.read(2) != b'\xff\xd8':
+		return False, 'not a JPEG file'
+	f.seek(max(0, size - 64))
+	if b'\xff\xd9' not in f.read():
+		return False, 'truncated (no end of image marker)'
+	return True, ''
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+"""Print the layer and asset dependencies of a USD file as JSON.
+
+Run with hython (the Deadline Worker's Python has no pxr):
+
+	hython HuskLayerDeps.py <scene.usd>
+
+Output: {"layers": [...], "assets": [...], "unresolved": [...]}
+"""
+
+import json
+import sys
+
+from pxr import UsdUtils
+
+
+def main():
+	if len(sys.argv) != 2:
+		sys.stderr.write('usage: HuskLayerDeps.py <scene.usd>\n')
+		return 2
+	layers, assets, unresolved = UsdUtils.ComputeAllDependencies(sys.argv[1])
+	result = {
+		'layers': [layer.realPath for layer in layers if layer.realPath],
+		'assets': list(assets),
+		'unresolved': list(unresolved),
+	}
+	# A marker line, so hython's own startup chatter can't break the JSON.
+	sys.stdout.write('HUSK_LAYER_DEPS ' + json.dumps(result) + '\n')
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
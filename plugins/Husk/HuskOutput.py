@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+"""Husk stdout classification and progress throttling.
+
+The Husk plugin registers a single Deadline stdout handler instead of one per
+pattern. Its regex, PREFILTER_PATTERN, is matched by Deadline itself, so only
+lines that can matter (progress, frame starts, statistics, errors) cross over
+into Python, where HuskOutputParser checks each of them once. Progress/status
+updates are coalesced so the Worker is only told about them a few times per
+second.
+
+This module has no Deadline imports so it can be benchmarked on its own
+(see benchmarks/bench_husk_stdout.py).
+"""
+
+import re
+import time
+
+# Kinds returned by classify()
+LINE_OTHER = 0
+LINE_ERROR = 1
+LINE_PERCENT = 2
+LINE_ALF = 3
+LINE_FRAME = 4
+LINE_STAT = 5
+
+# Errors are searched for on their own, before anything else: one alternation
+# returns the leftmost match, so "50.0% done Error: texture missing" would come
+# back as progress and the failure would be missed. The old per-pattern Deadline
+# handlers each searched the whole line, and an error anywhere failed the task.
+#   - "Error: ..." and "USD ERROR ..."
+_ERROR_RE = re.compile(r'(?:Error:|USD ERROR).*')
+
+# The remaining kinds in a single pass; a line with several of them reports the leftmost.
+#   - husk's authoritative overall percentage, e.g. "[18:25:20]  39.9% (9/21, 40.0%)"
+#   - ALF_PROGRESS, which accumulates per tile and can overshoot 100%
+#   - the start of a frame in a multi-frame chunk
+#   - render statistics husk prints per frame (memory, times, samples)
+_LINE_RE = re.compile(
+	r'\]\s+(?P<percent>[0-9]*\.?[0-9]+)%'
+	r'|ALF_PROGRESS (?P<alf>[0-9]+)'
+	r'|Rendering [Ff]rame\s+(?P<frame>-?[0-9]+(?:\.[0-9]+)?)'
+	r'|(?P<stat>Peak Memory|Memory|Render Time|Load Time|Samples)\s*[:=]\s*(?P<statvalue>[0-9][0-9:.]*\s*[KMGT]?i?B?)'
+)
+
+# Cheap substring test; most husk output at high verbosity matches none of the
+# patterns and never reaches the regex engine.
+_ERROR_HINTS = ('Error:', 'USD ERROR')
+_HINTS = ('%', 'ALF_PROGRESS', 'ing frame', 'ing Frame', 'Memory', 'Time', 'Samples') + _ERROR_HINTS
+
+# The plugin's stdout handler regex. Deadline matches it natively on every line
+# and calls Python only for lines containing one of the hints, which are all
+# the lines classify() doesn't return LINE_OTHER for. The .* make the match the
+# whole line (the handler reads match 0); the ^ keeps the engine from retrying
+# the leading .* at every position of a line without a hint.
+PREFILTER_PATTERN = '^.*(?:' + '|'.join(re.escape(hint) for hint in _HINTS) + ').*'
+
+
+def classify(line):
+	"""Return (kind, value, text) for one line of husk output.
+
+	value is the captured number for progress and frame lines, text is the
+	matched portion of the line (used as error or status message). For stat
+	lines value is the statistic name and text its raw value.
+	"""
+	for hint in _HINTS:
+		if hint in line:
+			break
+	else:
+		return LINE_OTHER, None, None
+
+	for hint in _ERROR_HINTS:
+		if hint in line:
+			match = _ERROR_RE.search(line)
+			return LINE_ERROR, None, match.group(0)
+
+	match = _LINE_RE.search(line)
+	if match is None:
+		return LINE_OTHER, None, None
+	if match.group('percent') is not None:
+		return LINE_PERCENT, match.group('percent'), match.group(0)
+	if match.group('alf') is not None:
+		return LINE_ALF, match.group('alf'), match.group(0)
+	if match.group('frame') is not None:
+		return LINE_FRAME, match.group('frame'), match.group(0)
+	return LINE_STAT, match.group('stat'), match.group('statvalue').strip()
+
+
+class ProgressThrottle(object):
+	"""Coalesce progress/status updates.
+
+	An update is released when at least 1/max_rate seconds have passed since
+	the last released update, or when progress moved by min_delta percent or
+	more. Anything held back is kept as pending and returned by flush().
+	"""
+
+	def __init__(self, max_rate=2.0, min_delta=5.0, clock=time.monotonic):
+		self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+		self.min_delta = min_delta
+		self.clock = clock
+		self._last_time = None
+		self._last_progress = None
+		self._pending_progress = None
+		self._pending_status = None
+
+	def offer(self, progress=None, status=None):
+		"""Record an update. Returns (progress, status) if it should be pushed now, else None."""
+		if progress is not None:
+			self._pending_progress = progress
+		if status is not None:
+			self._pending_status = status
+
+		now = self.clock()
+		due = self._last_time is None or (now - self._last_time) >= self.interval
+		if not due and self._pending_progress is not None:
+			last = self._last_progress if self._last_progress is not None else 0.0
+			due = abs(self._pending_progress - last) >= self.min_delta or self._pending_progress >= 100.0
+		if not due:
+			return None
+
+		self._last_time = now
+		return self.flush()
+
+	def flush(self):
+		"""Return and clear the pending (progress, status), or None if nothing is pending."""
+		if self._pending_progress is None and self._pending_status is None:
+			return None
+		update = (self._pending_progress, self._pending_status)
+		if self._pending_progress is not None:
+			self._last_progress = self._pending_progress
+		self._pending_progress = None
+		self._pending_status = None
+		return update
+
+
+class HuskOutputParser(object):
+	"""Stateful husk stdout parser.
+
+	feed() returns None, an ('error', text) tuple, or a ('progress', progress,
+	status) tuple whose progress or status may be None when unchanged.
+
+	An optional listener (e.g. HuskTelemetry.FrameStatsCollector) sees every
+	unthrottled progress, frame and stat event through on_progress(percent),
+	on_frame(frame) and on_stat(name, value).
+	"""
+
+	def __init__(self, max_rate=2.0, min_delta=5.0, clock=time.monotonic, listener=None):
+		self.throttle = ProgressThrottle(max_rate, min_delta, clock)
+		self.listener = listener
+		# Once husk's bracketed percentage has been seen, ALF_PROGRESS is only
+		# used as a status message, never as progress.
+		self.saw_real_progress = False
+
+	def feed(self, line):
+		kind, value, text = classify(line)
+		if kind == LINE_OTHER:
+			return None
+		if kind == LINE_ERROR:
+			return ('error', text)
+		if kind == LINE_FRAME:
+			if self.listener is not None:
+				self.listener.on_frame(value)
+			return None
+		if kind == LINE_STAT:
+			if self.listener is not None:
+				self.listener.on_stat(value, text)
+			return None
+
+		try:
+			progress = max(0.0, min(100.0, float(value)))
+		except ValueError:
+			return None
+
+		if self.listener is not None and (kind == LINE_PERCENT or not self.saw_real_progress):
+			self.listener.on_progress(progress)
+
+		if kind == LINE_PERCENT:
+			self.saw_real_progress = True
+			update = self.throttle.offer(progress=progress)
+		elif self.saw_real_progress:
+			update = self.throttle.offer(status=text)
+		else:
+			update = self.throttle.offer(progress=progress, status=text)
+
+		if update is None:
+			return None
+		return ('progress',) + update
+
+	def flush(self):
+		"""Return the last held-back update as ('progress', progress, status), or None."""
+		update = self.throttle.flush()
+		if update is None:
+			return None
+		return ('progress',) + update
+
+
+class ListenerGroup(object):
+	"""Forward parser events to several listeners; None entries are ignored."""
+
+	def __init__(self, *listeners):
+		self.listeners = [listener for listener in listeners if listener is not None]
+
+	def on_progress(self, percent):
+		for listener in self.listeners:
+			listener.on_progress(percent)
+
+	def on_frame(self, frame):
+		for listener in self.listeners:
+			listener.on_frame(frame)
+
+	def on_stat(self, name, value):
+		for listener in self.listeners:
+			listener.on_stat(name, value)
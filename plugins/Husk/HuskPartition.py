@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+"""Split a Worker's GPUs and CPUs between concurrent Husk tasks.
+
+With ConcurrentTasks > 1 every husk process would otherwise use every device
+and every core on the machine. Each Worker thread gets its own set of devices
+instead, exposed to husk through environment variables such as
+CUDA_VISIBLE_DEVICES, and its own share of CPU threads, optionally pinned to
+a NUMA node (Linux).
+
+No Deadline imports; the plugin passes in the thread index and settings.
+"""
+
+import glob
+import os
+import re
+import subprocess
+
+
+def parse_list(text):
+	"""'0,1, 3' -> ['0', '1', '3']"""
+	return [item.strip() for item in re.split(r'[,\s]+', text or '') if item.strip()]
+
+
+def parse_mapping(text):
+	"""Explicit thread to device mapping: '0:0,1;1:2,3' -> {0: ['0', '1'], 1: ['2', '3']}"""
+	mapping = {}
+	for entry in (text or '').replace('\n', ';').split(';'):
+		if ':' not in entry:
+			continue
+		thread, devices = entry.split(':', 1)
+		try:
+			mapping[int(thread)] = parse_list(devices)
+		except ValueError:
+			continue
+	return mapping
+
+
+def detect_gpus(timeout=10):
+	"""GPU indices reported by nvidia-smi, or [] if it isn't available."""
+	try:
+		output = subprocess.check_output(['nvidia-smi', '-L'], stderr=subprocess.STDOUT, timeout=timeout)
+	except (OSError, subprocess.SubprocessError):
+		return []
+	count = len([line for line in output.decode('utf-8', 'replace').splitlines() if line.startswith('GPU ')])
+	return [str(i) for i in range(count)]
+
+
+def split_devices(devices, slots, slot, per_slot=0):
+	"""Devices for one of `slots` concurrent tasks.
+
+	Devices are divided into disjoint, contiguous groups, the first groups
+	taking one extra device when they don't divide evenly. per_slot fixes the
+	group size instead. With more tasks than devices, tasks share devices
+	round-robin.
+	"""
+	if not devices:
+		return []
+	slots = max(1, slots)
+	slot = slot % slots
+	if slots >= len(devices) and per_slot <= 0:
+		return [devices[slot % len(devices)]]
+	if per_slot > 0:
+		start = (slot * per_slot) % len(devices)
+		return [devices[(start + i) % len(devices)] for i in range(min(per_slot, len(devices)))]
+	size, extra = divmod(len(devices), slots)
+	start = slot * size + min(slot, extra)
+	return devices[start:start + size + (1 if slot < extra else 0)]
+
+
+def device_environment(templates, devices):
+	"""Expand 'NAME={devices}' lines with a comma separated device list."""
+	env = {}
+	value = ','.join(devices)
+	for line in (templates or '').splitlines():
+		line = line.strip()
+		if not line or line.startswith('#') or '=' not in line:
+			continue
+		name, template = line.split('=', 1)
+		env[name.strip()] = template.strip().replace('{devices}', value).replace('{devices_space}', ' '.join(devices))
+	return env
+
+
+def available_cores():
+	"""CPUs this process may run on."""
+	try:
+		return len(os.sched_getaffinity(0))
+	except (AttributeError, OSError):
+		return os.cpu_count() or 1
+
+
+def thread_budget(cores, slots, per_task=0):
+	"""Render threads for one of `slots` concurrent tasks."""
+	if per_task > 0:
+		return per_task
+	return max(1, cores // max(1, slots))
+
+
+def parse_cpulist(text):
+	"""Linux cpulist syntax: '0-3,8,10-11' -> [0, 1, 2, 3, 8, 10, 11]"""
+	cpus = []
+	for part in (text or '').strip().split(','):
+		if not part:
+			continue
+		if '-' in part:
+			first, last = part.split('-', 1)
+			cpus.extend(range(int(first), int(last) + 1))
+		else:
+			cpus.append(int(part))
+	return cpus
+
+
+def format_cpulist(cpus):
+	"""[0, 1, 2, 3, 8] -> '0-3,8'"""
+	parts = []
+	for cpu in sorted(set(cpus)):
+		if parts and cpu == parts[-1][1] + 1:
+			parts[-1][1] = cpu
+		else:
+			parts.append([cpu, cpu])
+	return ','.join(str(a) if a == b else '%d-%d' % (a, b) for a, b in parts)
+
+
+def numa_nodes(root='/sys/devices/system/node'):
+	"""[(node, [cpus])] for the NUMA nodes of this machine (Linux), limited to
+	the CPUs this process may run on."""
+	try:
+		allowed = os.sched_getaffinity(0)
+	except (AttributeError, OSError):
+		allowed = None
+	nodes = []
+	for path in glob.glob(os.path.join(root, 'node[0-9]*', 'cpulist')):
+		node = int(re.search(r'node(\d+)', path).group(1))
+		try:
+			with open(path) as f:
+				cpus = parse_cpulist(f.read())
+		except (IOError, OSError, ValueError):
+			continue
+		if allowed is not None:
+			cpus = [cpu for cpu in cpus if cpu in allowed]
+		if cpus:
+			nodes.append((node, cpus))
+	return sorted(nodes)
+
+
+def cpu_partition(nodes, slots, slot):
+	"""(node ids, cpus) for one of `slots` concurrent tasks.
+
+	With at least as many nodes as tasks, each task gets whole nodes. With
+	more tasks than nodes, tasks are spread over the nodes and share their
+	node's CPUs in disjoint ranges, so a task's memory stays local.
+	"""
+	if not nodes:
+		return [], []
+	slots = max(1, slots)
+	slot = slot % slots
+	if slots <= len(nodes):
+		ids = split_devices([node for node, _ in nodes], slots, slot)
+		cpus = [cpu for node, nodeCpus in nodes if node in ids for cpu in nodeCpus]
+		return ids, cpus
+	index = slot * len(nodes) // slots
+	onNode = [s for s in range(slots) if s * len(nodes) // slots == index]
+	node, cpus = nodes[index]
+	return [node], split_devices(cpus, len(onNode), onNode.index(slot))
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+
+"""Watch a running husk process from a background thread.
+
+StallWatchdog decides when a render is hung. It knows two phases per frame:
+loading (the stage, or the next frame's time samples, before the first
+progress) and rendering (progress is reported). Each has its own limit, and
+there is a separate limit on husk printing nothing at all. Only the lines the
+plugin's stdout prefilter lets through reach Python, so "any output" also
+comes from the number of bytes the husk processes have written, polled by the
+monitor thread (tree_output_bytes).
+
+MemoryWatch follows the resident memory of the husk process tree against the
+Worker's memory limit. The autotile helpers build the finer --autotile grid
+the plugin falls back to when an attempt ran out of memory.
+
+The husk process itself is found by a marker environment variable the plugin
+sets for the render process, since a Simple plugin has no handle on it, and is
+killed together with its children. /proc is used on Linux; psutil is used
+when it is installed (the only option on Windows and macOS).
+
+No Deadline imports.
+"""
+
+import os
+import re
+import signal
+import threading
+import time
+
+try:
+	import psutil
+except ImportError:
+	psutil = None
+
+MARKER_VARIABLE = 'HUSK_DEADLINE_TASK'
+
+PHASE_LOAD = 'stage load'
+PHASE_RENDER = 'render'
+
+
+class StallWatchdog(object):
+	"""Detect husk output or progress stopping.
+
+	Limits are in seconds, 0 disables them:
+	  output_timeout    no output line at all
+	  load_timeout      loading, i.e. no progress yet for the current frame
+	  progress_timeout  rendering, but progress hasn't changed
+
+	Implements the HuskOutputParser listener interface (on_progress, on_frame,
+	on_stat) for progress and frame events; output() is called for every line
+	the plugin handles and activity() with the bytes written so far.
+	"""
+
+	def __init__(self, output_timeout=0, load_timeout=0, progress_timeout=0, clock=time.monotonic):
+		self.output_timeout = output_timeout
+		self.load_timeout = load_timeout
+		self.progress_timeout = progress_timeout
+		self.clock = clock
+		self.start()
+
+	def start(self):
+		now = self.clock()
+		self.phase = PHASE_LOAD
+		self.phase_start = now
+		self.last_output = now
+		self.last_progress_change = now
+		self.last_line = ''
+		self.progress = None
+		self.written = None
+
+	def output(self, line=''):
+		self.last_output = self.clock()
+		self.last_line = line
+
+	def activity(self, written):
+		"""Bytes the husk processes have written so far, None if unknown; a change counts as output."""
+		if written is not None and written != self.written:
+			self.written = written
+			self.last_output = self.clock()
+
+	def on_frame(self, frame):
+		now = self.clock()
+		self.phase = PHASE_LOAD
+		self.phase_start = now
+		self.last_progress_change = now
+		self.progress = None
+
+	def on_progress(self, percent):
+		now = self.clock()
+		if self.phase == PHASE_LOAD:
+			self.phase = PHASE_RENDER
+			self.phase_start = now
+		if percent != self.progress:
+			self.progress = percent
+			self.last_progress_change = now
+
+	def on_stat(self, name, value):
+		pass
+
+	def check(self):
+		"""Return a reason if the render looks hung, else None."""
+		now = self.clock()
+		quiet = now - self.last_output
+		if self.output_timeout and quiet >= self.output_timeout:
+			return 'no output from husk for {} ({})'.format(_minutes(quiet), self.phase)
+		if self.phase == PHASE_LOAD:
+			waiting = now - self.phase_start
+			if self.load_timeout and waiting >= self.load_timeout:
+				return 'no render progress {} after the start of the {}'.format(_minutes(waiting), self.phase)
+		else:
+			stuck = now - self.last_progress_change
+			if self.progress_timeout and stuck >= self.progress_timeout:
+				return 'progress stuck at {:.1f}% for {}'.format(self.progress, _minutes(stuck))
+		return None
+
+	def describe(self, reason):
+		text = 'Render stalled: {}.'.format(reason)
+		if self.last_line:
+			text += ' Last output: {}'.format(self.last_line.strip()[:300])
+		return text
+
+
+def _minutes(seconds):
+	return '{:.1f} min'.format(seconds / 60.0)
+
+
+class MonitorThread(threading.Thread):
+	"""Call poll() every interval seconds until it returns True or stop() is called."""
+
+	def __init__(self, poll, interval=15.0):
+		super().__init__(name='HuskProcessMonitor')
+		self.daemon = True
+		self.poll = poll
+		self.interval = interval
+		self._stop_event = threading.Event()
+
+	def run(self):
+		while not self._stop_event.wait(self.interval):
+			if self.poll():
+				return
+
+	def stop(self):
+		self._stop_event.set()
+
+
+def _proc_pids():
+	return [int(name) for name in os.listdir('/proc') if name.isdigit()]
+
+
+def _proc_parent(pid):
+	with open('/proc/%d/stat' % pid, 'rb') as f:
+		stat = f.read()
+	# The command name may contain spaces and parentheses; fields follow the last ')'.
+	return int(stat[stat.rindex(b')') + 2:].split()[1])
+
+
+def _proc_has_marker(pid, entry):
+	with open('/proc/%d/environ' % pid, 'rb') as f:
+		return entry in f.read().split(b'\0')
+
+
+def find_marked(value):
+	"""Pids of the processes started with MARKER_VARIABLE=value, [] if unknown."""
+	if psutil is not None:
+		pids = []
+		for process in psutil.process_iter():
+			try:
+				if process.environ().get(MARKER_VARIABLE) == value:
+					pids.append(process.pid)
+			except (psutil.Error, OSError):
+				continue
+		return pids
+	if not os.path.isdir('/proc'):
+		return []
+	entry = ('%s=%s' % (MARKER_VARIABLE, value)).encode('utf-8')
+	pids = []
+	for pid in _proc_pids():
+		try:
+			if _proc_has_marker(pid, entry):
+				pids.append(pid)
+		except (IOError, OSError):
+			continue
+	return pids
+
+
+def process_tree(roots):
+	"""roots plus all their descendants."""
+	if psutil is not None:
+		pids = set()
+		for pid in roots:
+			try:
+				process = psutil.Process(pid)
+				pids.add(pid)
+				pids.update(child.pid for child in process.children(recursive=True))
+			except psutil.Error:
+				continue
+		return sorted(pids)
+	children = {}
+	for pid in _proc_pids():
+		try:
+			children.setdefault(_proc_parent(pid), []).append(pid)
+		except (IOError, OSError, ValueError):
+			continue
+	tree = []
+	pending = list(roots)
+	while pending:
+		pid = pending.pop()
+		if pid not in tree:
+			tree.append(pid)
+			pending.extend(children.get(pid, []))
+	return sorted(tree)
+
+
+def _alive(pid):
+	if psutil is not None:
+		try:
+			return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+		except psutil.Error:
+			return False
+	try:
+		os.kill(pid, 0)
+	except OSError:
+		return False
+	# A killed process stays a zombie until its parent reaps it.
+	try:
+		with open('/proc/%d/stat' % pid, 'rb') as f:
+			stat = f.read()
+		return stat[stat.rindex(b')') + 2:stat.rindex(b')') + 3] != b'Z'
+	except (IOError, OSError, ValueError):
+		return True
+
+
+def kill_tree(roots, grace=30.0):
+	"""Terminate roots and their descendants, killing what is left after grace seconds.
+
+	Returns the pids that were signalled.
+	"""
+	pids = process_tree(roots)
+	for pid in pids:
+		_signal(pid, False)
+	deadline = time.monotonic() + grace
+	while time.monotonic() < deadline and any(_alive(pid) for pid in pids):
+		time.sleep(0.5)
+	for pid in pids:
+		if _alive(pid):
+			_signal(pid, True)
+	return pids
+
+
+def _signal(pid, force):
+	if psutil is not None:
+		try:
+			process = psutil.Process(pid)
+			if force:
+				process.kill()
+			else:
+				process.terminate()
+		except psutil.Error:
+			pass
+		return
+	try:
+		os.kill(pid, signal.SIGKILL if force else signal.SIGTERM)
+	except OSError:
+		pass
+
+
+def tree_rss(pids):
+	"""Resident memory of the given processes in bytes."""
+	total = 0
+	if psutil is not None:
+		for pid in pids:
+			try:
+				total += psutil.Process(pid).memory_info().rss
+			except psutil.Error:
+				continue
+		return total
+	pageSize = os.sysconf('SC_PAGE_SIZE')
+	for pid in pids:
+		try:
+			with open('/proc/%d/statm' % pid) as f:
+				total += int(f.read().split()[1]) * pageSize
+		except (IOError, OSError, ValueError, IndexError):
+			continue
+	return total
+
+
+def tree_output_bytes(pids):
+	"""Bytes the given processes have written so far (stdout, stderr and files), or None if unknown."""
+	total = None
+	if psutil is not None:
+		for pid in pids:
+			try:
+				counters = psutil.Process(pid).io_counters()
+			except (psutil.Error, AttributeError, NotImplementedError):
+				continue
+			# write_chars (Linux) counts pipes too; on Windows write_bytes does.
+			total = (total or 0) + getattr(counters, 'write_chars', counters.write_bytes)
+		return total
+	for pid in pids:
+		try:
+			with open('/proc/%d/io' % pid) as f:
+				for line in f:
+					if line.startswith('wchar:'):
+						total = (total or 0) + int(line.split()[1])
+						break
+		except (IOError, OSError, ValueError, IndexError):
+			continue
+	return total
+
+
+def _read_int(path):
+	try:
+		with open(path) as f:
+			return int(f.read().strip())
+	except (IOError, OSError, ValueError):
+		return None
+
+
+def memory_limit():
+	"""Memory available to this machine or container in bytes, 0 if unknown.
+
+	The smaller of physical memory and a cgroup (v2 or v1) memory limit.
+	"""
+	limits = []
+	try:
+		with open('/proc/meminfo') as f:
+			for line in f:
+				if line.startswith('MemTotal:'):
+					limits.append(int(line.split()[1]) * 1024)
+					break
+	except (IOError, OSError, ValueError):
+		if psutil is not None:
+			limits.append(psutil.virtual_memory().total)
+	for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+		value = _read_int(path)
+		# "max" and the v1 "unlimited" value (close to 2**63) mean no limit.
+		if value and value < 2 ** 60:
+			limits.append(value)
+	return min(limits) if limits else 0
+
+
+class MemoryWatch(object):
+	"""Track the peak RSS of a task against a memory limit.
+
+	sample() returns 'near' the first time RSS reaches near_fraction of the
+	limit and 'stop' when it reaches stop_fraction (0 disables stopping).
+	"""
+
+	def __init__(self, limit, near_fraction=0.9, stop_fraction=0.0):
+		self.limit = limit
+		self.near_fraction = near_fraction
+		self.stop_fraction = stop_fraction
+		self.peak = 0
+		self.near = False
+
+	def sample(self, rss):
+		self.peak = max(self.peak, rss)
+		if not self.limit:
+			return None
+		if self.stop_fraction and rss >= self.stop_fraction * self.limit:
+			self.near = True
+			return 'stop'
+		if not self.near and rss >= self.near_fraction * self.limit:
+			self.near = True
+			return 'near'
+		return None
+
+
+def format_bytes(value):
+	return '{:.1f} GB'.format(value / float(1024 ** 3))
+
+
+_AUTOTILE_RE = re.compile(r'(^|\s)--autotile(?=\s|$)')
+_TILE_COUNT_RE = re.compile(r'(^|\s)--tile-count\s+(\d+)\s+(\d+)(?=\s|$)')
+
+
+def autotile_grid(arguments):
+	"""(x, y) of an --autotile --tile-count in husk arguments, or None."""
+	match = _TILE_COUNT_RE.search(arguments or '')
+	if not match or not _AUTOTILE_RE.search(arguments):
+		return None
+	return int(match.group(2)), int(match.group(3))
+
+
+def finer_grid(grid, maximum=8):
+	"""The next autotile grid after grid (None: no tiling yet), each axis doubled up to maximum."""
+	if grid is None:
+		return min(2, maximum), min(2, maximum)
+	return min(grid[0] * 2, maximum), min(grid[1] * 2, maximum)
+
+
+def set_autotile(arguments, grid):
+	"""husk arguments with any autotile settings replaced by --autotile --tile-count x y."""
+	arguments = _TILE_COUNT_RE.sub('', _AUTOTILE_RE.sub('', arguments or '')).strip()
+	return '{} --autotile --tile-count {} {}'.format(arguments, grid[0], grid[1]).strip()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""Per-job remapped USD layers.
+
+Deadline's path mapping only reaches the paths the plugin passes on the
+command line, not the sublayers, references and textures authored inside the
+USD files. build_remapped_scene() rewrites those paths with a mapping
+function (the plugin passes RepositoryUtils.CheckPathMapping) and writes
+copies of the affected layers. remap_once() makes the first task on each OS
+do that work in a job-scoped shared directory; every later task reuses it.
+
+The USD side runs through hython (HuskRemapLayers.py); the Worker's Python
+has no pxr. No Deadline imports.
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+
+import HuskCache
+
+LAYER_EXTENSIONS = ('.usd', '.usda', '.usdc', '.usdz')
+_MARKER = 'HUSK_REMAP '
+_DONE_FILE = 'remap.json'
+
+
+def _run(hython, script, mode, request, timeout):
+	fd, requestFile = tempfile.mkstemp(prefix='husk_remap_', suffix='.json')
+	try:
+		with os.fdopen(fd, 'w') as f:
+			json.dump(request, f)
+		output = subprocess.check_output([hython, script, mode, requestFile], stderr=subprocess.STDOUT, timeout=timeout)
+	finally:
+		os.remove(requestFile)
+	text = output.decode('utf-8', 'replace')
+	for line in text.splitlines():
+		if line.startswith(_MARKER):
+			return json.loads(line[len(_MARKER):])
+	raise ValueError('No result in hython output:\n' + text[-2000:])
+
+
+def build_remapped_scene(hython, script, scene, output_dir, map_path, timeout=1800):
+	"""Write remapped layers for scene into output_dir and return the path to render.
+
+	The layer graph is walked one level at a time: authored paths can only be
+	opened after they are mapped for this OS, so hython lists a level, the
+	paths are mapped here, and the next level is opened from the mapped paths.
+	"""
+	mapping = {}
+	layers = [scene]
+	seen = set([os.path.normcase(scene)])
+	pending = [scene]
+	while pending:
+		listed = _run(hython, script, 'list', {'layers': pending}, timeout)
+		pending = []
+		for paths in listed.values():
+			for path in paths:
+				if path in mapping:
+					continue
+				mapped = map_path(path)
+				mapping[path] = mapped
+				key = os.path.normcase(mapped)
+				if mapped.lower().endswith(LAYER_EXTENSIONS) and key not in seen and os.path.isfile(mapped):
+					seen.add(key)
+					layers.append(mapped)
+					pending.append(mapped)
+
+	request = {
+		'root': scene,
+		'layers': layers,
+		'mapping': dict((p, m) for p, m in mapping.items() if m != p),
+		'output': output_dir,
+	}
+	result = _run(hython, script, 'write', request, timeout)
+	result['layers'] = len(layers)
+	result['remapped_paths'] = len(request['mapping'])
+	return result
+
+
+def remap_once(remap_dir, build, lock_timeout=1800.0):
+	"""Return the shared remap result, building it if this is the first task.
+
+	build(remap_dir) returns the result dict. Tasks that arrive while another
+	task builds wait on the lock and then read its result.
+	"""
+	doneFile = os.path.join(remap_dir, _DONE_FILE)
+	try:
+		with open(doneFile) as f:
+			return json.load(f), False
+	except (IOError, OSError, ValueError):
+		pass
+
+	parent = os.path.dirname(remap_dir)
+	if parent and not os.path.isdir(parent):
+		os.makedirs(parent, exist_ok=True)
+	with HuskCache.FileLock(remap_dir + '.lock', timeout=lock_timeout, stale_seconds=lock_timeout):
+		try:
+			with open(doneFile) as f:
+				return json.load(f), False
+		except (IOError, OSError, ValueError):
+			pass
+		if not os.path.isdir(remap_dir):
+			os.makedirs(remap_dir)
+		result = build(remap_dir)
+		tmp = doneFile + '.tmp'
+		with open(tmp, 'w') as f:
+			json.dump(result, f)
+		os.replace(tmp, doneFile)
+	return result, True
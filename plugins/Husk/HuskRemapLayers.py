@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""Rewrite asset paths inside USD layers. Run with hython by HuskRemap.
+
+	hython HuskRemapLayers.py list <request.json>
+		request: {"layers": [...]}
+		prints:  {"<layer>": [absolute asset paths authored in it], ...}
+
+	hython HuskRemapLayers.py write <request.json>
+		request: {"root": ..., "layers": [...], "mapping": {path: mapped}, "output": dir}
+		prints:  {"root": <path to render>, "written": [...]}
+
+Relative paths are anchored to the layer that authors them, so the keys of
+the mapping are the absolute paths "list" printed. "write" copies only the
+layers that change: layers with a remapped path, and layers that reference a
+layer that was copied. Their relative paths become absolute, since the copy
+lives in a different directory.
+"""
+
+import json
+import os
+import sys
+
+from pxr import Sdf, UsdUtils
+
+MARKER = 'HUSK_REMAP '
+
+
+def _norm(path):
+	return os.path.normcase(os.path.normpath(path))
+
+
+def _asset_paths(layer):
+	"""Absolute asset paths authored in a layer."""
+	paths = []
+
+	def record(path):
+		if path:
+			paths.append(layer.ComputeAbsolutePath(path))
+		return path
+
+	UsdUtils.ModifyAssetPaths(layer, record)
+	return paths
+
+
+def list_paths(request):
+	result = {}
+	for path in request['layers']:
+		layer = Sdf.Layer.FindOrOpen(path)
+		result[path] = _asset_paths(layer) if layer else []
+	return result
+
+
+def _copy_path(output, path):
+	drive, rest = os.path.splitdrive(os.path.abspath(path))
+	parts = [p for p in rest.replace('\\', '/').split('/') if p and p != '..']
+	return os.path.join(output, drive.replace(':', '').strip('\\/') or 'root', *parts)
+
+
+def write(request):
+	mapping = request['mapping']
+	layers = {}
+	for path in request['layers']:
+		layer = Sdf.Layer.FindOrOpen(path)
+		if layer is not None:
+			layers[_norm(path)] = layer
+	authored = dict((key, _asset_paths(layer)) for key, layer in layers.items())
+
+	# A layer is copied if it authors a path that maps elsewhere, or refers to a copied layer.
+	copied = set(key for key, paths in authored.items() if any(mapping.get(p, p) != p for p in paths))
+	changed = True
+	while changed:
+		changed = False
+		for key, paths in authored.items():
+			if key not in copied and any(_norm(mapping.get(p, p)) in copied for p in paths):
+				copied.add(key)
+				changed = True
+
+	targets = dict((key, _copy_path(request['output'], layers[key].realPath)) for key in copied)
+	written = []
+	for key in copied:
+		layer = layers[key]
+		target = targets[key]
+		if not os.path.isdir(os.path.dirname(target)):
+			os.makedirs(os.path.dirname(target))
+		layer.Export(target)
+		copy = Sdf.Layer.FindOrOpen(target)
+
+		def remap(path, layer=layer):
+			if not path:
+				return path
+			mapped = mapping.get(layer.ComputeAbsolutePath(path), layer.ComputeAbsolutePath(path))
+			return targets.get(_norm(mapped), mapped).replace('\\', '/')
+
+		UsdUtils.ModifyAssetPaths(copy, remap)
+		copy.Save()
+		written.append(target)
+
+	root = targets.get(_norm(request['root']), request['root'])
+	return {'root': root.replace('\\', '/'), 'written': written}
+
+
+def main():
+	if len(sys.argv) != 3 or sys.argv[1] not in ('list', 'write'):
+		sys.stderr.write('usage: HuskRemapLayers.py list|write <request.json>\n')
+		return 2
+	with open(sys.argv[2]) as f:
+		request = json.load(f)
+	result = list_paths(request) if sys.argv[1] == 'list' else write(request)
+	# A marker line, so hython's own startup chatter can't break the JSON.
+	sys.stdout.write(MARKER + json.dumps(result) + '\n')
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
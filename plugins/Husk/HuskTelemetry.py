@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+
+"""Render statistics for Husk plugin tasks.
+
+FrameStatsCollector listens to HuskOutput.HuskOutputParser events and builds
+one record per rendered frame: stage load time, time to first pixel, render
+time, peak memory and sample counts. The records are written as a JSON-lines
+sidecar next to the render output and, optionally, as an OpenMetrics text
+file for a node_exporter style textfile collector on the Worker.
+
+PhaseTimer records how long the plugin itself takes before husk gets going:
+environment setup, executable lookup, argument building, and the delay until
+husk prints its first line and its first progress.
+
+No Deadline imports; the plugin passes in everything it knows about the task.
+"""
+
+import contextlib
+import json
+import os
+import re
+import time
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+# A drop of this much progress means husk started the next frame of the chunk
+# without printing a "Rendering frame" line.
+_PROGRESS_RESET = 50.0
+
+
+def parse_bytes(text):
+	"""'2.5 GB' / '512MiB' / '1024' -> bytes, or None."""
+	match = re.match(r'\s*([0-9.]+)\s*([KMGT]?)i?B?', text)
+	if not match:
+		return None
+	try:
+		return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+	except ValueError:
+		return None
+
+
+def parse_seconds(text):
+	"""'0:01:02.5' / '62.5s' / '62.5' -> seconds, or None."""
+	text = text.strip().rstrip('s')
+	try:
+		seconds = 0.0
+		for part in text.split(':'):
+			seconds = seconds * 60.0 + float(part)
+		return seconds
+	except ValueError:
+		return None
+
+
+class FrameStatsCollector(object):
+	"""Build per-frame statistics from husk output events.
+
+	frames is the list of frames the task renders, in order. Frame boundaries
+	come from husk's "Rendering frame N" lines, or from progress dropping back
+	to zero when those aren't printed.
+	"""
+
+	def __init__(self, frames, clock=time.time):
+		self.frames = [str(f) for f in frames]
+		self.clock = clock
+		self.process_start = None
+		self.records = []
+		self._current = None
+		self._last_progress = None
+
+	def start(self):
+		"""Mark the husk process start."""
+		self.process_start = self.clock()
+
+	def _begin_frame(self, frame=None):
+		now = self.clock()
+		self._end_frame(now)
+		index = len(self.records)
+		if frame is None:
+			frame = self.frames[index] if index < len(self.frames) else None
+		record = {
+			'frame': frame,
+			'start': now,
+			'first_progress': None,
+			'end': None,
+			'stage_load_seconds': None,
+			'peak_memory_bytes': None,
+			'husk_render_seconds': None,
+			'husk_load_seconds': None,
+			'samples': None,
+		}
+		# Everything before the first frame starts is husk startup and stage load.
+		if index == 0 and self.process_start is not None:
+			record['stage_load_seconds'] = round(now - self.process_start, 3)
+		self.records.append(record)
+		self._current = record
+		self._last_progress = None
+
+	def _end_frame(self, now):
+		if self._current is not None and self._current['end'] is None:
+			self._current['end'] = now
+
+	def on_frame(self, frame):
+		try:
+			frame = str(int(float(frame)))
+		except ValueError:
+			frame = None
+		self._begin_frame(frame)
+
+	def on_progress(self, percent):
+		if self._current is None:
+			self._begin_frame()
+		elif self._last_progress is not None and percent < self._last_progress - _PROGRESS_RESET:
+			self._begin_frame()
+		if self._current['first_progress'] is None:
+			self._current['first_progress'] = self.clock()
+		self._last_progress = percent
+
+	def on_stat(self, name, value):
+		if self._current is None:
+			self._begin_frame()
+		record = self._current
+		if name in ('Peak Memory', 'Memory'):
+			size = parse_bytes(value)
+			if size is not None:
+				record['peak_memory_bytes'] = max(size, record['peak_memory_bytes'] or 0)
+		elif name == 'Render Time':
+			record['husk_render_seconds'] = parse_seconds(value)
+		elif name == 'Load Time':
+			record['husk_load_seconds'] = parse_seconds(value)
+		elif name == 'Samples':
+			try:
+				record['samples'] = float(value)
+			except ValueError:
+				pass
+
+	def finish(self):
+		"""Close the last frame and return the per-frame results as plain dicts."""
+		self._end_frame(self.clock())
+		results = []
+		for record in self.records:
+			first = record['first_progress']
+			results.append({
+				'frame': record['frame'],
+				'stage_load_seconds': record['stage_load_seconds'],
+				'time_to_first_pixel_seconds': round(first - record['start'], 3) if first is not None else None,
+				'render_seconds': round(record['end'] - (first if first is not None else record['start']), 3),
+				'frame_seconds': round(record['end'] - record['start'], 3),
+				'husk_render_seconds': record['husk_render_seconds'],
+				'husk_load_seconds': record['husk_load_seconds'],
+				'peak_memory_bytes': record['peak_memory_bytes'],
+				'samples': record['samples'],
+			})
+		return results
+
+
+def write_jsonl(path, records, context):
+	"""Write one JSON object per frame, each merged with the task context."""
+	directory = os.path.dirname(path)
+	if directory and not os.path.isdir(directory):
+		os.makedirs(directory)
+	with open(path, 'w') as f:
+		for record in records:
+			row = dict(context)
+			row.update(record)
+			f.write(json.dumps(row, sort_keys=True) + '\n')
+
+
+def append_history(path, records, context):
+	"""Append one summary line for the task to a shared history file.
+
+	The submitters' chunk planner (HuskLib.ChunkPlanner) reads this file.
+	A single short write in append mode keeps concurrent Workers from
+	interleaving lines.
+	"""
+	rendered = [r['render_seconds'] for r in records if r['render_seconds'] is not None]
+	if not rendered:
+		return
+	row = {
+		'time': time.time(),
+		'job_id': context.get('job_id'),
+		'scene': context.get('scene'),
+		'delegate': context.get('delegate'),
+		'frames': len(rendered),
+		'stage_load_seconds': sum(r['stage_load_seconds'] or 0 for r in records),
+		'render_seconds_per_frame': round(sum(rendered) / len(rendered), 3),
+	}
+	with open(path, 'a') as f:
+		f.write(json.dumps(row, sort_keys=True) + '\n')
+
+
+class PhaseTimer(object):
+	"""Timestamps of the plugin phases of one task.
+
+	phase(name) is a context manager timing a block; mark(name) records the
+	first time an event happens (later calls are ignored). Offsets are seconds
+	since the timer was created.
+	"""
+
+	def __init__(self, clock=time.time):
+		self.clock = clock
+		self.origin = clock()
+		self.phases = []
+		self.marks = {}
+		self.reported = False
+
+	@contextlib.contextmanager
+	def phase(self, name):
+		start = self.clock()
+		try:
+			yield
+		finally:
+			end = self.clock()
+			self.phases.append((name, round(start - self.origin, 3), round(end - start, 3)))
+
+	def mark(self, name):
+		if name not in self.marks:
+			self.marks[name] = round(self.clock() - self.origin, 3)
+
+	def summary(self):
+		"""One log line: phase durations, then event offsets."""
+		parts = ['{} {:.3f}s'.format(name, duration) for name, _, duration in self.phases]
+		events = ['{} +{:.3f}s'.format(name, offset) for name, offset in sorted(self.marks.items(), key=lambda m: m[1])]
+		return 'Phase timing: ' + ', '.join(parts) + (' | ' + ', '.join(events) if events else '')
+
+	def as_dict(self, context):
+		data = dict(context)
+		data['start_time'] = self.origin
+		data['phases'] = [{'name': name, 'start': start, 'seconds': duration} for name, start, duration in self.phases]
+		data['events'] = dict(self.marks)
+		return data
+
+
+def write_json(path, data):
+	"""Write one JSON document, replacing any previous file atomically."""
+	directory = os.path.dirname(path)
+	if directory and not os.path.isdir(directory):
+		os.makedirs(directory)
+	tmp = path + '.tmp'
+	with open(tmp, 'w') as f:
+		json.dump(data, f, indent=1, sort_keys=True)
+	os.replace(tmp, path)
+
+
+def _label(value):
+	return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def write_openmetrics(path, records, context):
+	"""Write the task's statistics as an OpenMetrics text file.
+
+	Gauges describe the most recent task on this Worker thread; the file is
+	replaced atomically so a scraper never reads a partial file.
+	"""
+	labels = '{job_id="%s",worker="%s",thread="%s"}' % (
+		_label(context.get('job_id', '')), _label(context.get('worker', '')), _label(context.get('thread', '')))
+
+	frames = [r for r in records if r['render_seconds'] is not None]
+	metrics = [
+		('husk_task_frames', 'Frames rendered by the last task.', len(records)),
+		('husk_task_stage_load_seconds', 'Husk startup and stage load time of the last task.',
+		 sum(r['stage_load_seconds'] or 0 for r in records)),
+		('husk_task_render_seconds', 'Total frame render time of the last task.',
+		 sum(r['render_seconds'] for r in frames)),
+		('husk_task_time_to_first_pixel_seconds', 'Mean time to first progress per frame of the last task.',
+		 _mean([r['time_to_first_pixel_seconds'] for r in records])),
+		('husk_task_peak_memory_bytes', 'Peak memory reported by husk in the last task.',
+		 max([r['peak_memory_bytes'] or 0 for r in records] or [0])),
+		('husk_task_end_timestamp_seconds', 'When the last task finished.', time.time()),
+	]
+
+	lines = []
+	for name, help_text, value in metrics:
+		lines.append('# HELP %s %s' % (name, help_text))
+		lines.append('# TYPE %s gauge' % name)
+		lines.append('%s%s %s' % (name, labels, 'NaN' if value is None else repr(float(value))))
+	lines.append('# EOF')
+
+	directory = os.path.dirname(path)
+	if directory and not os.path.isdir(directory):
+		os.makedirs(directory)
+	tmp = path + '.tmp'
+	with open(tmp, 'w') as f:
+		f.write('\n'.join(lines) + '\n')
+	os.replace(tmp, path)
+
+
+def _mean(values):
+	values = [v for v in values if v is not None]
+	if not values:
+		return None
+	return sum(values) / len(values)
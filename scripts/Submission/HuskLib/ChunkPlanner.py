@@ -0,0 +1,97 @@
+########################################################################
+# Chunk size planner
+#
+# Picks a Deadline chunk size from the per-task history the Husk plugin
+# appends to its render statistics history file (RenderStatsHistoryFile
+# in the plugin configuration). Each history line is one finished task:
+# scene, delegate, stage load time and per-frame render time.
+#
+# A chunk amortises one husk startup + stage load over several frames,
+# so scenes with long loads and fast frames get large chunks, while slow
+# frames stay at one frame per task to spread across the farm.
+########################################################################
+
+import json
+import os
+import re
+
+DEFAULT_TARGET_MINUTES = 30.0
+DEFAULT_MAX_CHUNK = 50
+# Only the most recent tasks are relevant; the history file grows forever.
+MAX_HISTORY_BYTES = 8 * 1024 * 1024
+MIN_SAMPLES = 3
+
+
+def ScenePattern(path):
+    """Reduce a scene path to a pattern shared by similar scenes.
+
+    Digit runs become '#', so shot/version numbers don't split the history:
+    /proj/shots/sh010/usd/sh010_v003.usd -> /proj/shots/sh#/usd/sh#_v#.usd
+    """
+    path = path.strip().strip('"').replace('\\', '/').lower()
+    return re.sub(r'[0-9]+', '#', path)
+
+
+def LoadHistory(history_file):
+    """Return the task records from the end of a history file (newest last)."""
+    records = []
+    try:
+        size = os.path.getsize(history_file)
+        with open(history_file, 'rb') as f:
+            if size > MAX_HISTORY_BYTES:
+                f.seek(size - MAX_HISTORY_BYTES)
+                f.readline()  # skip the partial first line
+            for line in f:
+                try:
+                    records.append(json.loads(line.decode('utf-8')))
+                except ValueError:
+                    continue
+    except (IOError, OSError):
+        pass
+    return records
+
+
+def _median(values):
+    values = sorted(values)
+    if not values:
+        return None
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2.0
+
+
+def _matching(records, pattern, delegate):
+    same_scene = [r for r in records if ScenePattern(r.get('scene', '')) == pattern]
+    if delegate:
+        same_delegate = [r for r in same_scene if str(r.get('delegate', '')).lower() == delegate.lower()]
+        if len(same_delegate) >= MIN_SAMPLES:
+            return same_delegate
+    return same_scene
+
+
+def PlanChunkSize(scene, delegate, records, target_minutes=DEFAULT_TARGET_MINUTES, max_chunk=DEFAULT_MAX_CHUNK):
+    """Return (chunk_size, reason). chunk_size is None without enough history.
+
+    The chunk is the number of frames that fits the target task duration after
+    paying the stage load once: (target - load) / render_per_frame.
+    """
+    matches = _matching(records, ScenePattern(scene), delegate)
+    loads = [float(r['stage_load_seconds']) for r in matches if r.get('stage_load_seconds') is not None]
+    renders = [float(r['render_seconds_per_frame']) for r in matches if r.get('render_seconds_per_frame')]
+    if len(renders) < MIN_SAMPLES:
+        return None, 'not enough history for this scene (%d tasks)' % len(renders)
+
+    load = _median(loads) or 0.0
+    render = _median(renders)
+    target = target_minutes * 60.0
+
+    if render >= target or load + render >= target:
+        chunk = 1
+    else:
+        chunk = int((target - load) // render)
+    chunk = max(1, min(max_chunk, chunk))
+
+    reason = 'stage load %.0fs, render %.0fs/frame over %d tasks -> %d frame(s) per task' % (
+        load, render, len(renders), chunk)
+    return chunk, reason
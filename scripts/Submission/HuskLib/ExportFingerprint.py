@@ -0,0 +1,128 @@
+########################################################################
+# USD export fingerprints
+#
+# The HDA fingerprints the LOP stage before exporting it (see
+# stage_fingerprint in HDA/PythonModule.py) and stores the fingerprint
+# next to the exported file, together with size and mtime of every file
+# the export wrote. A later export with the same fingerprint and
+# untouched files is skipped.
+#
+# Exported files are never touched afterwards: a layer that is written
+# again gets a new mtime even when its content didn't change.
+########################################################################
+
+import hashlib
+import json
+import os
+
+VERSION = 1
+LAYER_EXTENSIONS = ('.usd', '.usda', '.usdc', '.usdz')
+_SUFFIX = '.fingerprint.json'
+
+
+def FingerprintFile(usd_file):
+    return usd_file + _SUFFIX
+
+
+def Digest(parts):
+    """sha1 of a list of strings (or anything with a stable repr)."""
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode('utf-8') if isinstance(part, str) else repr(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def FileStamp(path):
+    """[size, mtime_ns] of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def Load(usd_file):
+    """The stored fingerprint record of usd_file, or None."""
+    try:
+        with open(FingerprintFile(usd_file)) as f:
+            record = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(record, dict) or record.get('version') != VERSION:
+        return None
+    return record
+
+
+def Save(usd_file, digest, files):
+    """Store digest and the exported files ({path: {'stamp': [size, mtime_ns]}})."""
+    path = FingerprintFile(usd_file)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'version': VERSION, 'digest': digest, 'files': files}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def Stamp(paths):
+    """The files entry for Save."""
+    return dict((path, {'stamp': FileStamp(path)}) for path in paths)
+
+
+def IsCurrent(record, digest):
+    """Return (current, reason) for a stored record and the stage's digest now."""
+    if record is None:
+        return False, 'no fingerprint of an earlier export'
+    if record.get('digest') != digest:
+        return False, 'the stage changed since the last export'
+    for path, info in record.get('files', {}).items():
+        if FileStamp(path) != info.get('stamp'):
+            return False, 'exported file changed or missing: %s' % path
+    return True, 'unchanged since the last export'
+
+
+def LayerDependencies(path):
+    """Absolute paths of the USD layers that path sublayers, references or payloads."""
+    from pxr import Sdf
+
+    layer = Sdf.Layer.Find(path)
+    if layer is not None and not layer.dirty:
+        # Opened earlier in this session; the export has just rewritten it.
+        layer.Reload()
+    else:
+        layer = Sdf.Layer.FindOrOpen(path)
+    if layer is None:
+        return []
+    paths = []
+    for asset in layer.GetCompositionAssetDependencies():
+        resolved = layer.ComputeAbsolutePath(asset)
+        if resolved.lower().endswith(LAYER_EXTENSIONS):
+            paths.append(resolved)
+    return paths
+
+
+def CollectOutputs(usd_file, since, dependencies=LayerDependencies):
+    """usd_file and the layers it pulls in that were written at or after since (seconds).
+
+    Follows the exported layer's sublayers, references and payloads. A layer
+    older than since wasn't written by the export (an asset on disk) and is
+    not followed further, so only the exported layers are opened.
+    """
+    target = os.path.abspath(usd_file)
+    outputs = []
+    seen = set()
+    pending = [target]
+    while pending:
+        path = os.path.abspath(pending.pop())
+        key = os.path.normcase(path)
+        if key in seen:
+            continue
+        seen.add(key)
+        try:
+            written = os.stat(path).st_mtime >= since
+        except OSError:
+            continue
+        if not written and path != target:
+            continue
+        outputs.append(path)
+        pending += dependencies(path)
+    return sorted(outputs)
@@ -0,0 +1,105 @@
+########################################################################
+# Frame list helpers
+#
+# Deadline frame lists accept ranges with a step ("1-1000x5"). Writing
+# stepped ranges in that form instead of a comma list keeps job info
+# short and lets Deadline build its task list without parsing thousands
+# of entries.
+########################################################################
+
+import re
+
+_TOKEN_RE = re.compile(r'^(-?\d+)(?:\s*-\s*(-?\d+)(?:\s*[xX:]\s*(\d+))?)?$')
+
+
+def ParseFrameList(text):
+    """Parse a Deadline style frame list ("1-10x2,15,20-18") into a list of ints.
+
+    Order is kept as written. Raises ValueError for malformed input.
+    """
+    frames = []
+    for token in re.split(r'[,\s]+', text.strip()):
+        if not token:
+            continue
+        match = _TOKEN_RE.match(token)
+        if not match:
+            raise ValueError('Invalid frame list entry "%s"' % token)
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) is not None else start
+        step = int(match.group(3) or 1)
+        if step < 1:
+            raise ValueError('Invalid frame step in "%s"' % token)
+        if end >= start:
+            frames.extend(range(start, end + 1, step))
+        else:
+            frames.extend(range(start, end - 1, -step))
+    return frames
+
+
+def CompactFrameList(frames):
+    """Write frames in Deadline's compact syntax, keeping their order.
+
+    Runs of three or more frames with the same step become "start-end" or
+    "start-endxstep": [1, 6, 11, 16, 20] -> "1-16x5,20". Descending runs
+    are written as reverse ranges ("20-15").
+    """
+    frames = list(frames)
+    parts = []
+    i = 0
+    while i < len(frames):
+        j = i
+        if i + 2 < len(frames):
+            step = frames[i + 1] - frames[i]
+            if step != 0 and frames[i + 2] - frames[i + 1] == step:
+                j = i + 2
+                while j + 1 < len(frames) and frames[j + 1] - frames[j] == step:
+                    j += 1
+        if j == i:
+            parts.append(str(frames[i]))
+            i += 1
+            continue
+        step = abs(frames[i + 1] - frames[i])
+        if step == 1:
+            parts.append('%d-%d' % (frames[i], frames[j]))
+        else:
+            parts.append('%d-%dx%d' % (frames[i], frames[j], step))
+        i = j + 1
+    return ','.join(parts)
+
+
+def ProgressiveOrder(frames):
+    """Order frames by binary subdivision: first, last, middle, quarters, eighths, ...
+
+    Deadline creates and hands out tasks in frame list order, so the first tasks
+    to start cover the whole sequence coarsely instead of its start. That says
+    nothing about when they finish: Workers finish tasks in any order, and with
+    a chunk size above one each early task renders several far apart frames,
+    none of which is done before the whole chunk is. The preview pass of
+    Preview + Fill uses one frame per task for that reason.
+    """
+    frames = list(frames)
+    if len(frames) <= 2:
+        return frames
+    order = [0, len(frames) - 1]
+    level = [(0, len(frames) - 1)]
+    while level:
+        nextLevel = []
+        for lo, hi in level:
+            if hi - lo < 2:
+                continue
+            mid = (lo + hi) // 2
+            order.append(mid)
+            nextLevel += [(lo, mid), (mid, hi)]
+        level = nextLevel
+    return [frames[i] for i in order]
+
+
+def SplitPreview(frames, step):
+    """Split frames into a sparse preview (every step-th frame and the last
+    frame) and the remaining fill-in frames, both in their original order."""
+    frames = list(frames)
+    step = max(1, int(step))
+    preview = set(frames[::step])
+    if frames:
+        preview.add(frames[-1])
+    return [f for f in frames if f in preview], [f for f in frames if f not in preview]
@@ -0,0 +1,152 @@
+########################################################################
+# Pre-flight dependency check
+#
+# Finds every layer and asset a USD file depends on and checks them
+# before the job reaches the farm:
+#   - missing files (and references that could not be resolved)
+#   - local-only paths the Workers can't see (LOCAL_PREFIXES by default,
+#     configurable as the Husk plugin's Pre-flight Local Prefixes)
+#   - paths outside the prefixes Deadline path mapping translates
+#
+# Existence is checked per directory: each directory is listed once, in
+# a thread pool, instead of one stat call per file. On network shares
+# that is the difference between minutes and seconds for 10k+ assets.
+########################################################################
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_CHECK_THREADS = 32
+
+# Houdini/USD texture tile tokens, matched against directory listings.
+_TILE_TOKENS = re.compile(r'<UDIM>|<UVTILE>|%\(UDIM\)d', re.IGNORECASE)
+
+# Paths on the submitting machine's own disks; home folders can be removed
+# from the list where they are shared with the Workers.
+LOCAL_PREFIXES = 'C:/;/tmp/;/var/tmp/;/home/;/Users/;~'
+
+
+def CollectDependencies(usd_file):
+    """Return (paths, unresolved) for all layers and assets usd_file depends on."""
+    from pxr import UsdUtils
+
+    layers, assets, unresolved = UsdUtils.ComputeAllDependencies(usd_file)
+    paths = [layer.realPath for layer in layers if layer.realPath]
+    paths += list(assets)
+    return paths, list(unresolved)
+
+
+def SplitPrefixes(text):
+    """Split a ';' separated prefix list ("P:/;//server/proj;/mnt/proj")."""
+    return [p.strip() for p in (text or '').split(';') if p.strip()]
+
+
+def _norm(path):
+    return path.replace('\\', '/').lower()
+
+
+def IsLocalPath(path, prefixes=None):
+    """Best-effort check for paths only the submitting machine can see.
+
+    prefixes is a list of local path prefixes, by default LOCAL_PREFIXES.
+    """
+    if prefixes is None:
+        prefixes = SplitPrefixes(LOCAL_PREFIXES)
+    norm = _norm(path)
+    return any(norm.startswith(_norm(prefix)) for prefix in prefixes)
+
+
+def IsMapped(path, prefixes):
+    """True if the path starts with one of the path mapping prefixes."""
+    norm = _norm(path)
+    return any(norm.startswith(_norm(prefix)) for prefix in prefixes)
+
+
+def _list_directory(directory):
+    try:
+        return directory, set(os.path.normcase(name) for name in os.listdir(directory))
+    except OSError:
+        return directory, None
+
+
+def _exists(path, listings):
+    directory, name = os.path.split(path)
+    names = listings.get(directory)
+    if not names:
+        return False
+    if _TILE_TOKENS.search(name):
+        # Any tile on disk counts; a texture set without tiles is missing.
+        parts = [re.escape(os.path.normcase(part)) for part in _TILE_TOKENS.split(name)]
+        pattern = re.compile('[0-9]+'.join(parts))
+        return any(pattern.fullmatch(n) for n in names)
+    return os.path.normcase(name) in names
+
+
+def CheckPaths(paths, mapping_prefixes=None, is_local=IsLocalPath, max_workers=MAX_CHECK_THREADS, is_mapped=None):
+    """Check dependency paths. Returns a dict of path lists: missing, local, unmapped.
+
+    Paths are only checked for path mapping when mapping_prefixes are given.
+    is_mapped(path) decides then; by default a path is mapped when it starts
+    with one of the prefixes.
+    """
+    if is_mapped is None:
+        is_mapped = lambda path: IsMapped(path, mapping_prefixes)  # noqa: E731
+    unique = []
+    seen = set()
+    for path in paths:
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            unique.append(os.path.abspath(path))
+
+    directories = sorted(set(os.path.dirname(p) for p in unique))
+    listings = {}
+    if directories:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(directories))) as pool:
+            listings = dict(pool.map(_list_directory, directories))
+
+    result = {'checked': len(unique), 'directories': len(directories), 'missing': [], 'local': [], 'unmapped': []}
+    for path in unique:
+        if not _exists(path, listings):
+            result['missing'].append(path)
+        if is_local(path):
+            result['local'].append(path)
+        elif mapping_prefixes and not is_mapped(path):
+            result['unmapped'].append(path)
+    return result
+
+
+def Run(usd_file, mapping_prefixes=None, is_local=IsLocalPath, is_mapped=None):
+    """Collect and check all dependencies of usd_file (see CheckPaths)."""
+    start = time.time()
+    paths, unresolved = CollectDependencies(usd_file)
+    result = CheckPaths([usd_file] + paths, mapping_prefixes, is_local, is_mapped=is_mapped)
+    result['unresolved'] = unresolved
+    result['seconds'] = time.time() - start
+    return result
+
+
+def FormatReport(result, limit=10):
+    """Return a warning text for the submitters, or '' when nothing was found."""
+    sections = (
+        ('missing', 'Missing files'),
+        ('unresolved', 'References that could not be resolved'),
+        ('local', 'Local paths the Workers cannot see'),
+        ('unmapped', 'Paths outside the path mapping prefixes'),
+    )
+    text = ''
+    for key, title in sections:
+        paths = result.get(key) or []
+        if not paths:
+            continue
+        text += '%s (%d):\n' % (title, len(paths))
+        for path in paths[:limit]:
+            text += '    %s\n' % path
+        if len(paths) > limit:
+            text += '    ... and %d more\n' % (len(paths) - limit)
+        text += '\n'
+    if text:
+        text = 'Pre-flight check of %d dependencies:\n\n%s' % (result['checked'], text)
+    return text
@@ -0,0 +1,247 @@
+########################################################################
+# Render settings probe for USD scene files
+#
+# Opening a shot file with every payload loaded and walking the whole
+# scene just to find one RenderSettings prim takes minutes on large
+# files. This probe opens the stage with payloads unloaded, looks up the
+# render settings through the stage metadata or the /Render scope, and
+# caches the result on disk keyed by path, mtime and size.
+#
+# pxr is imported lazily so importing this module is free.
+########################################################################
+
+import json
+import os
+import threading
+import time
+
+CACHE_VERSION = 1
+MAX_CACHE_ENTRIES = 500
+
+# UsdRender convention: render settings, products and vars live under /Render.
+RENDER_SCOPE = '/Render'
+
+_cache_lock = threading.Lock()
+
+
+def _first_target(rel):
+    """Return the first forwarded target path of a relationship, or None."""
+    if not rel:
+        return None
+    targets = rel.GetForwardedTargets()
+    if targets:
+        return targets[0]
+    return None
+
+
+def _find_in_scope(stage, scope_path, type_name):
+    """Return the first prim of type_name below scope_path, or None."""
+    from pxr import Usd
+
+    scope = stage.GetPrimAtPath(scope_path)
+    if not scope or not scope.IsValid():
+        return None
+    for prim in Usd.PrimRange(scope):
+        if prim.GetTypeName() == type_name:
+            return prim
+    return None
+
+
+def _find_near_root(stage, type_name):
+    """Last resort: the root prims and their children, e.g. /Settings/rendersettings.
+
+    Never walks the whole stage: even with payloads unloaded, a shot's
+    reference hierarchy can hold hundreds of thousands of prims.
+    """
+    for root in stage.GetPseudoRoot().GetChildren():
+        if root.GetTypeName() == type_name:
+            return root
+        for prim in root.GetChildren():
+            if prim.GetTypeName() == type_name:
+                return prim
+    return None
+
+
+def FindRenderPrims(stage):
+    """Return (settings_prim, product_prim) for a stage. Either may be None.
+
+    Lookup order: the stage's renderSettingsPrimPath metadata, the /Render
+    scope, then the root prims and their children.
+    """
+    from pxr import Sdf
+
+    settings = None
+    try:
+        from pxr import UsdRender
+        stage_settings = UsdRender.Settings.GetStageRenderSettings(stage)
+        if stage_settings:
+            settings = stage_settings.GetPrim()
+    except (ImportError, AttributeError):
+        pass
+
+    if settings is None:
+        meta_path = stage.GetMetadata('renderSettingsPrimPath') if stage.HasAuthoredMetadata('renderSettingsPrimPath') else ''
+        if meta_path and Sdf.Path.IsValidPathString(meta_path):
+            prim = stage.GetPrimAtPath(meta_path)
+            if prim and prim.IsValid():
+                settings = prim
+
+    if settings is None:
+        settings = _find_in_scope(stage, RENDER_SCOPE, 'RenderSettings')
+
+    product = None
+    if settings is not None:
+        product_path = _first_target(settings.GetRelationship('products'))
+        if product_path is not None:
+            prim = stage.GetPrimAtPath(product_path)
+            if prim and prim.IsValid():
+                product = prim
+
+    if product is None:
+        product = _find_in_scope(stage, RENDER_SCOPE, 'RenderProduct')
+
+    if settings is None:
+        settings = _find_near_root(stage, 'RenderSettings')
+    if product is None:
+        product = _find_near_root(stage, 'RenderProduct')
+
+    return settings, product
+
+
+def ReadRenderSettings(stage, timecode=None):
+    """Extract the submitter-relevant render data from an open stage.
+
+    Returns a plain dict (JSON serialisable) with the keys start, end,
+    resolution, camera, product_name, settings_path and product_path.
+    Values that cannot be found are None.
+    """
+    from pxr import Usd
+
+    if timecode is None:
+        timecode = stage.GetStartTimeCode()
+    timecode = Usd.TimeCode(timecode)
+
+    result = {
+        'start': stage.GetStartTimeCode(),
+        'end': stage.GetEndTimeCode(),
+        'resolution': None,
+        'camera': None,
+        'product_name': None,
+        'settings_path': None,
+        'product_path': None,
+    }
+
+    settings, product = FindRenderPrims(stage)
+
+    if settings is not None:
+        result['settings_path'] = str(settings.GetPath())
+        attr = settings.GetAttribute('resolution')
+        resolution = attr.Get(timecode) if attr else None
+        if resolution is not None:
+            result['resolution'] = [int(resolution[0]), int(resolution[1])]
+        camera = _first_target(settings.GetRelationship('camera'))
+        if camera is not None and stage.GetPrimAtPath(camera):
+            result['camera'] = str(camera)
+
+    if product is not None:
+        result['product_path'] = str(product.GetPath())
+        attr = product.GetAttribute('productName')
+        name = attr.Get(timecode) if attr else None
+        if name:
+            result['product_name'] = str(name)
+        # A product-level camera wins over the settings camera, as in husk.
+        camera = _first_target(product.GetRelationship('camera'))
+        if camera is not None and stage.GetPrimAtPath(camera):
+            result['camera'] = str(camera)
+
+    return result
+
+
+def ProbeFile(filename):
+    """Open a USD file with payloads unloaded and read its render settings."""
+    from pxr import Usd
+
+    stage = Usd.Stage.Open(filename, Usd.Stage.LoadNone)
+    if stage is None:
+        raise RuntimeError('Could not open USD file "%s"' % filename)
+    return ReadRenderSettings(stage)
+
+
+class ProbeCache(object):
+    """On-disk cache of ProbeFile results keyed by path, mtime and size.
+
+    Get only updates the cache in memory; call Save once the files are probed.
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self._entries = None
+        self._dirty = False
+
+    @staticmethod
+    def _key(filename):
+        return os.path.normcase(os.path.abspath(filename))
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self._entries = data.get('entries', {})
+        except (IOError, OSError, ValueError):
+            pass
+
+    def _save(self):
+        """Write the cache file. Returns None, or the error message."""
+        if len(self._entries) > MAX_CACHE_ENTRIES:
+            oldest = sorted(self._entries, key=lambda k: self._entries[k].get('used', 0))
+            for key in oldest[:len(self._entries) - MAX_CACHE_ENTRIES]:
+                del self._entries[key]
+
+        directory = os.path.dirname(self.cache_file)
+        try:
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            tmp = '%s.%d.tmp' % (self.cache_file, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self._entries}, f)
+            os.replace(tmp, self.cache_file)
+        except (IOError, OSError) as e:
+            return 'Could not write USD probe cache "%s": %s' % (self.cache_file, e)
+        self._dirty = False
+        return None
+
+    def Save(self):
+        """Write the entries probed since the last Save. Returns None, or the error message."""
+        with _cache_lock:
+            if not self._dirty:
+                return None
+            return self._save()
+
+    def Get(self, filename):
+        """Return the cached probe result for filename, probing on a miss."""
+        st = os.stat(filename)
+        key = self._key(filename)
+
+        with _cache_lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry and entry.get('mtime') == st.st_mtime and entry.get('size') == st.st_size:
+                entry['used'] = time.time()
+                return dict(entry['result'])
+
+        result = ProbeFile(filename)
+
+        with _cache_lock:
+            self._entries[key] = {
+                'mtime': st.st_mtime,
+                'size': st.st_size,
+                'used': time.time(),
+                'result': result,
+            }
+            self._dirty = True
+        return dict(result)
+
@@ -0,0 +1,114 @@
+########################################################################
+# Chunked USD export stitched with value clips
+#
+# A monolithic export makes every husk task load the time samples of the
+# whole shot. Exported in chunks instead, each chunk layer holds only
+# its own frames, and a small scene file ties them together:
+#
+#   shot.usd               clip metadata on every root prim
+#   shot.topology.usd      the prims and static values, no time samples
+#   shot.manifest.usd      which attributes are animated
+#   shot_clips/shot.0001_0010.usd, ...   time samples of each chunk
+#
+# USD opens clip layers only for the times that are evaluated, so a task
+# reads the topology plus the chunk(s) its frames fall into, and stage
+# load time and memory follow the chunk length instead of the shot's.
+#
+# pxr is imported lazily so importing this module is free.
+########################################################################
+
+import os
+
+
+def ChunkRanges(start, end, step=1, size=10):
+    """Split start..end (every step-th frame) into [(first, last), ...] of size frames."""
+    frames = list(range(int(start), int(end) + 1, max(1, int(step))))
+    size = max(1, int(size))
+    return [(chunk[0], chunk[-1]) for chunk in (frames[i:i + size] for i in range(0, len(frames), size))]
+
+
+def ExportRange(chunk, start, end, step=1):
+    """The frames to export for a chunk: one extra frame on each side, within
+    start..end, so motion blur across a chunk boundary has samples to read."""
+    return max(int(start), chunk[0] - step), min(int(end), chunk[1] + step)
+
+
+def ChunkFile(usd_file, chunk):
+    """shot.usd, (1, 10) -> shot_clips/shot.0001_0010.usd"""
+    base, ext = os.path.splitext(usd_file)
+    name = os.path.basename(base)
+    return os.path.join(base + '_clips', '%s.%04d_%04d%s' % (name, chunk[0], chunk[1], ext))
+
+
+def _sibling(usd_file, kind):
+    base, ext = os.path.splitext(usd_file)
+    return '%s.%s%s' % (base, kind, ext)
+
+
+def _relative(path, anchor):
+    rel = os.path.relpath(path, os.path.dirname(anchor)).replace('\\', '/')
+    return rel if rel.startswith('.') else './' + rel
+
+
+def _new_layer(path):
+    from pxr import Sdf
+
+    layer = Sdf.Layer.FindOrOpen(path) if os.path.isfile(path) else None
+    if layer is None:
+        return Sdf.Layer.CreateNew(path)
+    layer.Clear()
+    return layer
+
+
+def StitchChunks(usd_file, chunks):
+    """Write usd_file (plus topology and manifest) from [(first, last, path), ...].
+
+    Returns the list of files written.
+    """
+    from pxr import Sdf, Usd, UsdUtils
+
+    clip_files = [path for _, _, path in chunks]
+    clip_layers = [Sdf.Layer.FindOrOpen(path) for path in clip_files]
+    if not all(clip_layers):
+        raise RuntimeError('Could not open chunk layer(s): %s' % ', '.join(
+            path for path, layer in zip(clip_files, clip_layers) if layer is None))
+
+    topology_file = _sibling(usd_file, 'topology')
+    topology = _new_layer(topology_file)
+    if not UsdUtils.StitchClipsTopology(topology, clip_files):
+        raise RuntimeError('Could not build the clip topology layer %s' % topology_file)
+    topology.Save()
+    roots = [prim.path for prim in topology.rootPrims]
+
+    manifest_file = _sibling(usd_file, 'manifest')
+    manifest = _new_layer(manifest_file)
+    for path in roots:
+        generated = Usd.ClipsAPI.GenerateClipManifestFromLayers(clip_layers, path)
+        if generated.GetPrimAtPath(path):
+            Sdf.CopySpec(generated, path, manifest, path)
+    manifest.Save()
+
+    result = _new_layer(usd_file)
+    first = clip_layers[0].pseudoRoot
+    for key in first.ListInfoKeys():
+        if key not in ('subLayers', 'subLayerOffsets'):
+            result.pseudoRoot.SetInfo(key, first.GetInfo(key))
+    result.subLayerPaths.append(_relative(topology_file, usd_file))
+    result.startTimeCode = chunks[0][0]
+    result.endTimeCode = chunks[-1][1]
+
+    stage = Usd.Stage.Open(result)
+    stage.SetEditTarget(result)
+    asset_paths = [Sdf.AssetPath(_relative(path, usd_file)) for path in clip_files]
+    for path in roots:
+        clips = Usd.ClipsAPI(stage.OverridePrim(path))
+        clips.SetClipAssetPaths(asset_paths)
+        clips.SetClipPrimPath(str(path))
+        clips.SetClipActive([(first_frame, index) for index, (first_frame, _, _) in enumerate(chunks)])
+        # Clip time is stage time; each clip is active from its first frame on.
+        clips.SetClipTimes([(chunks[0][0], chunks[0][0]), (chunks[-1][1], chunks[-1][1])])
+        clips.SetClipManifestAssetPath(Sdf.AssetPath(_relative(manifest_file, usd_file)))
+        # An attribute a chunk holds no samples for is interpolated from its neighbours.
+        clips.SetInterpolateMissingClipValues(True)
+    result.Save()
+    return [usd_file, topology_file, manifest_file]
@@ -0,0 +1,6 @@
+"""Shared helpers for the Husk submitters.
+
+Used by the Deadline Monitor submitter (HuskSubmission.py) and by the Houdini
+HDA, which imports this package from the Deadline repository. Nothing in here
+may import Deadline or Houdini modules at import time.
+"""
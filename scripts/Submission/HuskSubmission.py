@@ -14,11 +14,34 @@
 
 from __future__ import absolute_import
 import os
-from typing import Any, Tuple
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
-from pxr import Usd, Vt
 import re
 
+# Shared helpers (HuskLib) live next to this script.
+_scriptDir = os.path.dirname(os.path.abspath(__file__))
+if _scriptDir not in sys.path:
+    sys.path.append(_scriptDir)
+
+from HuskLib import ChunkPlanner, Frames, Preflight, UsdProbe, WebService
+
+# Qt is only used for a timer that polls background scene loads.
+try:
+    from PyQt5.QtCore import QTimer
+except ImportError:
+    try:
+        from PySide2.QtCore import QTimer
+    except ImportError:
+        try:
+            from PySide6.QtCore import QTimer
+        except ImportError:
+            QTimer = None
+
 #from System import *
 from System.Collections.Specialized import StringCollection
 from System.IO import Path, StreamWriter, File, Directory
@@ -38,6 +61,15 @@ from ThinkboxUI.Controls.Scripting.ButtonControl import ButtonControl
 ########################################################################
 scriptDialog = None  # type: DeadlineScriptDialog
 settings = None
+USD_EXTENSIONS = ('.usd', '.usda', '.usdc', '.usdz')
+# Scene files are inspected over the network, so a few at a time is plenty.
+MAX_INSPECT_THREADS = 8
+probeCache = None  # type: UsdProbe.ProbeCache
+sceneLoad = None  # type: Optional[SceneLoad]
+loadTimer = None
+batchInspection = None  # type: Optional[BatchInspection]
+batchTimer = None
+submitter = None  # type: Optional[WebService.Submitter]
 
 ########################################################################
 ## Main HUSK function called by Deadline
@@ -46,6 +78,8 @@ settings = None
 def __main__(*args):
     global scriptDialog
     global settings
+    global loadTimer
+    global batchTimer
     
     scriptDialog = DeadlineScriptDialog()
     scriptDialog.SetTitle('Submit Husk USD Job To Deadline')
@@ -120,6 +154,10 @@ def __main__(*args):
 
     scriptDialog.AddControlToGrid( "FramesLabel", "LabelControl", "Frame List", 2, 0, "The frame range to render.", False )
     scriptDialog.AddControlToGrid( "FramesBox", "TextControl", "", 2, 1 )
+    scriptDialog.AddControlToGrid( "SceneStatusLabel", "LabelControl", "", 2, 2, "Progress of the USD file inspection.", False )
+    cancelLoadButton = scriptDialog.AddControlToGrid( "CancelLoadButton", "ButtonControl", "Cancel", 2, 3, "Stop waiting for the USD file inspection.", False )
+    cancelLoadButton.ValueModified.connect( CancelLoadPressed )
+    scriptDialog.SetEnabled( "CancelLoadButton", False )
 
     resOverrideBox = scriptDialog.AddSelectionControlToGrid( "ResOverrideBox", "CheckBoxControl", False, "Override Resolution", 3, 0, "If enabled, resolution will be overwritten with the values specified." )
     resOverrideBox.ValueModified.connect( enableResOverride )
@@ -152,9 +190,48 @@ def __main__(*args):
     
     scriptDialog.AddControlToGrid( "LogLabel", "LabelControl", "Log Level", 8, 0, "Set log level. Default 6, above 8 can impact performance", False )
     scriptDialog.AddRangeControlToGrid( "LogLevel", "RangeControl", 6, 0, 9, 0, 1, 8, 1 )
+
+    scriptDialog.AddControlToGrid( "ChunkSizeLabel", "LabelControl", "Frames Per Task", 9, 0, "Number of frames rendered by one husk process. Stage loading is paid once per task.", False )
+    scriptDialog.AddRangeControlToGrid( "ChunkSizeBox", "RangeControl", 1, 1, 1000000, 0, 1, 9, 1 )
+    autoChunkBox = scriptDialog.AddSelectionControlToGrid( "AutoChunkBox", "CheckBoxControl", False, "Automatic Frames Per Task", 9, 2, "Pick the frames per task from the render statistics history of similar scenes (Render Statistics History File in the Husk plugin configuration). Falls back to Frames Per Task without enough history.", colSpan=2 )
+    autoChunkBox.ValueModified.connect( autoChunkEnable )
+
+    scriptDialog.AddControlToGrid( "TargetTaskLabel", "LabelControl", "Target Task Minutes", 10, 0, "Task duration the automatic frames per task aims for.", False )
+    scriptDialog.AddRangeControlToGrid( "TargetTaskBox", "RangeControl", 30, 1, 100000, 0, 1, 10, 1 )
+    scriptDialog.SetEnabled( "TargetTaskLabel", False )
+    scriptDialog.SetEnabled( "TargetTaskBox", False )
+
+    scriptDialog.AddSelectionControlToGrid( "PreflightBox", "CheckBoxControl", False, "Pre-flight Dependency Check", 11, 0, "Before submitting, check every layer and asset the USD file depends on: missing files, local paths, and paths outside the Path Mapping Prefixes of the Husk plugin configuration.", colSpan=2 )
+
+    scriptDialog.AddControlToGrid( "FrameOrderLabel", "LabelControl", "Frame Order", 12, 0, "Ascending renders the frames in order. Progressive renders first, last, middle, then quarters and so on, so the first results cover the whole sequence. Preview + Fill submits every n-th frame as a higher priority preview job and the remaining frames as a job that waits for it.", False )
+    frameOrderBox = scriptDialog.AddComboControlToGrid( "FrameOrderBox", "ComboControl", "Ascending", ( "Ascending", "Progressive", "Preview + Fill" ), 12, 1 )
+    frameOrderBox.ValueModified.connect( frameOrderChanged )
+    scriptDialog.AddControlToGrid( "PreviewStepLabel", "LabelControl", "Preview Every n-th Frame", 12, 2, "Frame step of the preview job.", False )
+    scriptDialog.AddRangeControlToGrid( "PreviewStepBox", "RangeControl", 10, 2, 100000, 0, 1, 12, 3 )
     
     scriptDialog.EndGrid()
     scriptDialog.EndTabPage()
+
+    scriptDialog.AddTabPage('Batch')
+    scriptDialog.AddGrid()
+    scriptDialog.AddControlToGrid( "Separator4", "SeparatorControl", "Batch Submission", 0, 0, colSpan=3 )
+
+    scriptDialog.AddControlToGrid( "BatchFilesLabel", "LabelControl", "USD Files", 1, 0, "Submit one job per USD file. Frame range and output path are read from each file. When files or a folder are set here, the USD File on the Husk Options page is ignored.", False )
+    scriptDialog.AddSelectionControlToGrid( "BatchFilesBox", "MultiFileBrowserControl", "", "USD Files (*.usd; *.usda; *.usdc; *.usdz);;All Files (*)", 1, 1, colSpan=2 )
+
+    scriptDialog.AddControlToGrid( "BatchFolderLabel", "LabelControl", "Scan Folder", 2, 0, "Also submit every USD file found in this folder.", False )
+    scriptDialog.AddSelectionControlToGrid( "BatchFolderBox", "FolderBrowserControl", "", "", 2, 1 )
+    scriptDialog.AddSelectionControlToGrid( "BatchRecursiveBox", "CheckBoxControl", False, "Include Subfolders", 2, 2, "If enabled, subfolders of the scan folder are searched as well." )
+
+    scriptDialog.AddControlToGrid( "BatchNameLabel", "LabelControl", "Batch Name", 3, 0, "Groups the submitted jobs in the Monitor. Defaults to the Job Name.", False )
+    scriptDialog.AddControlToGrid( "BatchNameBox", "TextControl", "", 3, 1, colSpan=2 )
+
+    scriptDialog.AddControlToGrid( "BatchStatusLabel", "LabelControl", "", 4, 1, "Progress of the batch inspection.", False )
+    cancelBatchButton = scriptDialog.AddControlToGrid( "CancelBatchButton", "ButtonControl", "Cancel", 4, 2, "Stop the batch inspection; nothing is submitted.", False )
+    cancelBatchButton.ValueModified.connect( CancelBatchPressed )
+    scriptDialog.SetEnabled( "CancelBatchButton", False )
+    scriptDialog.EndGrid()
+    scriptDialog.EndTabPage()
     
     scriptDialog.EndTabControl()
     
@@ -167,10 +244,22 @@ def __main__(*args):
     scriptDialog.EndGrid()
     
     #Application Box must be listed before version box or else the application changed event will change the version
-    settings = ( "DepartmentBox", "CategoryBox", "PoolBox", "SecondaryPoolBox", "GroupBox", "PriorityBox", "MachineLimitBox", "IsBlacklistBox", "MachineListBox", "LimitGroupBox", "SceneBox")
+    settings = ( "DepartmentBox", "CategoryBox", "PoolBox", "SecondaryPoolBox", "GroupBox", "PriorityBox", "MachineLimitBox", "IsBlacklistBox", "MachineListBox", "LimitGroupBox", "SceneBox", "ChunkSizeBox", "AutoChunkBox", "TargetTaskBox", "PreflightBox", "FrameOrderBox", "PreviewStepBox")
     scriptDialog.LoadSettings( GetSettingsFilename(), settings )
     scriptDialog.EnabledStickySaving( settings, GetSettingsFilename() )
+    autoChunkEnable()
+    frameOrderChanged()
     
+    if QTimer is not None:
+        loadTimer = QTimer()
+        loadTimer.setInterval( 100 )
+        loadTimer.timeout.connect( PollSceneLoad )
+        batchTimer = QTimer()
+        batchTimer.setInterval( 200 )
+        batchTimer.timeout.connect( PollBatchInspection )
+
+    # The sticky SceneBox value is inspected in the background so the dialog
+    # shows up straight away.
     FileLoaded()
     scriptDialog.ShowDialog( False )
     
@@ -192,6 +281,22 @@ def delegateEnable( *args ):
     scriptDialog.SetEnabled( "RenderDelegate", resOverride )
 
 
+def autoChunkEnable( *args ):
+    # type: (*CheckBoxControl) -> None
+    global scriptDialog
+    autoChunk = scriptDialog.GetValue( "AutoChunkBox" )
+    scriptDialog.SetEnabled( "TargetTaskLabel", autoChunk )
+    scriptDialog.SetEnabled( "TargetTaskBox", autoChunk )
+
+
+def frameOrderChanged( *args ):
+    # type: (*ComboControl) -> None
+    global scriptDialog
+    preview = scriptDialog.GetValue( "FrameOrderBox" ) == "Preview + Fill"
+    scriptDialog.SetEnabled( "PreviewStepLabel", preview )
+    scriptDialog.SetEnabled( "PreviewStepBox", preview )
+
+
 def GetSettingsFilename():
     # type: () -> str
     return os.path.join(ClientUtils.GetUsersSettingsDirectory(), 'HuskSettings.ini')
@@ -212,68 +317,370 @@ def FixPath(old_path, new_sep='/', rem_spaces=1):
     new_path = _path
     return new_path
     
+def GetProbeCache():
+    # type: () -> UsdProbe.ProbeCache
+    global probeCache
+    if probeCache is None:
+        probeCache = UsdProbe.ProbeCache(os.path.join(ClientUtils.GetUsersSettingsDirectory(), 'HuskProbeCache.json'))
+    return probeCache
+
+class SceneLoad(object):
+    """Inspect a USD file on a background thread.
+
+    Usd.Stage.Open cannot be interrupted, so cancelling a load (or picking
+    another file) only detaches it from the dialog and its result is dropped.
+    """
+
+    def __init__(self, filename):
+        # type: (str) -> None
+        self.filename = filename
+        self.started = time.time()
+        self.cancelled = False
+        self.done = False
+        self.result = None
+        self.error = None  # type: Optional[Exception]
+        self.cacheError = None  # type: Optional[str]
+        self.thread = threading.Thread(target=self._run, name='HuskSceneLoad')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        try:
+            self.result = GetProbeCache().Get(self.filename)
+        except Exception as e:
+            self.error = e
+        self.cacheError = GetProbeCache().Save()
+        self.done = True
+
+def SetLoadStatus( text, busy ):
+    # type: (str, bool) -> None
+    global scriptDialog
+    scriptDialog.SetValue( 'SceneStatusLabel', text )
+    scriptDialog.SetEnabled( 'CancelLoadButton', busy )
+
+def CancelSceneLoad():
+    # type: () -> bool
+    global sceneLoad
+    if sceneLoad is None:
+        return False
+    sceneLoad.cancelled = True
+    sceneLoad = None
+    if loadTimer is not None:
+        loadTimer.stop()
+    return True
+
+def CancelLoadPressed( *args ):
+    # type: (*ButtonControl) -> None
+    if CancelSceneLoad():
+        print('USD file inspection cancelled')
+        SetLoadStatus( 'Cancelled', False )
+
 def FileLoaded( *args ):
     # type: (*Any) -> None
     global scriptDialog
+    global sceneLoad
     
+    # A load for a previously selected file is stale now.
+    CancelSceneLoad()
+    SetLoadStatus( '', False )
+
     filename = scriptDialog.GetValue('SceneBox').strip()
     filename = FixPath(filename, rem_spaces=0)
-    stage = None
-    if File.Exists(filename):
-        try:
-            print('loading... ' + str(filename))
-            stage = Usd.Stage.Open(filename)
-        except TypeError:
-            print('TypeError thrown')
-        except NameError:
-            print('NameError thrown')
-        except Exception as e:
-            print('An exception occurred that was not NameError or TypeError')
-            return
-        print('USD file loaded')
-
-        # Set job name to scene file name (without directory or extension).
-        # Use a path-agnostic split so UNC/Linux paths work, not just X:/ drives.
-        jobName = os.path.splitext(os.path.basename(filename))[0]
-        scriptDialog.SetValue('NameBox', jobName)
-
-        # Get start and end frame
-        startfr = stage.GetStartTimeCode()
-        endfr = stage.GetEndTimeCode()
-
-        frameString = str(int(startfr)) + '-' + str(int(endfr))
-        scriptDialog.SetValue('FramesBox', frameString)
-
-        # Find the Rendersetting and Product primitives in USD scene
-        product = None
-        rendersettings = None
-
-        for prim in stage.Traverse():
-            primtype = prim.GetTypeName()
-            if str(primtype) == 'RenderSettings':
-                rendersettings = stage.GetPrimAtPath(prim.GetPath())
-            elif str(primtype) == 'RenderProduct':
-                product = stage.GetPrimAtPath(prim.GetPath())
-
-        if product == None or rendersettings == None:
-            print('Rendersettings not found in .usd file!\nCannot read complete render data from file..\n')
-        
-        # Get render resolution
-        if rendersettings != None:
-            resolution = rendersettings.GetAttribute('resolution').Get()
-            scriptDialog.SetValue('WidthBox', resolution[0])
-            scriptDialog.SetValue('HeightBox', resolution[1])
-
-        # Grab the output file name from the RenderProduct prim discovered above,
-        # rather than assuming a hardcoded /Render/Products/renderproduct path.
-        if product != None:
-            rnd_output_file = product.GetAttribute('productName').Get()
-            if rnd_output_file:
-                outputFile = FixPath(rnd_output_file, rem_spaces=0)
-                scriptDialog.SetValue('ImageOutputBox', outputFile)
+    if not File.Exists(filename):
+        return
+
+    print('loading... ' + str(filename))
+    sceneLoad = SceneLoad(filename)
+    if loadTimer is None:
+        # No Qt timer available: wait for the load on the UI thread.
+        sceneLoad.thread.join()
+        PollSceneLoad()
+        return
+
+    SetLoadStatus( 'Inspecting USD file...', True )
+    loadTimer.start()
+
+def PollSceneLoad():
+    # type: () -> None
+    global sceneLoad
+    load = sceneLoad
+    if load is None:
+        if loadTimer is not None:
+            loadTimer.stop()
+        return
+
+    if not load.done:
+        SetLoadStatus( 'Inspecting USD file... %ds' % int(time.time() - load.started), True )
+        return
+
+    if loadTimer is not None:
+        loadTimer.stop()
+    sceneLoad = None
+
+    if load.cacheError:
+        print(load.cacheError)
+    if load.error is not None:
+        print('Could not read USD file: %s' % load.error)
+        SetLoadStatus( 'Could not read USD file', False )
+        return
+
+    print('USD file loaded')
+    SetLoadStatus( '', False )
+    ApplySceneInfo( load.filename, load.result )
+
+def ApplySceneInfo( filename, info ):
+    # type: (str, dict) -> None
+    global scriptDialog
+
+    # Set job name to scene file name (without directory or extension).
+    # Use a path-agnostic split so UNC/Linux paths work, not just X:/ drives.
+    jobName = os.path.splitext(os.path.basename(filename))[0]
+    scriptDialog.SetValue('NameBox', jobName)
+
+    # Get start and end frame
+    frameString = str(int(info['start'])) + '-' + str(int(info['end']))
+    scriptDialog.SetValue('FramesBox', frameString)
+
+    if info['product_path'] == None or info['settings_path'] == None:
+        print('Rendersettings not found in .usd file!\nCannot read complete render data from file..\n')
+    
+    # Get render resolution
+    if info['resolution'] != None:
+        scriptDialog.SetValue('WidthBox', info['resolution'][0])
+        scriptDialog.SetValue('HeightBox', info['resolution'][1])
+
+    # Grab the output file name from the RenderProduct prim discovered above,
+    # rather than assuming a hardcoded /Render/Products/renderproduct path.
+    if info['product_name']:
+        outputFile = FixPath(info['product_name'], rem_spaces=0)
+        scriptDialog.SetValue('ImageOutputBox', outputFile)
+    
+def GetBatchFiles():
+    # type: () -> List[str]
+    """Return the USD files selected on the Batch page, in a stable order."""
+    global scriptDialog
+    files = [f.strip() for f in scriptDialog.GetValue('BatchFilesBox').split(';') if f.strip()]
+
+    folder = scriptDialog.GetValue('BatchFolderBox').strip()
+    if folder and os.path.isdir(folder):
+        if scriptDialog.GetValue('BatchRecursiveBox'):
+            for root, dirs, names in os.walk(folder):
+                dirs.sort()
+                files += [os.path.join(root, n) for n in sorted(names) if n.lower().endswith(USD_EXTENSIONS)]
+        else:
+            files += [os.path.join(folder, n) for n in sorted(os.listdir(folder)) if n.lower().endswith(USD_EXTENSIONS)]
+
+    unique = []
+    seen = set()
+    for f in files:
+        key = os.path.normcase(os.path.abspath(f))
+        if key not in seen:
+            seen.add(key)
+            unique.append(f)
+    return unique
+
+def LoadStatsHistory():
+    # type: () -> List[dict]
+    """Render statistics history written by the Husk plugin, or [] if not configured."""
+    if not scriptDialog.GetValue('AutoChunkBox'):
+        return []
+    historyFile = RepositoryUtils.GetPluginConfig('Husk').GetConfigEntryWithDefault('RenderStatsHistoryFile', '').strip()
+    if not historyFile:
+        print('Automatic frames per task: no Render Statistics History File set in the Husk plugin configuration.')
+        return []
+    return ChunkPlanner.LoadHistory( RepositoryUtils.CheckPathMapping( historyFile ) )
+
+def PreflightPrefixes():
+    # type: () -> Optional[Tuple[List[str], List[str]]]
+    """(path mapping prefixes, local prefixes) for the pre-flight check, or None if the check is turned off.
+
+    Read on the UI thread; RunPreflight may run on a worker thread.
+    """
+    if not scriptDialog.GetValue('PreflightBox'):
+        return None
+    config = RepositoryUtils.GetPluginConfig('Husk')
+    mappingPrefixes = Preflight.SplitPrefixes( config.GetConfigEntryWithDefault('PathMappingPrefixes', '') )
+    localPrefixes = Preflight.SplitPrefixes( config.GetConfigEntryWithDefault('PreflightLocalPrefixes', Preflight.LOCAL_PREFIXES) )
+    return mappingPrefixes, localPrefixes
+
+def IsPathMapped( path, mappingPrefixes ):
+    # type: (str, List[str]) -> bool
+    """True if Deadline's path mapping translates the path for the Workers.
+
+    CheckPathMapping translates for the OS it runs on: a path of another OS that
+    a rule covers comes back changed. A path native to this machine comes back
+    unchanged whether or not a rule covers it for the other OSes, so those are
+    matched against the Path Mapping Prefixes.
+    """
+    mapped = RepositoryUtils.CheckPathMapping( path )
+    if mapped.replace( "\\", "/" ) != path.replace( "\\", "/" ):
+        return True
+    return Preflight.IsMapped( path, mappingPrefixes )
+
+def RunPreflight( sceneFile, prefixes ):
+    # type: (str, Optional[Tuple[List[str], List[str]]]) -> str
+    """Pre-flight dependency check of one USD file. Returns warning text, or '' if all is well."""
+    if prefixes is None or not os.path.isfile( sceneFile ):
+        return ''
+    mappingPrefixes, localPrefixes = prefixes
+    isLocal = lambda path: PathUtils.IsPathLocal( path ) or Preflight.IsLocalPath( path, localPrefixes )
+    isMapped = lambda path: IsPathMapped( path, mappingPrefixes )
+    try:
+        result = Preflight.Run( sceneFile, mappingPrefixes, isLocal, isMapped )
+    except Exception as e:
+        return 'Pre-flight check of "%s" failed: %s\n\n' % ( sceneFile, e )
+    print('Pre-flight check of %s: %d files in %d folders, %.1fs' % ( os.path.basename( sceneFile ), result['checked'], result['directories'], result['seconds'] ))
+    return Preflight.FormatReport( result )
+
+def GetChunkSize( sceneFile, history ):
+    # type: (str, List[dict]) -> int
+    global scriptDialog
+    chunkSize = scriptDialog.GetValue('ChunkSizeBox')
+    if not scriptDialog.GetValue('AutoChunkBox') or not history:
+        return chunkSize
+
+    delegate = scriptDialog.GetValue('RenderDelegate') if scriptDialog.GetValue('OverrideRenderDelegate') else ''
+    planned, reason = ChunkPlanner.PlanChunkSize( sceneFile, delegate, history, scriptDialog.GetValue('TargetTaskBox') )
+    print('Frames per task for %s: %s' % ( os.path.basename( sceneFile ), reason ))
+    return planned if planned is not None else chunkSize
+
+def BuildJobInfo( jobName, frames, imageOutputDirectory, chunkSize=1 ):
+    # type: (str, str, str, int) -> Dict[str, Any]
+    global scriptDialog
+    jobInfo = {
+        'Plugin': 'Husk',
+        'Name': jobName,
+        'Comment': scriptDialog.GetValue('CommentBox'),
+        'Department': scriptDialog.GetValue('DepartmentBox'),
+        'Pool': scriptDialog.GetValue('PoolBox'),
+        'SecondaryPool': scriptDialog.GetValue('SecondaryPoolBox'),
+        'Group': scriptDialog.GetValue('GroupBox'),
+        'Priority': scriptDialog.GetValue('PriorityBox'),
+        'TaskTimeoutMinutes': scriptDialog.GetValue('TaskTimeoutBox'),
+        'EnableAutoTimeout': scriptDialog.GetValue('AutoTimeoutBox'),
+        'ConcurrentTasks': scriptDialog.GetValue('ConcurrentTasksBox'),
+        'LimitConcurrentTasksToNumberOfCpus': scriptDialog.GetValue('LimitConcurrentTasksBox'),
+        'MachineLimit': scriptDialog.GetValue('MachineLimitBox'),
+    }
+    if bool(scriptDialog.GetValue('IsBlacklistBox')):
+        jobInfo['Blacklist'] = scriptDialog.GetValue('MachineListBox')
+    else:
+        jobInfo['Whitelist'] = scriptDialog.GetValue('MachineListBox')
+    
+    jobInfo['LimitGroups'] = scriptDialog.GetValue('LimitGroupBox')
+    jobInfo['JobDependencies'] = scriptDialog.GetValue('DependencyBox')
+    jobInfo['OnJobComplete'] = scriptDialog.GetValue('OnJobCompleteBox')
+    
+    if bool( scriptDialog.GetValue('SubmitSuspendedBox')):
+        jobInfo['InitialStatus'] = 'Suspended'
     
+    jobInfo['Frames'] = frames
+    jobInfo['ChunkSize'] = chunkSize
+
+    if len( imageOutputDirectory ) > 0:
+        jobInfo['OutputDirectory0'] = imageOutputDirectory
+
+    return jobInfo
+
+def BuildPluginInfo( sceneFile, imageOutputDirectory ):
+    # type: (str, str) -> Dict[str, Any]
+    global scriptDialog
+    pluginInfo = {'SceneFile': sceneFile}
+
+    if len( imageOutputDirectory ) > 0:
+        pluginInfo['ImageOutputDirectory'] = imageOutputDirectory
+
+    pluginInfo['OverrideResolution'] = '%d' % scriptDialog.GetValue('ResOverrideBox')
+    pluginInfo['Width'] = '%d' % scriptDialog.GetValue('WidthBox')
+    pluginInfo['Height'] = '%d' % scriptDialog.GetValue('HeightBox')
+    pluginInfo['LogLevel'] = '%d' % scriptDialog.GetValue('LogLevel')
+    pluginInfo['OverrideRenderDelegate'] = '%d' % scriptDialog.GetValue('OverrideRenderDelegate')
+    pluginInfo['RenderDelegate'] = scriptDialog.GetValue('RenderDelegate')
+    pluginInfo['CustomArguments'] = scriptDialog.GetValue('CustomArgs')
+    #pluginInfo['DisableMotionBlur'] = '%d' % scriptDialog.GetValue('DisableMoBlur')
+    return pluginInfo
+
+def WriteInfoFile( prefix, info ):
+    # type: (str, Dict[str, Any]) -> str
+    """Write a job/plugin info dict to a uniquely named file in the Deadline temp folder."""
+    handle, filename = tempfile.mkstemp( prefix=prefix, suffix='.job', dir=ClientUtils.GetDeadlineTempPath() )
+    os.close( handle )
+    writer = StreamWriter( filename, False, Encoding.Unicode )
+    for key, value in info.items():
+        writer.WriteLine( '%s=%s' % ( key, value ) )
+    writer.Close()
+    return filename
+
+def RemoveInfoFiles( filenames ):
+    # type: (List[str]) -> None
+    for filename in filenames:
+        try:
+            os.remove( filename )
+        except OSError:
+            pass
+
+def SubmitWithDeadlineCommand( jobInfo, pluginInfo, auxFiles=() ):
+    # type: (Dict[str, Any], Dict[str, Any], Any) -> Tuple[str, str]
+    """Submit one job through deadlinecommand. Returns (job id, output)."""
+    jobInfoFilename = WriteInfoFile( 'husk_job_info_', jobInfo )
+    pluginInfoFilename = WriteInfoFile( 'husk_plugin_info_', pluginInfo )
+    arguments = StringCollection()
+    arguments.Add( jobInfoFilename )
+    arguments.Add( pluginInfoFilename )
+    for auxFile in auxFiles:
+        arguments.Add( auxFile )
+    output = ClientUtils.ExecuteCommandAndGetOutput( arguments )
+    RemoveInfoFiles( [jobInfoFilename, pluginInfoFilename] )
+    return ParseSubmissionResults( output, 1 )[0][1], output
+
+def GetSubmitter():
+    # type: () -> Optional[WebService.Submitter]
+    """Web Service submitter for the Husk plugin's Web Service Address, or None to use deadlinecommand."""
+    global submitter
+    address = RepositoryUtils.GetPluginConfig('Husk').GetConfigEntryWithDefault('WebServiceAddress', '').strip()
+    if submitter is not None and submitter.web_service.address != address:
+        submitter.close()
+        submitter = None
+    if address and submitter is None:
+        submitter = WebService.Submitter( WebService.DeadlineWebService( address ), SubmitWithDeadlineCommand )
+    return submitter
+
+def SubmitJob( jobInfo, pluginInfo ):
+    # type: (Dict[str, Any], Dict[str, Any]) -> Tuple[str, str]
+    """Submit one job through the Web Service if configured, else deadlinecommand. Returns (job id, output)."""
+    webSubmitter = GetSubmitter()
+    if webSubmitter is None:
+        return SubmitWithDeadlineCommand( jobInfo, pluginInfo )
+    return webSubmitter.Submit( jobInfo, pluginInfo )
+
+def ParseSubmissionResults( output, count ):
+    # type: (str, int) -> List[Tuple[str, str]]
+    """Split deadlinecommand output into one (result, job id) pair per submitted job."""
+    results = []
+    blocks = output.split('Result=')[1:]
+    for block in blocks:
+        lines = block.splitlines()
+        status = lines[0].strip() if lines else ''
+        jobId = ''
+        for line in lines:
+            if line.startswith('JobID='):
+                jobId = line[len('JobID='):].strip()
+                break
+        results.append( ( status, jobId ) )
+    while len( results ) < count:
+        results.append( ( 'Unknown', '' ) )
+    return results
+
 def SubmitButtonPressed(*args):
-   # type: (*ButtonControl) -> None
+    # type: (*ButtonControl) -> None
+    batchFiles = GetBatchFiles()
+    if batchFiles:
+        SubmitBatch( batchFiles )
+    else:
+        SubmitSingle()
+
+def SubmitSingle():
+    # type: () -> None
     global scriptDialog
     errors = ""
     warnings = ""
@@ -285,12 +692,22 @@ def SubmitButtonPressed(*args):
     tempErrors, tempWarnings = CheckFile(sceneFile, 'USD', False)
     errors += tempErrors
     warnings += tempWarnings
+    if not tempErrors:
+        warnings += RunPreflight( sceneFile, PreflightPrefixes() )
 
 
     # Check if a valid frame range has been specified.
     frames = scriptDialog.GetValue('FramesBox').strip()
+    frameList = []  # type: List[int]
     if not FrameUtils.FrameRangeValid(frames):
         errors += 'The Frame Range "%s" is not valid.\n' % frames
+    else:
+        # Submit stepped lists in Deadline's compact "1-100x5" form.
+        try:
+            frameList = Frames.ParseFrameList( frames )
+            frames = Frames.CompactFrameList( frameList )
+        except ValueError:
+            pass
 
     # Check the image output folder
     imageOutputDirectory = scriptDialog.GetValue('ImageOutputBox').strip()
@@ -298,8 +715,6 @@ def SubmitButtonPressed(*args):
     errors += tempErrors
     warnings += tempWarnings
 
-    concurrentTasks = scriptDialog.GetValue('ConcurrentTasksBox')
-
     # output errors , warnings
     if errors:
         scriptDialog.ShowMessageBox('The following errors must be fixed before submitting the Husk job:\n\n%s' % errors, 'Errors')
@@ -311,79 +726,232 @@ def SubmitButtonPressed(*args):
 
     jobName = scriptDialog.GetValue('NameBox')
 
+    chunkSize = GetChunkSize( sceneFile, LoadStatsHistory() )
 
+    frameOrder = scriptDialog.GetValue('FrameOrderBox')
+    if frameOrder == 'Preview + Fill' and frameList:
+        preview, fill = Frames.SplitPreview( frameList, scriptDialog.GetValue('PreviewStepBox') )
+        if fill:
+            SubmitPreviewAndFill( jobName, preview, fill, sceneFile, imageOutputDirectory, chunkSize )
+            return
+    elif frameOrder == 'Progressive' and frameList:
+        frames = Frames.CompactFrameList( Frames.ProgressiveOrder( frameList ) )
 
-     # Create job info file.
-    jobInfoFilename = os.path.join(ClientUtils.GetDeadlineTempPath(), 'husk_job_info.job')
-    writer = StreamWriter( jobInfoFilename, False, Encoding.Unicode )
-    writer.WriteLine('Plugin=Husk')
-    writer.WriteLine('Name=%s' % jobName )
-    writer.WriteLine('Comment=%s' % scriptDialog.GetValue('CommentBox'))
-    writer.WriteLine('Department=%s' % scriptDialog.GetValue('DepartmentBox'))
-    writer.WriteLine('Pool=%s' % scriptDialog.GetValue('PoolBox'))
-    writer.WriteLine('SecondaryPool=%s' % scriptDialog.GetValue('SecondaryPoolBox'))
-    writer.WriteLine('Group=%s' % scriptDialog.GetValue('GroupBox'))
-    writer.WriteLine('Priority=%s' % scriptDialog.GetValue('PriorityBox'))
-    writer.WriteLine('TaskTimeoutMinutes=%s' % scriptDialog.GetValue('TaskTimeoutBox'))
-    writer.WriteLine('EnableAutoTimeout=%s' % scriptDialog.GetValue('AutoTimeoutBox'))
-    writer.WriteLine('ConcurrentTasks=%s' % concurrentTasks )
-    writer.WriteLine('LimitConcurrentTasksToNumberOfCpus=%s' % scriptDialog.GetValue('LimitConcurrentTasksBox'))
-    
-    writer.WriteLine('MachineLimit=%s' % scriptDialog.GetValue('MachineLimitBox'))
-    if bool(scriptDialog.GetValue('IsBlacklistBox')):
-        writer.WriteLine('Blacklist=%s' % scriptDialog.GetValue('MachineListBox'))
-    else:
-        writer.WriteLine('Whitelist=%s' % scriptDialog.GetValue('MachineListBox'))
-    
-    writer.WriteLine('LimitGroups=%s' % scriptDialog.GetValue('LimitGroupBox'))
-    writer.WriteLine('JobDependencies=%s' % scriptDialog.GetValue('DependencyBox'))
-    writer.WriteLine('OnJobComplete=%s' % scriptDialog.GetValue('OnJobCompleteBox'))
-    
-    if bool( scriptDialog.GetValue('SubmitSuspendedBox')):
-        writer.WriteLine('InitialStatus=Suspended')
-    
-    writer.WriteLine('Frames=%s' % frames)
-    writer.WriteLine('ChunkSize=1')
+    # Now submit the job.
+    jobId, results = SubmitJob( BuildJobInfo( jobName, frames, imageOutputDirectory, chunkSize ), BuildPluginInfo( sceneFile, imageOutputDirectory ) )
+    scriptDialog.ShowMessageBox( results, 'Submission Results')
 
-    outputDirectoryCount = 0
-    if len( imageOutputDirectory ) > 0:
-        writer.WriteLine('OutputDirectory%s=%s' % ( outputDirectoryCount, imageOutputDirectory ) )
-        outputDirectoryCount += 1
+def SubmitPreviewAndFill( jobName, preview, fill, sceneFile, imageOutputDirectory, chunkSize ):
+    # type: (str, List[int], List[int], str, str, int) -> None
+    """Submit a sparse, higher priority preview job and a fill-in job that depends on it."""
+    global scriptDialog
+    pluginInfo = BuildPluginInfo( sceneFile, imageOutputDirectory )
+
+    # One frame per task, so each preview frame is done as soon as it is rendered.
+    previewInfo = BuildJobInfo( '%s [PREVIEW]' % jobName, Frames.CompactFrameList( Frames.ProgressiveOrder( preview ) ), imageOutputDirectory, 1 )
+    previewInfo['BatchName'] = jobName
+    previewInfo['Priority'] = min( RepositoryUtils.GetMaximumPriority(), int( previewInfo['Priority'] ) + 10 )
+    previewJobId, results = SubmitJob( previewInfo, pluginInfo )
+    if not previewJobId:
+        scriptDialog.ShowMessageBox( 'The preview job could not be submitted, the fill-in job was not submitted either.\n\n%s' % results, 'Submission Results' )
+        return
 
+    fillInfo = BuildJobInfo( '%s [FILL]' % jobName, Frames.CompactFrameList( fill ), imageOutputDirectory, chunkSize )
+    fillInfo['BatchName'] = jobName
+    fillInfo['JobDependencies'] = ','.join( d for d in ( fillInfo['JobDependencies'], previewJobId ) if d )
+    fillJobId, fillResults = SubmitJob( fillInfo, pluginInfo )
+    scriptDialog.ShowMessageBox( 'Preview job (%d frames):\n%s\n\nFill-in job (%d frames):\n%s' % ( len( preview ), results, len( fill ), fillResults ), 'Submission Results' )
+
+class BatchInspection(object):
+    """Probe and pre-flight check many USD files on background threads.
+
+    Files are handled MAX_INSPECT_THREADS at a time, each one probed and then
+    checked on the same worker. results holds (info, error, warnings) per
+    file, in order, once done is set. Cancelling skips the files not started yet.
+    """
+
+    def __init__(self, files, prefixes, warnings=''):
+        # type: (List[str], Optional[List[str]], str) -> None
+        self.files = files
+        self.prefixes = prefixes
+        self.warnings = warnings
+        self.started = time.time()
+        self.cancelled = False
+        self.done = False
+        self.finished = 0
+        self.results = []  # type: List[Tuple[Optional[dict], str, str]]
+        self.cacheError = None  # type: Optional[str]
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name='HuskBatchInspection')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _inspect(self, filename):
+        # type: (str) -> Tuple[Optional[dict], str, str]
+        if self.cancelled:
+            return None, 'cancelled', ''
+        try:
+            info, error = GetProbeCache().Get( filename ), ''
+        except Exception as e:
+            info, error = None, str( e )
+        warnings = RunPreflight( filename, self.prefixes ) if info is not None else ''
+        with self._lock:
+            self.finished += 1
+        return info, error, warnings
+
+    def _run(self):
+        with ThreadPoolExecutor( max_workers=min( MAX_INSPECT_THREADS, len( self.files ) ) ) as pool:
+            self.results = list( pool.map( self._inspect, self.files ) )
+        self.cacheError = GetProbeCache().Save()
+        self.done = True
+
+def SetBatchStatus( text, busy ):
+    # type: (str, bool) -> None
+    global scriptDialog
+    scriptDialog.SetValue( 'BatchStatusLabel', text )
+    scriptDialog.SetEnabled( 'CancelBatchButton', busy )
+    scriptDialog.SetEnabled( 'SubmitButton', not busy )
+
+def CancelBatchPressed( *args ):
+    # type: (*ButtonControl) -> None
+    global batchInspection
+    if batchInspection is None:
+        return
+    batchInspection.cancelled = True
+    batchInspection = None
+    if batchTimer is not None:
+        batchTimer.stop()
+    print('Batch inspection cancelled')
+    SetBatchStatus( 'Cancelled', False )
+
+def SubmitBatch( files ):
+    # type: (List[str]) -> None
+    """Check the files, then inspect them in the background; FinishBatch submits them."""
+    global scriptDialog
+    global batchInspection
+    errors = ""
+    warnings = ""
 
-    writer.Close()
-    
-    
-    
-    # Create plugin info file.
-    pluginInfoFilename = os.path.join( ClientUtils.GetDeadlineTempPath(), 'husk_plugin_info.job')
-    writer = StreamWriter( pluginInfoFilename, False, Encoding.Unicode )
-    writer.WriteLine('SceneFile=%s' % sceneFile)
+    if batchInspection is not None:
+        return
 
+    for sceneFile in files:
+        tempErrors, tempWarnings = CheckFile(sceneFile, 'USD', False)
+        errors += tempErrors
+        warnings += tempWarnings
 
-    if len( imageOutputDirectory ) > 0:
-        writer.WriteLine( "ImageOutputDirectory=%s" % imageOutputDirectory )
-
-    writer.WriteLine('OverrideResolution=%d' % scriptDialog.GetValue('ResOverrideBox'))
-    writer.WriteLine('Width=%d' % scriptDialog.GetValue('WidthBox'))
-    writer.WriteLine('Height=%d' % scriptDialog.GetValue('HeightBox'))
-    writer.WriteLine('LogLevel=%d' % scriptDialog.GetValue('LogLevel'))
-    writer.WriteLine('OverrideRenderDelegate=%d' % scriptDialog.GetValue('OverrideRenderDelegate'))
-    writer.WriteLine('RenderDelegate=%s' % scriptDialog.GetValue('RenderDelegate'))
-    writer.WriteLine('CustomArguments=%s' % scriptDialog.GetValue('CustomArgs'))
-    #writer.WriteLine('DisableMotionBlur=%d' % scriptDialog.GetValue('DisableMoBlur'))
-    
+    if errors:
+        scriptDialog.ShowMessageBox('The following errors must be fixed before submitting the Husk jobs:\n\n%s' % errors, 'Errors')
+        return
 
-    writer.Close()
-    
-    # Setup the command line arguments.
+    print('Inspecting %d USD files...' % len(files))
+    batchInspection = BatchInspection( files, PreflightPrefixes(), warnings )
+    if batchTimer is None:
+        # No Qt timer available: wait for the inspection on the UI thread.
+        batchInspection.thread.join()
+        PollBatchInspection()
+        return
+
+    SetBatchStatus( 'Inspecting %d USD files...' % len(files), True )
+    batchTimer.start()
+
+def PollBatchInspection():
+    # type: () -> None
+    global batchInspection
+    inspection = batchInspection
+    if inspection is None:
+        if batchTimer is not None:
+            batchTimer.stop()
+        return
+
+    if not inspection.done:
+        SetBatchStatus( 'Inspecting USD files... %d of %d, %ds' % ( inspection.finished, len( inspection.files ), int( time.time() - inspection.started ) ), True )
+        return
+
+    if batchTimer is not None:
+        batchTimer.stop()
+    batchInspection = None
+    SetBatchStatus( '', False )
+    if inspection.cacheError:
+        print( inspection.cacheError )
+    FinishBatch( inspection.files, inspection.results, inspection.warnings )
+
+def FinishBatch( files, inspected, warnings ):
+    # type: (List[str], List[Tuple[Optional[dict], str, str]], str) -> None
+    """Submit the inspected files, after confirming any warnings."""
+    global scriptDialog
+    warnings += ''.join( preflightWarnings for _, _, preflightWarnings in inspected )
+    if warnings:
+        result = scriptDialog.ShowMessageBox('%sAre you sure you want to submit these jobs?' % warnings, 'Warnings', ('Yes', 'No'))
+        if result == 'No':
+            return
+
+    batchName = scriptDialog.GetValue('BatchNameBox').strip() or scriptDialog.GetValue('NameBox').strip()
+    history = LoadStatsHistory()
+    rows = []  # (file, frames, status, job id)
+    jobs = []  # (job info, plugin info)
+
+    for sceneFile, ( info, error, _ ) in zip( files, inspected ):
+        if info is None:
+            rows.append( ( sceneFile, '', 'Skipped: %s' % error, '' ) )
+            continue
+
+        frames = '%d-%d' % ( int( info['start'] ), int( info['end'] ) )
+        if scriptDialog.GetValue('FrameOrderBox') != 'Ascending':
+            # Batches of unrelated files get no preview jobs; both non-ascending
+            # orders render progressively.
+            frames = Frames.CompactFrameList( Frames.ProgressiveOrder( range( int( info['start'] ), int( info['end'] ) + 1 ) ) )
+        imageOutputDirectory = FixPath( info['product_name'], rem_spaces=0 ) if info['product_name'] else ''
+        jobName = os.path.splitext( os.path.basename( sceneFile ) )[0]
+
+        jobInfo = BuildJobInfo( jobName, frames, imageOutputDirectory, GetChunkSize( sceneFile, history ) )
+        if batchName:
+            jobInfo['BatchName'] = batchName
+        jobs.append( ( jobInfo, BuildPluginInfo( sceneFile, imageOutputDirectory ) ) )
+        rows.append( ( sceneFile, frames, None, '' ) )
+
+    if jobs:
+        results = iter( SubmitMultipleJobs( jobs ) )
+        rows = [r if r[2] is not None else ( r[0], r[1] ) + next( results ) for r in rows]
+
+    succeeded = len( [r for r in rows if r[2] == 'Success'] )
+    table = 'Submitted %d of %d USD files.\n\n' % ( succeeded, len( rows ) )
+    for sceneFile, frames, status, jobId in rows:
+        table += '%s\t%s\t%s\t%s\n' % ( os.path.basename( sceneFile ), frames or '-', status, jobId or '-' )
+    print( table )
+    scriptDialog.ShowMessageBox( table, 'Batch Submission Results' )
+
+def SubmitMultipleJobs( jobs ):
+    # type: (List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[Tuple[str, str]]
+    """Submit (job info, plugin info) pairs. Returns (result, job id) per job.
+
+    Jobs go one by one over the Web Service connection when it is configured,
+    else in one deadlinecommand call for the whole batch.
+    """
+    webSubmitter = GetSubmitter()
+    if webSubmitter is not None and webSubmitter.UsesWebService():
+        results = []
+        for jobInfo, pluginInfo in jobs:
+            jobId, output = webSubmitter.Submit( jobInfo, pluginInfo )
+            if not jobId:
+                print( output )
+            results.append( ( 'Success' if jobId else 'Failed', jobId ) )
+        return results
+
+    infoFiles = []
     arguments = StringCollection()
-    arguments.Add( jobInfoFilename )
-    arguments.Add( pluginInfoFilename )
-    
-    # Now submit the job.
-    results = ClientUtils.ExecuteCommandAndGetOutput(arguments)
-    scriptDialog.ShowMessageBox( results, 'Submission Results')
+    arguments.Add( '-SubmitMultipleJobs' )
+    for jobInfo, pluginInfo in jobs:
+        jobInfoFilename = WriteInfoFile( 'husk_job_info_', jobInfo )
+        pluginInfoFilename = WriteInfoFile( 'husk_plugin_info_', pluginInfo )
+        infoFiles += [jobInfoFilename, pluginInfoFilename]
+        arguments.Add( '-job' )
+        arguments.Add( jobInfoFilename )
+        arguments.Add( pluginInfoFilename )
+    output = ClientUtils.ExecuteCommandAndGetOutput( arguments )
+    print( output )
+    RemoveInfoFiles( infoFiles )
+    return ParseSubmissionResults( output, len( jobs ) )
 
 def CheckFile( file, name, isOptional ):
     # type: (str, str, bool) -> Tuple[str, str]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""Tests for scripts/Submission/HuskLib/ChunkPlanner.py."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Submission'))
+
+from HuskLib import ChunkPlanner  # noqa: E402
+
+
+def record(scene='/proj/sh010/sh010_v001.usd', delegate='BRAY_HdKarma', load=60.0, render=30.0):
+    return {'scene': scene, 'delegate': delegate, 'stage_load_seconds': load, 'render_seconds_per_frame': render}
+
+
+class ScenePatternTest(unittest.TestCase):
+
+    def test_digits_and_case_are_ignored(self):
+        self.assertEqual(ChunkPlanner.ScenePattern('P:\\Proj\\sh010\\sh010_v003.usd'),
+                         ChunkPlanner.ScenePattern('"p:/proj/sh020/sh020_v017.usd"'))
+
+    def test_other_names_differ(self):
+        self.assertNotEqual(ChunkPlanner.ScenePattern('/proj/sh010/fx_v001.usd'),
+                            ChunkPlanner.ScenePattern('/proj/sh010/lighting_v001.usd'))
+
+
+class PlanChunkSizeTest(unittest.TestCase):
+
+    def test_not_enough_history(self):
+        chunk, reason = ChunkPlanner.PlanChunkSize('/proj/sh010/sh010_v002.usd', 'BRAY_HdKarma', [record()] * 2)
+        self.assertIsNone(chunk)
+        self.assertIn('not enough history', reason)
+
+    def test_load_is_paid_once_per_task(self):
+        records = [record(load=60.0, render=30.0)] * 3
+        # (20 min - 1 min load) / 30 s per frame
+        chunk, _ = ChunkPlanner.PlanChunkSize('/proj/sh020/sh020_v004.usd', 'BRAY_HdKarma', records, 20)
+        self.assertEqual(chunk, 38)
+
+    def test_limits(self):
+        fast = [record(load=10.0, render=1.0)] * 3
+        self.assertEqual(ChunkPlanner.PlanChunkSize('/proj/sh010/sh010_v001.usd', '', fast, 30)[0], 50)
+        self.assertEqual(ChunkPlanner.PlanChunkSize('/proj/sh010/sh010_v001.usd', '', fast, 30, max_chunk=8)[0], 8)
+        slow = [record(load=600.0, render=3600.0)] * 3
+        self.assertEqual(ChunkPlanner.PlanChunkSize('/proj/sh010/sh010_v001.usd', '', slow, 30)[0], 1)
+
+    def test_median_ignores_outliers(self):
+        records = [record(render=60.0), record(render=60.0), record(render=6000.0)]
+        chunk, _ = ChunkPlanner.PlanChunkSize('/proj/sh010/sh010_v001.usd', '', records, 31)
+        self.assertEqual(chunk, 30)
+
+    def test_prefers_the_same_delegate(self):
+        records = [record(delegate='BRAY_HdKarmaXPU', render=5.0)] * 3 + [record(render=60.0)] * 3
+        chunk, _ = ChunkPlanner.PlanChunkSize('/proj/sh010/sh010_v001.usd', 'BRAY_HdKarmaXPU', records, 3)
+        self.assertEqual(chunk, 24)
+        # Too few tasks with the delegate: all tasks of the scene count.
+        # (20 min - 1 min load) / median 32.5 s per frame
+        chunk, _ = ChunkPlanner.PlanChunkSize('/proj/sh010/sh010_v001.usd', 'HdRedshift', records, 20)
+        self.assertEqual(chunk, 35)
+
+
+class LoadHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'history.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_missing_file(self):
+        self.assertEqual(ChunkPlanner.LoadHistory(self.path), [])
+
+    def test_skips_bad_lines(self):
+        with open(self.path, 'w') as f:
+            f.write(json.dumps(record()) + '\n{broken\n' + json.dumps(record(load=1.0)) + '\n')
+        self.assertEqual([r['stage_load_seconds'] for r in ChunkPlanner.LoadHistory(self.path)], [60.0, 1.0])
+
+    def test_reads_only_the_end_of_a_large_file(self):
+        old_limit = ChunkPlanner.MAX_HISTORY_BYTES
+        ChunkPlanner.MAX_HISTORY_BYTES = 300
+        try:
+            with open(self.path, 'w') as f:
+                for i in range(20):
+                    f.write(json.dumps(record(load=float(i))) + '\n')
+            records = ChunkPlanner.LoadHistory(self.path)
+        finally:
+            ChunkPlanner.MAX_HISTORY_BYTES = old_limit
+        self.assertTrue(0 < len(records) < 20)
+        self.assertEqual(records[-1]['stage_load_seconds'], 19.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
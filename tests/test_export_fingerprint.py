@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""Tests for scripts/Submission/HuskLib/ExportFingerprint.py (the parts that don't need pxr)."""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Submission'))
+
+from HuskLib import ExportFingerprint  # noqa: E402
+
+
+class RecordTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.usd = os.path.join(self.tmp, 'shot.usd')
+        with open(self.usd, 'w') as f:
+            f.write('#usda 1.0\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_digest_is_stable_and_ordered(self):
+        self.assertEqual(ExportFingerprint.Digest(['a', 1]), ExportFingerprint.Digest(['a', 1]))
+        self.assertNotEqual(ExportFingerprint.Digest(['a', 'b']), ExportFingerprint.Digest(['b', 'a']))
+        self.assertNotEqual(ExportFingerprint.Digest(['ab']), ExportFingerprint.Digest(['a', 'b']))
+
+    def test_no_record(self):
+        current, _ = ExportFingerprint.IsCurrent(ExportFingerprint.Load(self.usd), 'x')
+        self.assertFalse(current)
+
+    def test_round_trip(self):
+        ExportFingerprint.Save(self.usd, 'x', ExportFingerprint.Stamp([self.usd]))
+        record = ExportFingerprint.Load(self.usd)
+        self.assertTrue(ExportFingerprint.IsCurrent(record, 'x')[0])
+        self.assertFalse(ExportFingerprint.IsCurrent(record, 'y')[0])
+
+    def test_changed_file_is_not_current(self):
+        ExportFingerprint.Save(self.usd, 'x', ExportFingerprint.Stamp([self.usd]))
+        with open(self.usd, 'a') as f:
+            f.write('over "World" {}\n')
+        self.assertFalse(ExportFingerprint.IsCurrent(ExportFingerprint.Load(self.usd), 'x')[0])
+
+    def test_other_version_is_ignored(self):
+        with open(ExportFingerprint.FingerprintFile(self.usd), 'w') as f:
+            f.write('{"version": 0, "digest": "x", "files": {}}')
+        self.assertIsNone(ExportFingerprint.Load(self.usd))
+
+
+class CollectOutputsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.graph = {}
+        for name in ('shot.usd', 'geo.usd', 'lights.usd', 'asset.usd', 'unrelated.usd'):
+            open(os.path.join(self.tmp, name), 'w').close()
+        old = time.time() - 3600
+        os.utime(os.path.join(self.tmp, 'asset.usd'), (old, old))
+        self.link('shot.usd', 'geo.usd', 'lights.usd')
+        self.link('geo.usd', 'asset.usd', 'shot.usd')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def link(self, name, *dependencies):
+        self.graph[os.path.join(self.tmp, name)] = [os.path.join(self.tmp, d) for d in dependencies]
+
+    def test_follows_written_layers_only(self):
+        outputs = ExportFingerprint.CollectOutputs(
+            os.path.join(self.tmp, 'shot.usd'), time.time() - 60, lambda path: self.graph.get(path, []))
+        self.assertEqual([os.path.basename(p) for p in outputs], ['geo.usd', 'lights.usd', 'shot.usd'])
+
+    def test_export_target_is_always_included(self):
+        outputs = ExportFingerprint.CollectOutputs(
+            os.path.join(self.tmp, 'shot.usd'), time.time() + 60, lambda path: self.graph.get(path, []))
+        self.assertEqual([os.path.basename(p) for p in outputs], ['shot.usd'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""Tests for scripts/Submission/HuskLib/Frames.py: frame list parsing and ordering."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Submission'))
+
+from HuskLib import Frames  # noqa: E402
+
+
+class ParseFrameListTest(unittest.TestCase):
+
+    def test_ranges_and_steps(self):
+        self.assertEqual(Frames.ParseFrameList('1-10x3, 15 20-18'), [1, 4, 7, 10, 15, 20, 19, 18])
+        self.assertEqual(Frames.ParseFrameList('-2--1,1-5:2'), [-2, -1, 1, 3, 5])
+        self.assertEqual(Frames.ParseFrameList(''), [])
+
+    def test_invalid(self):
+        for text in ('1-', 'a', '1-10x0'):
+            self.assertRaises(ValueError, Frames.ParseFrameList, text)
+
+
+class CompactFrameListTest(unittest.TestCase):
+
+    def test_runs(self):
+        self.assertEqual(Frames.CompactFrameList([1, 6, 11, 16, 20]), '1-16x5,20')
+        self.assertEqual(Frames.CompactFrameList([1, 2, 3, 4]), '1-4')
+        self.assertEqual(Frames.CompactFrameList([20, 19, 18, 5]), '20-18,5')
+        self.assertEqual(Frames.CompactFrameList([1, 3]), '1,3')
+
+    def test_round_trip_keeps_order(self):
+        frames = Frames.ProgressiveOrder(range(1, 101))
+        self.assertEqual(Frames.ParseFrameList(Frames.CompactFrameList(frames)), frames)
+
+
+class ProgressiveOrderTest(unittest.TestCase):
+
+    def test_subdivision(self):
+        self.assertEqual(Frames.ProgressiveOrder(range(1, 10)), [1, 9, 5, 3, 7, 2, 4, 6, 8])
+        self.assertEqual(Frames.ProgressiveOrder([4, 8]), [4, 8])
+
+    def test_every_frame_once(self):
+        for count in range(0, 40):
+            frames = list(range(100, 100 + count))
+            self.assertEqual(sorted(Frames.ProgressiveOrder(frames)), frames)
+
+
+class SplitPreviewTest(unittest.TestCase):
+
+    def test_every_nth_and_the_last_frame(self):
+        preview, fill = Frames.SplitPreview(range(1, 13), 5)
+        self.assertEqual(preview, [1, 6, 11, 12])
+        self.assertEqual(fill, [2, 3, 4, 5, 7, 8, 9, 10])
+
+    def test_step_of_one_or_less_is_everything(self):
+        self.assertEqual(Frames.SplitPreview([1, 2, 3], 0), ([1, 2, 3], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""Tests for plugins/Husk/HuskCache.py: the Worker-local scene cache."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+import HuskCache  # noqa: E402
+
+# No process has this pid (Linux caps pids well below it).
+DEAD_PID = 2 ** 30
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.network = os.path.join(self.tmp, 'network')
+        self.root = os.path.join(self.tmp, 'cache')
+        os.makedirs(os.path.join(self.network, 'tex'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def source(self, name, size=100):
+        path = os.path.join(self.network, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        return path
+
+    def cache(self, quota=10 ** 9, owner='%d_0' % os.getpid()):
+        return HuskCache.LayerCache(self.root, quota, lock_timeout=5.0, owner=owner)
+
+
+class FetchTest(CacheTestCase):
+
+    def test_copies_once(self):
+        source = self.source('a.usd')
+        cache = self.cache()
+        local = cache.fetch(source)
+        self.assertEqual(local, HuskCache.mirror_path(self.root, source))
+        self.assertEqual(cache.fetch(source), local)
+        self.assertEqual((cache.misses, cache.hits, cache.copied_bytes), (1, 1, 100))
+
+    def test_changed_source_is_copied_again(self):
+        source = self.source('a.usd')
+        cache = self.cache()
+        cache.fetch(source)
+        self.source('a.usd', size=50)
+        with open(cache.fetch(source), 'rb') as f:
+            self.assertEqual(len(f.read()), 50)
+
+    def test_mirror_path(self):
+        self.assertEqual(HuskCache.mirror_path('/c', 'P:\\proj\\a.usd'), os.path.join('/c', 'files', 'P', 'proj', 'a.usd'))
+        self.assertEqual(HuskCache.mirror_path('/c', '//server/share/a.usd'),
+                         os.path.join('/c', 'files', 'UNC', 'server', 'share', 'a.usd'))
+
+
+class DependenciesTest(CacheTestCase):
+
+    def test_computed_once(self):
+        scene = self.source('shot.usd')
+        calls = []
+
+        def compute(path):
+            calls.append(path)
+            return {'layers': [scene], 'assets': [], 'unresolved': []}
+
+        cache = self.cache()
+        cache.dependencies(scene, compute)
+        cache.dependencies(scene, compute)
+        self.assertEqual(calls, [scene])
+        time.sleep(1.1)
+        self.source('shot.usd', size=10)
+        cache.dependencies(scene, compute)
+        self.assertEqual(len(calls), 2)
+
+    def test_rechecked_after_waiting_for_the_lock(self):
+        scene = self.source('shot.usd')
+        calls = []
+
+        def compute(path):
+            calls.append(path)
+            return {'layers': [], 'assets': [], 'unresolved': []}
+
+        # Another task computes the list while this one waits for the lock.
+        cache = self.cache()
+        cache.dependencies(scene, compute)
+        self.assertEqual(len(calls), 1)
+        depsDir = os.path.join(self.root, 'deps')
+        depsFile = os.path.join(depsDir, os.listdir(depsDir)[0])
+        with open(depsFile) as f:
+            stored = f.read()
+        os.remove(depsFile)
+        lock = HuskCache.FileLock(depsFile + '.husklock')
+        lock.acquire()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(cache.dependencies(scene, compute)))
+        waiter.start()
+        time.sleep(0.5)
+        with open(depsFile, 'w') as f:
+            f.write(stored)
+        lock.release()
+        waiter.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(result[0]['layer_stats'][0][0], scene)
+
+
+class EvictTest(CacheTestCase):
+
+    def test_pinned_files_are_kept(self):
+        a, b = self.source('a.usd', 600), self.source('b.usd', 600)
+        user = self.cache(quota=1000, owner='%d_1' % os.getpid())
+        local_a = user.fetch(a)
+        user.pin([local_a])
+        other = self.cache(quota=1000, owner='%d_2' % os.getpid())
+        os.utime(local_a + '.huskmeta', (1, 1))  # least recently used
+        local_b = other.fetch(b)
+        other.evict()
+        self.assertTrue(os.path.isfile(local_a))
+        self.assertFalse(os.path.isfile(local_b))
+
+        user.release()
+        other.fetch(b)
+        other.evict()
+        self.assertFalse(os.path.isfile(local_a))
+        self.assertTrue(os.path.isfile(local_b))
+
+    def test_pins_of_ended_processes_are_dropped(self):
+        a = self.source('a.usd', 600)
+        gone = self.cache(quota=100, owner='%d_0' % DEAD_PID)
+        gone.pin([gone.fetch(a)])
+        self.assertEqual(self.cache(quota=100).evict(), 600)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'pins', '%d_0.json' % DEAD_PID)))
+
+    def test_old_rewritten_layers_are_evicted(self):
+        remapDir = os.path.join(self.root, 'remap', 'old')
+        os.makedirs(remapDir)
+        with open(os.path.join(remapDir, 'shot.usd'), 'wb') as f:
+            f.write(b'x' * 600)
+        self.assertEqual(self.cache(quota=100).evict(), 600)
+        self.assertFalse(os.path.isdir(remapDir))
+
+
+class LocalizeTest(CacheTestCase):
+
+    def test_rewrites_paths_to_the_cache_and_pins(self):
+        scene = self.source('shot.usd')
+        layer = self.source('layer.usd')
+        tile = self.source(os.path.join('tex', 'wood.1001.exr'))
+        deps = {'layers': [scene, layer], 'assets': [tile], 'unresolved': []}
+        seen = {}
+
+        def rewrite(localScene, mapPath, remapDir):
+            seen['scene'] = localScene
+            seen['layer'] = mapPath(layer)
+            seen['udim'] = mapPath(os.path.join(self.network, 'tex', 'wood.<UDIM>.exr'))
+            seen['other'] = mapPath('/elsewhere/x.exr')
+            os.makedirs(remapDir)
+            return os.path.join(remapDir, 'shot.usd')
+
+        cache = self.cache()
+        result = cache.localize(scene, lambda path: deps, rewrite)
+        mirror = lambda path: HuskCache.mirror_path(self.root, path)  # noqa: E731
+        self.assertEqual(seen['scene'], mirror(scene))
+        self.assertEqual(seen['layer'], mirror(layer))
+        self.assertEqual(seen['udim'], mirror(os.path.join(self.network, 'tex', 'wood.<UDIM>.exr')))
+        self.assertEqual(seen['other'], '/elsewhere/x.exr')
+        self.assertTrue(result.startswith(os.path.join(self.root, 'remap')))
+        self.assertTrue(os.path.isfile(mirror(tile)))
+
+        with open(os.path.join(self.root, 'pins', cache.owner + '.json')) as f:
+            pinned = json.load(f)
+        self.assertIn(os.path.normcase(mirror(tile)), pinned)
+        self.assertIn(os.path.normcase(os.path.dirname(result)), pinned)
+        cache.release()
+        self.assertEqual(os.listdir(os.path.join(self.root, 'pins')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
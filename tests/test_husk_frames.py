@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+"""Tests for plugins/Husk/HuskFrames.py: husk frame arguments."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+from HuskFrames import frame_arguments  # noqa: E402
+
+
+class FrameArgumentsTest(unittest.TestCase):
+
+    def test_single_frame(self):
+        self.assertEqual(frame_arguments([12]), '--frame 12 --frame-count 1 ')
+
+    def test_consecutive_frames(self):
+        self.assertEqual(frame_arguments([1, 2, 3, 4, 5]), '--frame 1 --frame-count 5 ')
+
+    def test_stepped_frames(self):
+        self.assertEqual(frame_arguments([1, 11, 21]), '--frame 1 --frame-count 3 --frame-inc 10 ')
+
+    def test_negative_frames(self):
+        self.assertEqual(frame_arguments([-2, -1, 0]), '--frame -2 --frame-count 3 ')
+
+    def test_uneven_frames_use_a_frame_list(self):
+        self.assertEqual(frame_arguments([1, 2, 5]), '--frame-list "1 2 5" ')
+
+    def test_unsorted_frames_use_a_frame_list(self):
+        # Progressive order hands a task its frames out of order.
+        self.assertEqual(frame_arguments([10, 1, 5]), '--frame-list "10 1 5" ')
+        self.assertEqual(frame_arguments([3, 2, 1]), '--frame-list "3 2 1" ')
+
+    def test_repeated_frame_uses_a_frame_list(self):
+        self.assertEqual(frame_arguments([4, 4]), '--frame-list "4 4" ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""Tests for plugins/Husk/HuskImageCheck.py: completeness of rendered images."""
+
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+from HuskImageCheck import check_image  # noqa: E402
+
+
+def attribute(name, kind, value):
+    return name.encode() + b'\0' + kind.encode() + b'\0' + struct.pack('<i', len(value)) + value
+
+
+def scanline_exr(lines=2, line_bytes=8):
+    """An uncompressed single-part scan line EXR: one chunk per line."""
+    header = struct.pack('<ii', 20000630, 2)
+    header += attribute('channels', 'chlist', b'R\0' + struct.pack('<iBBBBii', 2, 0, 0, 0, 0, 1, 1) + b'\0')
+    header += attribute('compression', 'compression', b'\0')
+    header += attribute('dataWindow', 'box2i', struct.pack('<iiii', 0, 0, 0, lines - 1))
+    header += b'\0'
+    chunks = [struct.pack('<ii', y, line_bytes) + b'\x01' * line_bytes for y in range(lines)]
+    offset = len(header) + 8 * lines
+    offsets = []
+    for chunk in chunks:
+        offsets.append(offset)
+        offset += len(chunk)
+    return header + struct.pack('<%dQ' % lines, *offsets) + b''.join(chunks)
+
+
+def png():
+    chunk = lambda kind, data: struct.pack('>I', len(data)) + kind + data + b'\0\0\0\0'  # noqa: E731
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', b'\0' * 13) + chunk(b'IDAT', b'\0' * 20) + chunk(b'IEND', b'')
+
+
+class CheckImageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_missing_empty_and_old(self):
+        self.assertEqual(check_image(os.path.join(self.tmp, 'nope.exr')), (False, 'missing'))
+        self.assertEqual(check_image(self.write('empty.exr', b'')), (False, 'empty'))
+        path = self.write('old.tif', b'data')
+        self.assertEqual(check_image(path, min_mtime=time.time() + 60), (False, 'older than the job'))
+        self.assertEqual(check_image(path), (True, ''))
+
+    def test_exr(self):
+        data = scanline_exr()
+        self.assertEqual(check_image(self.write('ok.exr', data)), (True, ''))
+        self.assertFalse(check_image(self.write('cut.exr', data[:-3]))[0])
+        self.assertFalse(check_image(self.write('header.exr', data[:40]))[0])
+        self.assertEqual(check_image(self.write('bad.exr', b'not an exr at all')), (False, 'not an OpenEXR file'))
+
+    def test_exr_offset_table_written_last(self):
+        data = bytearray(scanline_exr())
+        table = data.index(struct.pack('<Q', len(data) - 16)) - 8
+        data[table:table + 16] = b'\0' * 16
+        self.assertEqual(check_image(self.write('open.exr', bytes(data))), (False, 'incomplete offset table'))
+
+    def test_png(self):
+        data = png()
+        self.assertEqual(check_image(self.write('ok.png', data)), (True, ''))
+        self.assertFalse(check_image(self.write('cut.png', data[:-12]))[0])
+        self.assertEqual(check_image(self.write('bad.png', b'GIF89a')), (False, 'not a PNG file'))
+
+    def test_jpeg(self):
+        self.assertEqual(check_image(self.write('ok.jpg', b'\xff\xd8' + b'\0' * 100 + b'\xff\xd9')), (True, ''))
+        self.assertFalse(check_image(self.write('cut.jpeg', b'\xff\xd8' + b'\0' * 100))[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+"""Tests for plugins/Husk/HuskOutput.py: stdout classification and throttling."""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+import HuskOutput  # noqa: E402
+from HuskOutput import (LINE_ALF, LINE_ERROR, LINE_FRAME, LINE_OTHER, LINE_PERCENT, LINE_STAT,  # noqa: E402
+                        HuskOutputParser, ProgressThrottle, classify)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def test_plain_lines(self):
+        self.assertEqual(classify('[18:25:20] Loading texture /mnt/proj/tex/wood.rat'), (LINE_OTHER, None, None))
+        self.assertEqual(classify(''), (LINE_OTHER, None, None))
+
+    def test_percent(self):
+        self.assertEqual(classify('[18:25:20]  39.9% (9/21, 40.0%)'), (LINE_PERCENT, '39.9', ']  39.9%'))
+
+    def test_alf_progress(self):
+        kind, value, _ = classify('ALF_PROGRESS 42%')
+        self.assertEqual((kind, value), (LINE_ALF, '42'))
+
+    def test_frame(self):
+        self.assertEqual(classify('[18:25:19] Rendering frame 12')[:2], (LINE_FRAME, '12'))
+        self.assertEqual(classify('Rendering Frame -3.5')[:2], (LINE_FRAME, '-3.5'))
+
+    def test_stats(self):
+        self.assertEqual(classify('Peak Memory: 3.2 GB'), (LINE_STAT, 'Peak Memory', '3.2 GB'))
+        self.assertEqual(classify('Render Time: 0:01:23.4'), (LINE_STAT, 'Render Time', '0:01:23.4'))
+
+    def test_errors(self):
+        self.assertEqual(classify('Error: out of memory'), (LINE_ERROR, None, 'Error: out of memory'))
+        self.assertEqual(classify('[12:00] USD ERROR could not open layer'),
+                         (LINE_ERROR, None, 'USD ERROR could not open layer'))
+
+    def test_error_after_progress_wins(self):
+        # An alternation would return the leftmost match and miss the failure.
+        self.assertEqual(classify('[12:00:01] 50.0% done Error: texture missing'),
+                         (LINE_ERROR, None, 'Error: texture missing'))
+        self.assertEqual(classify('Peak Memory: 3 GB Error: out of memory'),
+                         (LINE_ERROR, None, 'Error: out of memory'))
+        self.assertEqual(classify('ALF_PROGRESS 10% USD ERROR bad prim')[:1], (LINE_ERROR,))
+
+    def test_every_pattern_has_a_hint(self):
+        for line in ('] 1%', 'ALF_PROGRESS 1', 'Rendering frame 1', 'Rendering Frame 1', 'Memory: 1',
+                     'Render Time: 1', 'Load Time: 1', 'Samples: 1', 'Error: x', 'USD ERROR x'):
+            self.assertTrue(any(hint in line for hint in HuskOutput._HINTS), line)
+            self.assertNotEqual(classify(line)[0], LINE_OTHER, line)
+
+    def test_prefilter_passes_whole_lines_classify_needs(self):
+        prefilter = re.compile(HuskOutput.PREFILTER_PATTERN)
+        for line in ('[18:25:20]  39.9% (9/21, 40.0%)', 'ALF_PROGRESS 42%', '[18:25:19] Rendering frame 12',
+                     'Peak Memory: 3.2 GB', '[12:00] USD ERROR could not open layer', 'x Error: y'):
+            match = prefilter.search(line)
+            self.assertIsNotNone(match, line)
+            self.assertEqual(match.group(0), line)
+
+    def test_prefilter_drops_chatter(self):
+        prefilter = re.compile(HuskOutput.PREFILTER_PATTERN)
+        for line in ('[18:25:20] Loading texture /mnt/proj/tex/wood.rat', 'BVH build for /World/geo', ''):
+            self.assertIsNone(prefilter.search(line), line)
+            self.assertEqual(classify(line)[0], LINE_OTHER, line)
+
+
+class ProgressThrottleTest(unittest.TestCase):
+
+    def test_rate_and_delta(self):
+        clock = FakeClock()
+        throttle = ProgressThrottle(max_rate=2.0, min_delta=5.0, clock=clock)
+        self.assertEqual(throttle.offer(progress=1.0), (1.0, None))
+        clock.now = 0.1
+        self.assertIsNone(throttle.offer(progress=2.0))
+        # A big enough step goes out right away.
+        self.assertEqual(throttle.offer(progress=7.0), (7.0, None))
+        clock.now = 0.2
+        self.assertIsNone(throttle.offer(status='tile 3'))
+        clock.now = 0.8
+        self.assertEqual(throttle.offer(progress=8.0), (8.0, 'tile 3'))
+        clock.now = 0.9
+        self.assertIsNone(throttle.offer(progress=9.0))
+        self.assertEqual(throttle.flush(), (9.0, None))
+        self.assertIsNone(throttle.flush())
+
+    def test_hundred_percent_is_never_held_back(self):
+        clock = FakeClock()
+        throttle = ProgressThrottle(max_rate=1.0, min_delta=50.0, clock=clock)
+        throttle.offer(progress=99.0)
+        clock.now = 0.01
+        self.assertEqual(throttle.offer(progress=100.0), (100.0, None))
+
+
+class ParserTest(unittest.TestCase):
+
+    class Listener(object):
+        def __init__(self):
+            self.events = []
+
+        def on_progress(self, percent):
+            self.events.append(('progress', percent))
+
+        def on_frame(self, frame):
+            self.events.append(('frame', frame))
+
+        def on_stat(self, name, value):
+            self.events.append(('stat', name, value))
+
+    def test_alf_progress_becomes_status_after_real_progress(self):
+        clock = FakeClock()
+        listener = self.Listener()
+        parser = HuskOutputParser(max_rate=1000.0, clock=clock, listener=listener)
+        self.assertEqual(parser.feed('ALF_PROGRESS 10%'), ('progress', 10.0, 'ALF_PROGRESS 10'))
+        clock.now = 1.0
+        self.assertEqual(parser.feed('[0:00] 20.0% (1/5)'), ('progress', 20.0, None))
+        clock.now = 2.0
+        self.assertEqual(parser.feed('ALF_PROGRESS 250%'), ('progress', None, 'ALF_PROGRESS 250'))
+        self.assertEqual(listener.events, [('progress', 10.0), ('progress', 20.0)])
+
+    def test_errors_frames_and_stats(self):
+        listener = self.Listener()
+        parser = HuskOutputParser(listener=listener)
+        self.assertEqual(parser.feed('50.0% Error: boom'), ('error', 'Error: boom'))
+        self.assertIsNone(parser.feed('Rendering frame 3'))
+        self.assertIsNone(parser.feed('Peak Memory: 2 GB'))
+        self.assertIsNone(parser.feed('nothing to see'))
+        self.assertEqual(listener.events, [('frame', '3'), ('stat', 'Peak Memory', '2 GB')])
+
+
+if __name__ == '__main__':
+    unittest.main()
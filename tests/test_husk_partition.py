@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""Tests for plugins/Husk/HuskPartition.py: devices and CPUs of concurrent tasks."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+import HuskPartition  # noqa: E402
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_list(self):
+        self.assertEqual(HuskPartition.parse_list('0,1, 3'), ['0', '1', '3'])
+        self.assertEqual(HuskPartition.parse_list(None), [])
+
+    def test_mapping(self):
+        self.assertEqual(HuskPartition.parse_mapping('0:0,1;1:2,3\nx:1;bad'), {0: ['0', '1'], 1: ['2', '3']})
+
+    def test_cpulist(self):
+        self.assertEqual(HuskPartition.parse_cpulist('0-3,8,10-11\n'), [0, 1, 2, 3, 8, 10, 11])
+        self.assertEqual(HuskPartition.format_cpulist([3, 0, 1, 2, 8, 11, 10]), '0-3,8,10-11')
+
+
+class SplitDevicesTest(unittest.TestCase):
+
+    def test_uneven_split(self):
+        devices = ['0', '1', '2', '3', '4']
+        self.assertEqual(HuskPartition.split_devices(devices, 2, 0), ['0', '1', '2'])
+        self.assertEqual(HuskPartition.split_devices(devices, 2, 1), ['3', '4'])
+
+    def test_more_tasks_than_devices(self):
+        self.assertEqual(HuskPartition.split_devices(['0', '1'], 3, 2), ['0'])
+
+    def test_per_slot(self):
+        devices = ['0', '1', '2', '3']
+        self.assertEqual(HuskPartition.split_devices(devices, 3, 1, per_slot=2), ['2', '3'])
+        self.assertEqual(HuskPartition.split_devices(devices, 3, 2, per_slot=2), ['0', '1'])
+
+    def test_no_devices(self):
+        self.assertEqual(HuskPartition.split_devices([], 2, 0), [])
+
+    def test_environment(self):
+        env = HuskPartition.device_environment('CUDA_VISIBLE_DEVICES={devices}\n# comment\nX={devices_space}\nbad', ['0', '1'])
+        self.assertEqual(env, {'CUDA_VISIBLE_DEVICES': '0,1', 'X': '0 1'})
+
+
+class CpuTest(unittest.TestCase):
+
+    NODES = [(0, [0, 1, 2, 3]), (1, [4, 5, 6, 7])]
+
+    def test_thread_budget(self):
+        self.assertEqual(HuskPartition.thread_budget(16, 3), 5)
+        self.assertEqual(HuskPartition.thread_budget(2, 4), 1)
+        self.assertEqual(HuskPartition.thread_budget(16, 3, per_task=4), 4)
+
+    def test_whole_nodes(self):
+        self.assertEqual(HuskPartition.cpu_partition(self.NODES, 2, 1), ([1], [4, 5, 6, 7]))
+        self.assertEqual(HuskPartition.cpu_partition(self.NODES, 1, 0), ([0, 1], list(range(8))))
+
+    def test_shared_nodes(self):
+        self.assertEqual(HuskPartition.cpu_partition(self.NODES, 4, 1), ([0], [2, 3]))
+        self.assertEqual(HuskPartition.cpu_partition(self.NODES, 4, 3), ([1], [6, 7]))
+
+    def test_no_nodes(self):
+        self.assertEqual(HuskPartition.cpu_partition([], 2, 0), ([], []))
+
+    def test_numa_nodes(self):
+        try:
+            allowed = sorted(os.sched_getaffinity(0))
+        except AttributeError:
+            self.skipTest('no CPU affinity on this platform')
+        root = tempfile.mkdtemp()
+        try:
+            for name, cpulist in (('node0', str(allowed[0])), ('node1', '100000'), ('possible', '0')):
+                os.makedirs(os.path.join(root, name))
+                with open(os.path.join(root, name, 'cpulist'), 'w') as f:
+                    f.write(cpulist + '\n')
+            self.assertEqual(HuskPartition.numa_nodes(root), [(0, [allowed[0]])])
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    unittest.main()
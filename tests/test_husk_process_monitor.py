@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""Tests for plugins/Husk/HuskProcessMonitor.py: stall and memory watching."""
+
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+import HuskProcessMonitor  # noqa: E402
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StallWatchdogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.watchdog = HuskProcessMonitor.StallWatchdog(
+            output_timeout=600, load_timeout=300, progress_timeout=120, clock=self.clock)
+
+    def test_stage_load_timeout(self):
+        self.clock.now = 299
+        self.watchdog.output('Loading stage')
+        self.assertIsNone(self.watchdog.check())
+        self.clock.now = 300
+        self.assertIn('no render progress', self.watchdog.check())
+
+    def test_progress_resets_the_limit(self):
+        self.clock.now = 100
+        self.watchdog.on_progress(10.0)
+        self.clock.now = 200
+        self.watchdog.on_progress(20.0)
+        self.watchdog.output()
+        self.clock.now = 319
+        self.assertIsNone(self.watchdog.check())
+        self.watchdog.on_progress(20.0)
+        self.clock.now = 320
+        self.assertEqual(self.watchdog.check(), 'progress stuck at 20.0% for 2.0 min')
+
+    def test_next_frame_loads_again(self):
+        self.watchdog.on_progress(100.0)
+        self.clock.now = 200
+        self.watchdog.on_frame(2)
+        self.watchdog.output()
+        self.assertEqual(self.watchdog.phase, HuskProcessMonitor.PHASE_LOAD)
+        self.clock.now = 499
+        self.assertIsNone(self.watchdog.check())
+
+    def test_no_output(self):
+        self.watchdog.load_timeout = 0
+        self.clock.now = 600
+        self.assertEqual(self.watchdog.check(), 'no output from husk for 10.0 min (stage load)')
+
+    def test_written_bytes_count_as_output(self):
+        self.watchdog.load_timeout = 0
+        self.clock.now = 500
+        self.watchdog.activity(1000)
+        self.watchdog.activity(None)
+        self.clock.now = 1099
+        self.watchdog.activity(1000)
+        self.assertIsNone(self.watchdog.check())
+        self.clock.now = 1100
+        self.assertIn('no output from husk', self.watchdog.check())
+
+    def test_describe(self):
+        self.watchdog.output('  last line \n')
+        self.assertEqual(self.watchdog.describe('x'), 'Render stalled: x. Last output: last line')
+
+
+class MemoryWatchTest(unittest.TestCase):
+
+    def test_near_once_then_stop(self):
+        watch = HuskProcessMonitor.MemoryWatch(1000, near_fraction=0.8, stop_fraction=0.95)
+        self.assertIsNone(watch.sample(700))
+        self.assertEqual(watch.sample(850), 'near')
+        self.assertIsNone(watch.sample(900))
+        self.assertEqual(watch.sample(960), 'stop')
+        self.assertEqual(watch.peak, 960)
+
+    def test_no_limit(self):
+        watch = HuskProcessMonitor.MemoryWatch(0)
+        self.assertIsNone(watch.sample(10 ** 12))
+        self.assertEqual(watch.peak, 10 ** 12)
+
+    def test_memory_limit(self):
+        self.assertGreaterEqual(HuskProcessMonitor.memory_limit(), 0)
+
+
+class AutotileTest(unittest.TestCase):
+
+    def test_grid(self):
+        self.assertEqual(HuskProcessMonitor.autotile_grid('--autotile --tile-count 2 3 -V 4'), (2, 3))
+        self.assertIsNone(HuskProcessMonitor.autotile_grid('--tile-count 2 3'))
+        self.assertIsNone(HuskProcessMonitor.autotile_grid(''))
+
+    def test_finer_grid(self):
+        self.assertEqual(HuskProcessMonitor.finer_grid(None), (2, 2))
+        self.assertEqual(HuskProcessMonitor.finer_grid((2, 4)), (4, 8))
+        self.assertEqual(HuskProcessMonitor.finer_grid((8, 8)), (8, 8))
+
+    def test_set_autotile(self):
+        self.assertEqual(HuskProcessMonitor.set_autotile('-V 4 --autotile --tile-count 2 2', (4, 4)),
+                         '-V 4 --autotile --tile-count 4 4')
+        self.assertEqual(HuskProcessMonitor.set_autotile('', (2, 2)), '--autotile --tile-count 2 2')
+
+
+@unittest.skipUnless(os.name == 'posix', 'uses a POSIX shell')
+class ProcessTest(unittest.TestCase):
+
+    def test_find_and_kill_marked_tree(self):
+        env = dict(os.environ)
+        env[HuskProcessMonitor.MARKER_VARIABLE] = 'test-%d' % os.getpid()
+        process = subprocess.Popen(['sleep 60 & wait'], shell=True, env=env)
+        try:
+            pids = HuskProcessMonitor.find_marked(env[HuskProcessMonitor.MARKER_VARIABLE])
+            self.assertIn(process.pid, pids)
+            tree = HuskProcessMonitor.process_tree([process.pid])
+            self.assertIn(process.pid, tree)
+            self.assertGreater(HuskProcessMonitor.tree_rss(tree), 0)
+            self.assertIsNotNone(HuskProcessMonitor.tree_output_bytes(tree))
+            HuskProcessMonitor.kill_tree([process.pid], grace=5.0)
+            self.assertIsNotNone(process.wait(timeout=10))
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""Tests for plugins/Husk/HuskTelemetry.py: per-frame render statistics."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'Husk'))
+
+import HuskTelemetry  # noqa: E402
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_bytes(self):
+        self.assertEqual(HuskTelemetry.parse_bytes('1024'), 1024)
+        self.assertEqual(HuskTelemetry.parse_bytes('2.5 GB'), int(2.5 * 1024 ** 3))
+        self.assertEqual(HuskTelemetry.parse_bytes('512MiB'), 512 * 1024 ** 2)
+        self.assertIsNone(HuskTelemetry.parse_bytes('lots'))
+
+    def test_seconds(self):
+        self.assertEqual(HuskTelemetry.parse_seconds('0:01:02.5'), 62.5)
+        self.assertEqual(HuskTelemetry.parse_seconds('62.5s'), 62.5)
+        self.assertIsNone(HuskTelemetry.parse_seconds('soon'))
+
+
+class FrameStatsCollectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.stats = HuskTelemetry.FrameStatsCollector([1, 2], clock=self.clock)
+        self.stats.start()
+
+    def test_frame_lines(self):
+        self.clock.now = 110.0
+        self.stats.on_frame('1')
+        self.clock.now = 112.0
+        self.stats.on_progress(0.0)
+        self.stats.on_stat('Peak Memory', '2 GB')
+        self.stats.on_stat('Memory', '1 GB')
+        self.clock.now = 120.0
+        self.stats.on_frame('2.0')
+        self.stats.on_progress(10.0)
+        self.stats.on_stat('Render Time', '0:00:05')
+        self.clock.now = 125.0
+        first, second = self.stats.finish()
+
+        self.assertEqual(first['frame'], '1')
+        self.assertEqual(first['stage_load_seconds'], 10.0)
+        self.assertEqual(first['time_to_first_pixel_seconds'], 2.0)
+        self.assertEqual(first['render_seconds'], 8.0)
+        self.assertEqual(first['frame_seconds'], 10.0)
+        self.assertEqual(first['peak_memory_bytes'], 2 * 1024 ** 3)
+        self.assertEqual(second['frame'], '2')
+        self.assertIsNone(second['stage_load_seconds'])
+        self.assertEqual(second['husk_render_seconds'], 5.0)
+        self.assertEqual(second['frame_seconds'], 5.0)
+
+    def test_progress_reset_starts_the_next_frame(self):
+        self.clock.now = 105.0
+        self.stats.on_progress(5.0)
+        self.stats.on_progress(100.0)
+        self.clock.now = 115.0
+        self.stats.on_progress(1.0)
+        self.clock.now = 120.0
+        records = self.stats.finish()
+        self.assertEqual([r['frame'] for r in records], ['1', '2'])
+        self.assertEqual(records[0]['render_seconds'], 10.0)
+        self.assertEqual(records[1]['render_seconds'], 5.0)
+
+
+class PhaseTimerTest(unittest.TestCase):
+
+    def test_phases_and_marks(self):
+        clock = Clock()
+        timer = HuskTelemetry.PhaseTimer(clock=clock)
+        with timer.phase('setup'):
+            clock.now += 1.5
+        clock.now += 0.5
+        timer.mark('first line')
+        clock.now += 1.0
+        timer.mark('first line')
+        self.assertEqual(timer.phases, [('setup', 0.0, 1.5)])
+        self.assertEqual(timer.marks, {'first line': 2.0})
+        self.assertEqual(timer.summary(), 'Phase timing: setup 1.500s | first line +2.000s')
+        self.assertEqual(timer.as_dict({'job_id': 'j'})['phases'][0]['seconds'], 1.5)
+
+
+class WriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.records = [
+            {'frame': '1', 'stage_load_seconds': 4.0, 'time_to_first_pixel_seconds': 1.0, 'render_seconds': 10.0,
+             'peak_memory_bytes': 100},
+            {'frame': '2', 'stage_load_seconds': None, 'time_to_first_pixel_seconds': None, 'render_seconds': 20.0,
+             'peak_memory_bytes': None},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_jsonl(self):
+        path = os.path.join(self.tmp, 'stats', 'task.jsonl')
+        HuskTelemetry.write_jsonl(path, self.records, {'job_id': 'j'})
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([(r['job_id'], r['frame']) for r in rows], [('j', '1'), ('j', '2')])
+
+    def test_history(self):
+        path = os.path.join(self.tmp, 'history.jsonl')
+        HuskTelemetry.append_history(path, self.records, {'job_id': 'j', 'scene': 's.usd', 'delegate': 'karma'})
+        HuskTelemetry.append_history(path, [], {})
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['frames'], 2)
+        self.assertEqual(rows[0]['stage_load_seconds'], 4.0)
+        self.assertEqual(rows[0]['render_seconds_per_frame'], 15.0)
+
+    def test_openmetrics(self):
+        path = os.path.join(self.tmp, 'husk.prom')
+        HuskTelemetry.write_openmetrics(path, self.records, {'job_id': 'j"1', 'worker': 'w', 'thread': 0})
+        with open(path) as f:
+            text = f.read()
+        self.assertIn('husk_task_frames{job_id="j\\"1",worker="w",thread="0"} 2.0', text)
+        self.assertIn('husk_task_render_seconds{job_id="j\\"1",worker="w",thread="0"} 30.0', text)
+        self.assertIn('husk_task_time_to_first_pixel_seconds{job_id="j\\"1",worker="w",thread="0"} 1.0', text)
+        self.assertTrue(text.endswith('# EOF\n'))
+        self.assertFalse(os.path.exists(path + '.tmp'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""Tests for scripts/Submission/HuskLib/Preflight.py (the checks that don't need pxr)."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Submission'))
+
+from HuskLib import Preflight  # noqa: E402
+
+
+class LocalPathTest(unittest.TestCase):
+
+    def test_default_prefixes(self):
+        self.assertTrue(Preflight.IsLocalPath('C:\\Users\\me\\tex.exr'))
+        self.assertTrue(Preflight.IsLocalPath('/home/me/tex.exr'))
+        self.assertTrue(Preflight.IsLocalPath('/Users/me/tex.exr'))
+        self.assertFalse(Preflight.IsLocalPath('/mnt/proj/tex.exr'))
+        self.assertFalse(Preflight.IsLocalPath('P:/proj/tex.exr'))
+
+    def test_configured_prefixes(self):
+        prefixes = Preflight.SplitPrefixes('C:/; /tmp/ ;')
+        self.assertEqual(prefixes, ['C:/', '/tmp/'])
+        self.assertFalse(Preflight.IsLocalPath('/home/me/tex.exr', prefixes))
+        self.assertTrue(Preflight.IsLocalPath('/tmp/tex.exr', prefixes))
+
+
+class CheckPathsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        for name in ('a.usd', 'wood.1001.exr', 'wood.1002.exr'):
+            open(os.path.join(self.tmp, name), 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def test_missing_and_udim(self):
+        result = Preflight.CheckPaths([self.path('a.usd'), self.path('a.usd'), self.path('b.usd'),
+                                       self.path('wood.<UDIM>.exr'), self.path('metal.<UDIM>.exr')],
+                                      is_local=lambda path: False)
+        self.assertEqual(result['checked'], 4)
+        self.assertEqual(result['directories'], 1)
+        self.assertEqual(result['missing'], [self.path('b.usd'), self.path('metal.<UDIM>.exr')])
+
+    def test_mapping_prefixes(self):
+        paths = [self.path('a.usd')]
+        result = Preflight.CheckPaths(paths, is_local=lambda path: False)
+        self.assertEqual(result['unmapped'], [])
+        result = Preflight.CheckPaths(paths, ['P:/'], is_local=lambda path: False)
+        self.assertEqual(result['unmapped'], paths)
+        result = Preflight.CheckPaths(paths, [self.tmp], is_local=lambda path: False)
+        self.assertEqual(result['unmapped'], [])
+
+    def test_is_mapped_decides_with_prefixes(self):
+        paths = [self.path('a.usd')]
+        result = Preflight.CheckPaths(paths, ['P:/'], is_local=lambda path: False, is_mapped=lambda path: True)
+        self.assertEqual(result['unmapped'], [])
+
+    def test_local_paths_are_not_also_unmapped(self):
+        paths = [self.path('a.usd')]
+        result = Preflight.CheckPaths(paths, ['P:/'], is_local=lambda path: True)
+        self.assertEqual((result['local'], result['unmapped']), (paths, []))
+
+    def test_report(self):
+        self.assertEqual(Preflight.FormatReport({'checked': 3, 'missing': [], 'unresolved': []}), '')
+        report = Preflight.FormatReport({'checked': 3, 'missing': ['/a', '/b', '/c'], 'unresolved': ['x']}, limit=2)
+        self.assertIn('Missing files (3):', report)
+        self.assertIn('... and 1 more', report)
+        self.assertIn('References that could not be resolved (1):', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""Tests for scripts/Submission/HuskLib/UsdProbe.py (the parts that don't need pxr)."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Submission'))
+
+from HuskLib import UsdProbe  # noqa: E402
+
+
+class FakePrim(object):
+    def __init__(self, type_name, children=()):
+        self.type_name = type_name
+        self.children = list(children)
+
+    def GetTypeName(self):
+        return self.type_name
+
+    def GetChildren(self):
+        return self.children
+
+
+class FakeStage(object):
+    def __init__(self, roots):
+        self.root = FakePrim('', roots)
+
+    def GetPseudoRoot(self):
+        return self.root
+
+
+class FindNearRootTest(unittest.TestCase):
+
+    def test_root_prims_and_their_children(self):
+        settings = FakePrim('RenderSettings')
+        stage = FakeStage([FakePrim('Xform'), FakePrim('Scope', [FakePrim('Camera'), settings])])
+        self.assertIs(UsdProbe._find_near_root(stage, 'RenderSettings'), settings)
+        root = FakePrim('RenderProduct')
+        self.assertIs(UsdProbe._find_near_root(FakeStage([root]), 'RenderProduct'), root)
+
+    def test_does_not_walk_deeper(self):
+        deep = FakePrim('Xform', [FakePrim('Scope', [FakePrim('RenderSettings')])])
+        self.assertIsNone(UsdProbe._find_near_root(FakeStage([deep]), 'RenderSettings'))
+
+
+class ProbeCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.usd_file = os.path.join(self.tmp, 'shot.usd')
+        with open(self.usd_file, 'w') as f:
+            f.write('#usda 1.0\n')
+        self.probed = []
+        self._probe_file = UsdProbe.ProbeFile
+        UsdProbe.ProbeFile = lambda filename: self.probed.append(filename) or {'start': 1001.0}
+
+    def tearDown(self):
+        UsdProbe.ProbeFile = self._probe_file
+        shutil.rmtree(self.tmp)
+
+    def test_get_caches_and_save_writes_once(self):
+        cache_file = os.path.join(self.tmp, 'cache', 'probe.json')
+        cache = UsdProbe.ProbeCache(cache_file)
+        self.assertEqual(cache.Get(self.usd_file), {'start': 1001.0})
+        self.assertFalse(os.path.exists(cache_file))
+        self.assertIsNone(cache.Save())
+        with open(cache_file) as f:
+            self.assertEqual(len(json.load(f)['entries']), 1)
+
+        reopened = UsdProbe.ProbeCache(cache_file)
+        self.assertEqual(reopened.Get(self.usd_file), {'start': 1001.0})
+        self.assertEqual(len(self.probed), 1)
+        # Nothing new was probed, so nothing is written.
+        os.remove(cache_file)
+        self.assertIsNone(reopened.Save())
+        self.assertFalse(os.path.exists(cache_file))
+
+    def test_save_returns_the_error(self):
+        blocker = os.path.join(self.tmp, 'not_a_folder')
+        with open(blocker, 'w') as f:
+            f.write('')
+        cache = UsdProbe.ProbeCache(os.path.join(blocker, 'probe.json'))
+        cache.Get(self.usd_file)
+        error = cache.Save()
+        self.assertIn('Could not write USD probe cache', error)
+
+
+if __name__ == '__main__':
+    unittest.main()
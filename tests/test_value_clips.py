@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""Tests for scripts/Submission/HuskLib/ValueClips.py (the parts that don't need pxr)."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Submission'))
+
+from HuskLib import ValueClips  # noqa: E402
+
+
+class ChunkRangesTest(unittest.TestCase):
+
+    def test_even_split(self):
+        self.assertEqual(ValueClips.ChunkRanges(1, 30, 1, 10), [(1, 10), (11, 20), (21, 30)])
+
+    def test_short_last_chunk(self):
+        self.assertEqual(ValueClips.ChunkRanges(1, 25, 1, 10), [(1, 10), (11, 20), (21, 25)])
+
+    def test_step(self):
+        self.assertEqual(ValueClips.ChunkRanges(1, 11, 2, 3), [(1, 5), (7, 11)])
+
+    def test_invalid_size_and_step(self):
+        self.assertEqual(ValueClips.ChunkRanges(1, 3, 0, 0), [(1, 1), (2, 2), (3, 3)])
+
+    def test_single_frame(self):
+        self.assertEqual(ValueClips.ChunkRanges(5, 5), [(5, 5)])
+
+
+class ExportRangeTest(unittest.TestCase):
+
+    def test_pads_inner_boundaries(self):
+        self.assertEqual(ValueClips.ExportRange((11, 20), 1, 30), (10, 21))
+
+    def test_clamped_to_the_range(self):
+        self.assertEqual(ValueClips.ExportRange((1, 10), 1, 30), (1, 11))
+        self.assertEqual(ValueClips.ExportRange((21, 30), 1, 30), (20, 30))
+
+    def test_step(self):
+        self.assertEqual(ValueClips.ExportRange((7, 11), 1, 21, 2), (5, 13))
+
+
+class FileNameTest(unittest.TestCase):
+
+    def test_chunk_file(self):
+        self.assertEqual(ValueClips.ChunkFile('/proj/usd/shot.usd', (1, 10)).replace('\\', '/'),
+                         '/proj/usd/shot_clips/shot.0001_0010.usd')
+
+    def test_sibling(self):
+        self.assertEqual(ValueClips._sibling('/proj/shot.usdc', 'topology'), '/proj/shot.topology.usdc')
+
+    def test_relative(self):
+        self.assertEqual(ValueClips._relative('/proj/shot_clips/shot.0001_0010.usd', '/proj/shot.usd'),
+                         './shot_clips/shot.0001_0010.usd')
+        self.assertEqual(ValueClips._relative('/other/a.usd', '/proj/shot.usd'), '../other/a.usd')
+
+
+if __name__ == '__main__':
+    unittest.main()